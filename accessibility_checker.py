@@ -4,11 +4,17 @@ Main accessibility checker script for CI/CD pipeline.
 Runs comprehensive accessibility audits on HTML files and generates JSON reports.
 """
 
+import contextlib
+import dataclasses
+import hashlib
+import itertools
 import json
 import os
 import sys
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, Iterator, List, Any, Optional, TextIO, Tuple
 from datetime import datetime
 import glob
 
@@ -17,21 +23,52 @@ sys.path.insert(0, str(Path(__file__).parent / 'src' / 'utils'))
 
 try:
     from bs4 import BeautifulSoup
+    from dom_index import DocumentIndex
     from heading_validator import check_header_hierarchy, validate_html_headings
-    from image_alt_checker import check_images_accessibility, ImageAccessibilityAnalyzer
-    from color_contrast import analyze_web_page_contrast, ColorContrastAnalyzer
+    from image_alt_checker import ImageAccessibilityAnalyzer
+    from color_contrast import analyze_element_contrast, analyze_web_page_contrast, ColorContrastAnalyzer
     from keyboard_navigation import KeyboardNavigationEnhancer
+    from tailwind_colors import TailwindColorIndex
+    from image_assets import ImageMetadataCache, resolve_image_src
+    from alt_consistency import AltTextIndex
+    from id_references import check_id_references
+    from caption_validator import CaptionReportCache, check_video_captions
+    from jsx_scanner import ComponentScanCache, scan_components
+    from archive_sources import read_archives
+    from asset_cache import file_digest
 except ImportError as e:
     print(f"Error importing modules: {e}")
     print("Please ensure all required dependencies are installed.")
     sys.exit(1)
 
+# Distinct stylesheet sets whose color indexes are kept (least recently used evicted)
+COLOR_INDEX_CACHE_SIZE = 16
+
 
 class AccessibilityAuditor:
     """Main auditor class that coordinates all accessibility checks"""
 
-    def __init__(self, base_dir: str = "."):
+    def __init__(self, base_dir: str = ".", archives: Optional[List[str]] = None):
         self.base_dir = Path(base_dir)
+        # tar/zip/WARC files whose HTML members are audited without extraction
+        self.archives = list(archives or [])
+        # Tailwind color indexes keyed by a digest of the CSS they were built
+        # from, bounded so endless --stdin streams with per-record css do not grow it
+        self._color_indexes: "OrderedDict[str, Optional[TailwindColorIndex]]" = OrderedDict()
+        # Image header metadata, persisted between runs
+        self.image_metadata = ImageMetadataCache(
+            str(self.base_dir / ".a11y-cache" / "image-metadata.json")
+        )
+        # Alt text of every image occurrence across pages, persisted between runs
+        self.alt_index = AltTextIndex(
+            str(self.base_dir / ".a11y-cache" / "alt-index.json"), self.image_metadata
+        )
+        # Caption track validation reports keyed by file hash, persisted between runs
+        self.caption_reports = CaptionReportCache(
+            str(self.base_dir / ".a11y-cache" / "captions.json")
+        )
+        # Caption files with problems, by path, and the pages that use them
+        self.caption_tracks: Dict[str, Dict[str, Any]] = {}
         self.results = {
             "timestamp": datetime.now().isoformat(),
             "files_analyzed": [],
@@ -46,7 +83,9 @@ class AccessibilityAuditor:
                 "headings": [],
                 "images": [],
                 "color_contrast": [],
-                "keyboard_navigation": []
+                "keyboard_navigation": [],
+                "id_references": [],
+                "captions": []
             }
         }
 
@@ -73,29 +112,69 @@ class AccessibilityAuditor:
         html_files = sorted(set(html_files))
         return html_files
 
+    def resolve_asset(self, src: str, page_path: Path) -> Optional[str]:
+        """Map an asset URL referenced by a page to a local file, if it exists"""
+        return resolve_image_src(src, page_path, str(self.base_dir))
+
+    def get_color_index(self, css_content: str) -> Optional[TailwindColorIndex]:
+        """Build (once per stylesheet set) the utility-class color index"""
+        key = hashlib.sha1(css_content.encode("utf-8")).hexdigest()
+        if key in self._color_indexes:
+            self._color_indexes.move_to_end(key)
+            return self._color_indexes[key]
+        if css_content:
+            color_index = TailwindColorIndex.from_compiled_css(css_content)
+        else:
+            # No build output: derive the index from the Tailwind sources
+            color_index = TailwindColorIndex.from_project(str(self.base_dir))
+        self._color_indexes[key] = color_index
+        if len(self._color_indexes) > COLOR_INDEX_CACHE_SIZE:
+            self._color_indexes.popitem(last=False)
+        return color_index
+
     def analyze_file(self, file_path: Path) -> Dict[str, Any]:
         """Run all accessibility checks on a single HTML file"""
-        print(f"Analyzing: {file_path}")
-
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 html_content = f.read()
         except Exception as e:
+            print(f"Analyzing: {file_path}")
             return {
                 "file": str(file_path),
                 "error": f"Could not read file: {e}",
                 "checks": {}
             }
 
+        return self.analyze_html(
+            html_content, self._page_id(file_path), file_path, file_digest(str(file_path))
+        )
+
+    def analyze_html(self, html_content: str, label: str,
+                     page_path: Optional[Path] = None, digest: Optional[str] = None,
+                     css: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Run all accessibility checks on one document. label identifies it in
+        the report (relative path, or archive!member); page_path, when the
+        document is on disk, lets referenced assets be resolved next to it.
+        css, when given, replaces the stylesheets found next to the page.
+        """
+        print(f"Analyzing: {label}")
+
+        def resolve(src: str) -> Optional[str]:
+            return self.resolve_asset(src, page_path) if page_path is not None else None
+
         file_result = {
-            "file": str(file_path.relative_to(self.base_dir)),
+            "file": label,
             "timestamp": datetime.now().isoformat(),
             "checks": {}
         }
 
+        # Parse once: every check reads the same soup through the shared index
+        index = DocumentIndex(BeautifulSoup(html_content, "html.parser"))
+
         # 1. Check heading hierarchy
         try:
-            heading_report = check_header_hierarchy(html_content)
+            heading_report = check_header_hierarchy(html_content, index=index)
             file_result["checks"]["headings"] = heading_report
 
             # Count issues
@@ -114,7 +193,10 @@ class AccessibilityAuditor:
 
         # 2. Check image accessibility
         try:
-            image_report = check_images_accessibility(str(file_path))
+            image_report = ImageAccessibilityAnalyzer.analyze_images_in_html(
+                html_content, resolve if page_path is not None else None, self.image_metadata,
+                index=index
+            )
             file_result["checks"]["images"] = {
                 "total_images": image_report.get("total_images", 0),
                 "issues": image_report.get("issues", []),
@@ -131,6 +213,12 @@ class AccessibilityAuditor:
             self.results["summary"]["warnings"] += warnings
             self.results["summary"]["total_issues"] += len(image_issues)
 
+            if "error" not in image_report:
+                self.alt_index.update_page(
+                    label, image_report.get("images", []),
+                    digest or hashlib.sha1(html_content.encode("utf-8")).hexdigest()
+                )
+
         except Exception as e:
             file_result["checks"]["images"] = {
                 "error": f"Image check failed: {e}"
@@ -139,9 +227,9 @@ class AccessibilityAuditor:
         # 3. Check color contrast
         try:
             # Try to find associated CSS files
-            css_content = ""
-            css_dir = file_path.parent / "assets"
-            if css_dir.exists():
+            css_content = css or ""
+            css_dir = page_path.parent / "assets" if page_path is not None and css is None else None
+            if css_dir is not None and css_dir.exists():
                 for css_file in css_dir.glob("**/*.css"):
                     try:
                         with open(css_file, 'r', encoding='utf-8') as f:
@@ -149,15 +237,38 @@ class AccessibilityAuditor:
                     except:
                         pass
 
-            contrast_report = analyze_web_page_contrast(html_content, css_content)
+            color_index = self.get_color_index(css_content)
+            contrast_kwargs = {}
+            if color_index is not None:
+                contrast_kwargs["style_resolver"] = color_index.style_resolver()
+
+            contrast_report = analyze_web_page_contrast(
+                html_content, css_content,
+                image_resolver=resolve,
+                index=index,
+                **contrast_kwargs
+            )
             file_result["checks"]["color_contrast"] = contrast_report
 
             # Count issues (low contrast ratios)
             color_pairs = contrast_report.get("color_pairs_analyzed", [])
-            failing_pairs = sum(
-                1 for pair in color_pairs
-                if not pair.get("wcag_aa", {}).get("normal", {}).get("passes", True)
-            )
+            failing = [pair for pair in color_pairs if not _passes_aa(pair)]
+            failing_pairs = len(failing)
+
+            # Stylesheets with a dark theme: audit the page's own elements again
+            # under it and report those pairs separately
+            if color_index is not None and color_index.has_theme("dark"):
+                dark_pairs = analyze_element_contrast(
+                    html_content, color_index.style_resolver(theme="dark"), resolve, index=index
+                )
+                dark_failing = [pair for pair in dark_pairs if not _passes_aa(pair)]
+                contrast_report["dark_theme"] = {
+                    "color_pairs_analyzed": dark_pairs,
+                    "failing_pairs": len(dark_failing)
+                }
+                # A pair that fails in both themes is one issue
+                failing_keys = {_contrast_key(pair) for pair in failing}
+                failing_pairs += sum(1 for pair in dark_failing if _contrast_key(pair) not in failing_keys)
 
             self.results["summary"]["warnings"] += failing_pairs
             self.results["summary"]["total_issues"] += failing_pairs
@@ -169,8 +280,8 @@ class AccessibilityAuditor:
 
         # 4. Check keyboard navigation
         try:
-            focus_analysis = KeyboardNavigationEnhancer.analyze_focus_order(html_content)
-            validation = KeyboardNavigationEnhancer.validate_focus_management(html_content)
+            focus_analysis = KeyboardNavigationEnhancer.analyze_focus_order(html_content, index=index)
+            validation = KeyboardNavigationEnhancer.validate_focus_management(html_content, index=index)
 
             file_result["checks"]["keyboard_navigation"] = {
                 "total_focusable": focus_analysis.get("total_focusable", 0),
@@ -189,8 +300,56 @@ class AccessibilityAuditor:
                 "error": f"Keyboard navigation check failed: {e}"
             }
 
+        # 5. Check id uniqueness and ID references (aria-*, for, href="#...")
+        try:
+            reference_report = check_id_references(html_content, index=index)
+            file_result["checks"]["id_references"] = reference_report
+
+            findings = reference_report.get("findings", [])
+            errors = sum(1 for f in findings if f.get("severity") == "error")
+            warnings = sum(1 for f in findings if f.get("severity") == "warning")
+
+            self.results["summary"]["errors"] += errors
+            self.results["summary"]["warnings"] += warnings
+            self.results["summary"]["total_issues"] += len(findings)
+
+        except Exception as e:
+            file_result["checks"]["id_references"] = {
+                "error": f"ID reference check failed: {e}"
+            }
+
+        # 6. Validate caption/subtitle tracks of <video> elements
+        try:
+            caption_report = check_video_captions(html_content, resolve, self.caption_reports, index=index)
+            file_result["checks"]["captions"] = caption_report
+
+            # Cue-level problems belong to the caption file, counted once per audit
+            for finding in caption_report.get("track_findings", []):
+                track = self.caption_tracks.setdefault(finding["file"], dict(finding, pages=[]))
+                if label not in track["pages"]:
+                    track["pages"].append(label)
+
+            findings = caption_report.get("findings", [])
+            errors = sum(1 for f in findings if f.get("severity") == "error")
+            warnings = sum(1 for f in findings if f.get("severity") == "warning")
+
+            self.results["summary"]["errors"] += errors
+            self.results["summary"]["warnings"] += warnings
+            self.results["summary"]["total_issues"] += len(findings)
+
+        except Exception as e:
+            file_result["checks"]["captions"] = {
+                "error": f"Caption check failed: {e}"
+            }
+
         return file_result
 
+    def _page_id(self, file_path: Path) -> str:
+        try:
+            return str(file_path.relative_to(self.base_dir))
+        except ValueError:
+            return str(file_path)
+
     def run_audit(self) -> Dict[str, Any]:
         """Run full accessibility audit on all HTML files"""
         print("Starting accessibility audit...")
@@ -198,7 +357,7 @@ class AccessibilityAuditor:
 
         html_files = self.find_html_files()
 
-        if not html_files:
+        if not html_files and not self.archives:
             print("Warning: No HTML files found to analyze.")
             print("Looking in: dist/, index.html, public/")
             self.results["warning"] = "No HTML files found"
@@ -207,6 +366,8 @@ class AccessibilityAuditor:
         print(f"Found {len(html_files)} HTML file(s) to analyze:\n")
         for f in html_files:
             print(f"  - {f.relative_to(self.base_dir)}")
+        for archive in self.archives:
+            print(f"  - {archive} (archive)")
         print()
 
         self.results["summary"]["total_files"] = len(html_files)
@@ -216,6 +377,47 @@ class AccessibilityAuditor:
             file_result = self.analyze_file(html_file)
             self.results["files_analyzed"].append(file_result)
 
+        # Archive members are streamed and analyzed one at a time, keyed archive!member
+        current_pages = {self._page_id(f) for f in html_files}
+        for member in read_archives(self.archives):
+            if member.error:
+                print(f"Warning: {member.archive}: {member.error}")
+                self.results["files_analyzed"].append({
+                    "file": member.archive,
+                    "error": member.error,
+                    "checks": {}
+                })
+                continue
+            file_result = self.analyze_html(
+                member.text(), member.key, digest=hashlib.sha1(member.data).hexdigest()
+            )
+            self.results["files_analyzed"].append(file_result)
+            self.results["summary"]["total_files"] += 1
+            current_pages.add(member.key)
+
+        # Cross-page alt text consistency; pages no longer in the site are dropped
+        for page_id in list(self.alt_index.pages):
+            if page_id not in current_pages:
+                self.alt_index.remove_page(page_id)
+        consistency = self.alt_index.report()
+        self.results["alt_consistency"] = consistency
+        self.results["summary"]["warnings"] += consistency["inconsistent_images"]
+        self.results["summary"]["total_issues"] += consistency["inconsistent_images"]
+
+        # One finding per caption file with problems, however many pages use it
+        caption_tracks = list(self.caption_tracks.values())
+        self.results["caption_tracks"] = caption_tracks
+        for track in caption_tracks:
+            self.results["summary"]["errors" if track["severity"] == "error" else "warnings"] += 1
+        self.results["summary"]["total_issues"] += len(caption_tracks)
+
+        try:
+            self.image_metadata.save()
+            self.alt_index.save()
+            self.caption_reports.save()
+        except OSError as e:
+            print(f"Warning: could not save audit caches: {e}")
+
         # Calculate overall accessibility score
         # Score is calculated based on issues found, not just binary pass/fail
         total_issues = self.results["summary"]["total_issues"]
@@ -273,6 +475,17 @@ class AccessibilityAuditor:
                     kb_score = max(50, 100 - (total_kb_issues * 10))
                     component_scores.append(kb_score)
 
+                # ID reference checks
+                if "id_references" in checks and "error" not in checks["id_references"]:
+                    component_scores.append(100 if not checks["id_references"].get("findings") else 50)
+
+                # Caption track checks (pages with video only)
+                if "captions" in checks and "error" not in checks["captions"]:
+                    if checks["captions"].get("videos"):
+                        captions = checks["captions"]
+                        has_issues = captions.get("findings") or captions.get("track_findings")
+                        component_scores.append(50 if has_issues else 100)
+
             if component_scores:
                 final_score = round(sum(component_scores) / len(component_scores), 2)
 
@@ -289,13 +502,55 @@ class AccessibilityAuditor:
 
         return self.results
 
+    def run_component_audit(self, source_dir: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Audit React component sources (src/**/*.tsx) statically, without a
+        production build. Unchanged files are served from a per-file hash cache.
+        """
+        source_dir = Path(source_dir) if source_dir else self.base_dir / "src"
+        print(f"Scanning components in {source_dir}...")
+        print("=" * 60)
+
+        cache = ComponentScanCache(str(self.base_dir / ".a11y-cache" / "components.json"))
+        report = scan_components(str(source_dir), cache)
+        try:
+            cache.save()
+        except OSError as e:
+            print(f"Warning: could not save audit caches: {e}")
+
+        for file_report in report["files"]:
+            self.results["files_analyzed"].append({
+                "file": file_report["file"],
+                "checks": {"components": file_report}
+            })
+            for finding in file_report["findings"]:
+                print(f"  {finding['location']}: {finding['severity']}: {finding['message']}")
+
+        summary = self.results["summary"]
+        summary["total_files"] = report["summary"]["files_scanned"]
+        summary["errors"] += report["summary"]["errors"]
+        summary["warnings"] += report["summary"]["warnings"]
+        summary["total_issues"] += report["summary"]["errors"] + report["summary"]["warnings"]
+        # Same penalty scoring as run_audit: each error = -10 points, each warning = -2 points
+        summary["accessibility_score"] = max(0, 100 - (summary["errors"] * 10 + summary["warnings"] * 2))
+        self.results["components"] = report["summary"]
+
+        print("=" * 60)
+        print(f"Components scanned: {report['summary']['files_scanned']} "
+              f"({report['summary']['files_parsed']} changed since last run)")
+        print(f"  - Errors: {summary['errors']}")
+        print(f"  - Warnings: {summary['warnings']}")
+        print("=" * 60)
+
+        return self.results
+
     def save_report(self, output_path: str = "report.json"):
         """Save audit results to JSON file"""
         output_file = Path(output_path)
 
         try:
             with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(self.results, f, indent=2, ensure_ascii=False)
+                json.dump(self.results, f, indent=2, ensure_ascii=False, default=_json_default)
 
             print(f"\nReport saved to: {output_file.absolute()}")
             return True
@@ -305,6 +560,143 @@ class AccessibilityAuditor:
             return False
 
 
+def _passes_aa(pair: Dict[str, Any]) -> bool:
+    """WCAG AA for normal-size text"""
+    return pair.get("wcag_aa", {}).get("normal", {}).get("passes", True)
+
+
+def _contrast_key(pair: Dict[str, Any]) -> Tuple:
+    """Identity of an analyzed color pair, whichever theme produced it"""
+    if pair.get("source") == "text_over_image":
+        return ("image", pair.get("image"), pair.get("text_color"), str(pair.get("overlay")))
+    return (pair.get("foreground"), pair.get("background"))
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize dataclasses (e.g. headings referenced by findings) nested in reports"""
+    if dataclasses.is_dataclass(value):
+        return dataclasses.asdict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+# Auditor of each --stdin worker process, created once by the pool initializer
+_worker_auditor: Optional[AccessibilityAuditor] = None
+
+
+def _init_stdin_worker(base_dir: str) -> None:
+    global _worker_auditor
+    _worker_auditor = AccessibilityAuditor(base_dir=base_dir)
+
+
+def _audit_document(doc_id: Any, html: str, css: Optional[str]) -> Dict[str, Any]:
+    """Worker entry point: audit one streamed document with the process's auditor"""
+    auditor = _worker_auditor
+    summary = auditor.results["summary"]
+    before = {key: summary[key] for key in ("errors", "warnings", "total_issues")}
+
+    # Progress output goes to stderr so stdout carries only NDJSON
+    with contextlib.redirect_stdout(sys.stderr):
+        file_result = auditor.analyze_html(html, str(doc_id), css=css)
+    # Streams are unbounded: keep no per-document state across records (the
+    # cross-page alt index and caption track registry serve whole-site audits)
+    auditor.alt_index.remove_page(str(doc_id))
+    auditor.caption_tracks.clear()
+
+    return {
+        "id": doc_id,
+        "summary": {key: summary[key] - before[key] for key in before},
+        "checks": file_result["checks"]
+    }
+
+
+def read_stdin_documents(stream: TextIO) -> Iterator[Tuple[Any, int, Optional[str], Optional[str], Optional[str]]]:
+    """
+    (id, line, html, css, error) for each document on stdin: NDJSON records
+    of {id, html, css} when the input starts with '{', otherwise the whole
+    input as a single document with id "stdin". Line numbers count from the
+    start of the stream; invalid records have no id, only their line.
+    """
+    first_line = 1
+    first = stream.readline()
+    while first and not first.strip():
+        first_line += 1
+        first = stream.readline()
+    if not first.lstrip().startswith("{"):
+        yield "stdin", first_line, first + stream.read(), None, None
+        return
+
+    for line_number, line in enumerate(itertools.chain([first], stream), first_line):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict) or not isinstance(record.get("html"), str):
+                raise ValueError('expected an object with an "html" string')
+        except ValueError as e:
+            yield None, line_number, None, None, f"Invalid NDJSON record on line {line_number}: {e}"
+            continue
+        yield record.get("id", line_number), line_number, record["html"], record.get("css"), None
+
+
+def audit_stdin(base_dir: str = ".", workers: Optional[int] = None, ordered: bool = True,
+                stream: TextIO = sys.stdin, out: TextIO = sys.stdout) -> Dict[str, int]:
+    """
+    Audit documents streamed on stdin through a persistent process pool and
+    write one NDJSON result per document to out, in input order or as soon
+    as each completes. At most 2 x workers documents are in flight or
+    waiting to be written, so memory stays bounded on endless streams.
+    """
+    workers = workers or os.cpu_count() or 1
+    limit = 2 * workers
+    totals = {"documents": 0, "errors": 0, "warnings": 0, "failed": 0}
+    in_flight = {}  # future -> (sequence, id)
+    finished = {}  # sequence -> result waiting for its turn (ordered mode)
+    next_sequence = 0
+
+    def emit(result: Dict[str, Any]) -> None:
+        totals["documents"] += 1
+        if "error" in result:
+            totals["failed"] += 1
+        else:
+            totals["errors"] += result["summary"]["errors"]
+            totals["warnings"] += result["summary"]["warnings"]
+        out.write(json.dumps(result, ensure_ascii=False, default=_json_default) + "\n")
+        out.flush()
+
+    def complete(sequence: int, result: Dict[str, Any]) -> None:
+        nonlocal next_sequence
+        if not ordered:
+            emit(result)
+            return
+        finished[sequence] = result
+        while next_sequence in finished:
+            emit(finished.pop(next_sequence))
+            next_sequence += 1
+
+    def collect(done) -> None:
+        for future in done:
+            sequence, doc_id = in_flight.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"id": doc_id, "error": f"Audit failed: {e}"}
+            complete(sequence, result)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_stdin_worker,
+                             initargs=(base_dir,)) as pool:
+        for sequence, (doc_id, line, html, css, error) in enumerate(read_stdin_documents(stream)):
+            if error is not None:
+                complete(sequence, {"id": doc_id, "line": line, "error": error})
+                continue
+            in_flight[pool.submit(_audit_document, doc_id, html, css)] = (sequence, doc_id)
+            while len(in_flight) + len(finished) >= limit:
+                collect(wait(in_flight, return_when=FIRST_COMPLETED).done)
+        while in_flight:
+            collect(wait(in_flight, return_when=FIRST_COMPLETED).done)
+
+    return totals
+
+
 def main():
     """Main entry point for the accessibility checker"""
     import argparse
@@ -322,12 +714,46 @@ def main():
         default="report.json",
         help="Output JSON report file (default: report.json)"
     )
+    parser.add_argument(
+        "--archive",
+        action="append",
+        default=[],
+        help="Also audit HTML inside a .tar(.gz), .zip or .warc(.gz) archive without extracting it (repeatable)"
+    )
+    parser.add_argument(
+        "--stdin",
+        action="store_true",
+        help="Audit documents read from stdin (one HTML document, or NDJSON {id, html, css} records) "
+             "and write NDJSON results to stdout"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Worker processes for --stdin (default: CPU count)"
+    )
+    parser.add_argument(
+        "--unordered",
+        action="store_true",
+        help="With --stdin, write each result as soon as it completes instead of in input order"
+    )
+    parser.add_argument(
+        "--components",
+        action="store_true",
+        help="Scan React component sources (src/**/*.tsx) instead of built HTML; no build needed"
+    )
 
     args = parser.parse_args()
 
+    if args.stdin:
+        totals = audit_stdin(args.dir, args.workers, ordered=not args.unordered)
+        print(f"Documents audited: {totals['documents']} "
+              f"({totals['errors']} errors, {totals['warnings']} warnings, {totals['failed']} failed)",
+              file=sys.stderr)
+        sys.exit(1 if totals["errors"] or totals["failed"] else 0)
+
     # Create auditor and run checks
-    auditor = AccessibilityAuditor(base_dir=args.dir)
-    results = auditor.run_audit()
+    auditor = AccessibilityAuditor(base_dir=args.dir, archives=args.archive)
+    results = auditor.run_component_audit() if args.components else auditor.run_audit()
 
     # Save report
     auditor.save_report(args.output)
@@ -1,12 +1,17 @@
 # Enhanced accessibility utilities for web applications
 # Improved Python scripts for WCAG compliance
 
-import speech_recognition as sr
 from moviepy.editor import VideoFileClip
 import os
 from pathlib import Path
+from typing import Iterator, Optional
 import logging
 
+from alignment import align_to_captions
+from audio_stream import DEFAULT_SAMPLE_RATE, stream_pcm
+from captions import CAPTION_FORMATS, split_cue, write_captions
+from transcription import transcribe_segments
+
 # Configure logging for accessibility improvements
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -37,9 +42,23 @@ def extract_audio_from_video(video_path: str, audio_output: str) -> bool:
         logging.error(f"Error extracting audio: {e}")
         return False
 
-def transcribe_audio_to_text(audio_path: str, language: str = 'en-US') -> dict:
+def stream_audio_from_video(video_path: str, sample_rate: int = DEFAULT_SAMPLE_RATE,
+                            chunk_seconds: float = 1.0) -> Iterator[bytes]:
+    """
+    Stream the audio track as mono 16-bit PCM chunks at sample_rate, piped
+    from ffmpeg without decoding the whole track or writing a WAV file.
+    Feed the chunks to transcription.stream_segments, or use
+    transcription.transcribe_to_captions on the video directly.
+    """
+    if not os.path.exists(video_path):
+        raise FileNotFoundError(f"Video file not found: {video_path}")
+    return stream_pcm(video_path, sample_rate, chunk_seconds)
+
+def transcribe_audio_to_text(audio_path: str, language: str = 'en-US', workers: Optional[int] = None) -> dict:
     """
     Enhanced transcription with better error handling and support for multiple languages.
+    The audio is split at silence and the segments are transcribed in parallel
+    (see transcription.py); finished segments are kept, so a failed run resumes.
     Returns dict with success status, text, and confidence if available.
     """
     result = {
@@ -54,64 +73,49 @@ def transcribe_audio_to_text(audio_path: str, language: str = 'en-US') -> dict:
             result['error'] = f"Audio file not found: {audio_path}"
             return result
             
-        recognizer = sr.Recognizer()
+        transcript = transcribe_segments(audio_path, backend='google', language=language, workers=workers)
+        text = ' '.join(segment['text'] for segment in transcript['segments'] if segment['text'])
         
-        # Adjust for ambient noise
-        with sr.AudioFile(audio_path) as source:
-            recognizer.adjust_for_ambient_noise(source, duration=0.5)
-            audio = recognizer.record(source)
-            
-        try:
-            # Use Google Speech Recognition with language support
-            text = recognizer.recognize_google(audio, language=language, show_all=False)
+        if transcript['errors']:
+            result['error'] = f"Speech recognition service error: {next(iter(transcript['errors'].values()))}"
+            logging.error(f"Speech recognition failed for {len(transcript['errors'])} segment(s)")
+        elif not text:
+            result['error'] = "Could not understand the audio content"
+            logging.warning("Audio content could not be understood")
+        else:
             result['success'] = True
             result['text'] = text
             logging.info(f"Transcription successful: {text[:50]}...")
             
-        except sr.UnknownValueError:
-            result['error'] = "Could not understand the audio content"
-            logging.warning("Audio content could not be understood")
-            
-        except sr.RequestError as e:
-            result['error'] = f"Speech recognition service error: {e}"
-            logging.error(f"Speech recognition API error: {e}")
-            
     except Exception as e:
         result['error'] = f"Unexpected error during transcription: {e}"
         logging.error(f"Transcription error: {e}")
         
     return result
 
-def generate_captions_file(text: str, output_path: str, format_type: str = 'srt') -> bool:
+def generate_captions_file(text: str, output_path: str, format_type: str = 'srt', duration: float = 10.0,
+                           audio_path: Optional[str] = None) -> bool:
     """
-    Generate caption files in various formats (SRT, VTT).
+    Generate caption files in various formats (SRT, VTT) from untimed text.
+    With audio_path (e.g. the output of extract_audio_from_video) the text is
+    aligned offline to the speech in the recording (see alignment.py);
+    otherwise it is spread evenly over `duration` seconds. To caption audio
+    with no transcript use transcription.transcribe_to_captions.
     """
     try:
-        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-        
-        if format_type.lower() == 'srt':
-            # Simple SRT format - in real implementation, you'd need proper timing
-            content = f"""1
-00:00:00,000 --> 00:00:10,000
-{text}
-"""
-        elif format_type.lower() == 'vtt':
-            # WebVTT format
-            content = f"""WEBVTT
-
-00:00.000 --> 00:10.000
-{text}
-"""
-        else:
+        if format_type.lower() not in CAPTION_FORMATS:
             logging.error(f"Unsupported caption format: {format_type}")
             return False
             
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        if audio_path is not None:
+            align_to_captions(audio_path, text, output_path, format_type)
+            return True
             
+        write_captions(split_cue(0.0, duration, text), output_path, format_type)
+        
         logging.info(f"Caption file created: {output_path}")
         return True
         
     except Exception as e:
         logging.error(f"Error creating caption file: {e}")
-        return False
\ No newline at end of file
+        return False
@@ -0,0 +1,238 @@
+# Accessible name computation following the W3C accname algorithm
+from typing import Dict, List, Optional, Tuple
+
+from bs4 import NavigableString, Tag
+
+# Roles whose name may come from their content (accname step 2F)
+NAME_FROM_CONTENT_ROLES = {
+    'button', 'cell', 'checkbox', 'columnheader', 'gridcell', 'heading', 'link',
+    'menuitem', 'menuitemcheckbox', 'menuitemradio', 'option', 'radio', 'row',
+    'rowheader', 'switch', 'tab', 'tooltip', 'treeitem'
+}
+
+IMPLICIT_ROLES = {
+    'button': 'button', 'summary': 'button', 'option': 'option',
+    'h1': 'heading', 'h2': 'heading', 'h3': 'heading',
+    'h4': 'heading', 'h5': 'heading', 'h6': 'heading',
+    'td': 'cell', 'th': 'columnheader', 'tr': 'row',
+    'select': 'combobox', 'textarea': 'textbox', 'img': 'img'
+}
+
+INPUT_ROLES = {
+    'button': 'button', 'submit': 'button', 'reset': 'button', 'image': 'button',
+    'checkbox': 'checkbox', 'radio': 'radio', 'range': 'slider', 'number': 'spinbutton'
+}
+
+# Elements that can be associated with a <label>
+LABELABLE_TAGS = {'input', 'select', 'textarea', 'button', 'meter', 'output', 'progress'}
+
+# Controls whose value (not content) is used when embedded in another name
+EMBEDDED_CONTROL_TAGS = {'input', 'select', 'textarea'}
+
+def implicit_role(element) -> str:
+    """Explicit role if present, otherwise the element's implicit ARIA role"""
+    role = (element.get('role') or '').split()
+    if role:
+        return role[0]
+    name = element.name
+    if name in ('a', 'area'):
+        return 'link' if element.has_attr('href') else ''
+    if name == 'input':
+        return INPUT_ROLES.get(element.get('type', 'text').lower(), 'textbox')
+    return IMPLICIT_ROLES.get(name, '')
+
+def _normalize(text: str) -> str:
+    return ' '.join(text.split())
+
+class AccessibleNameComputer:
+    """
+    Accessible names for the elements of one document.
+
+    aria-labelledby is resolved through the DocumentIndex id map, <label>
+    associations through a for-map built once, and the text contributed by
+    each subtree is memoized per node, so nested controls, links and images
+    never re-walk content that was already visited.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self._labels: Optional[Dict[str, List[Tag]]] = None  # for attribute -> labels
+        self._names: Dict[int, Tuple[str, Optional[str]]] = {}
+        self._content: Dict[Tuple[int, bool], str] = {}
+
+    def name(self, element) -> str:
+        return self.name_and_source(element)[0]
+
+    def name_and_source(self, element) -> Tuple[str, Optional[str]]:
+        """(accessible name, where it came from), memoized per element"""
+        key = id(element)
+        cached = self._names.get(key)
+        if cached is None:
+            cached = self._compute(element)
+            self._names[key] = cached
+        return cached
+
+    def referenced_text(self, element) -> str:
+        """Name contributed by an element referenced from aria-labelledby/describedby"""
+        label = (element.get('aria-label') or '').strip()
+        if label:
+            return _normalize(label)
+        native = self._native_name(element)
+        if native and native[1] in ('alt', 'value'):
+            return native[0]
+        # Referenced content counts even when hidden
+        return _normalize(self._subtree_text(element, self.index.is_hidden(element)))
+
+    def labels(self, element) -> List[Tag]:
+        """<label> elements associated with a control (for= and wrapping)"""
+        if element.name not in LABELABLE_TAGS:
+            return []
+        if self._labels is None:
+            self._labels = {}
+            for el in self.index.elements:
+                if el.name == 'label' and el.get('for'):
+                    self._labels.setdefault(el['for'], []).append(el)
+
+        found = list(self._labels.get(element.get('id'), [])) if element.get('id') else []
+        parent = element.parent
+        while parent is not None and parent.name is not None:
+            if parent.name == 'label':
+                if not parent.get('for') and parent not in found:
+                    found.append(parent)
+                break
+            parent = parent.parent
+        return found
+
+    def _compute(self, element) -> Tuple[str, Optional[str]]:
+        # 2B: aria-labelledby
+        labelledby = element.get('aria-labelledby')
+        if labelledby:
+            found, _ = self.index.resolve_idrefs(labelledby)
+            text = _normalize(' '.join(self.referenced_text(el) for el in found if el is not element))
+            if text:
+                return text, 'aria-labelledby'
+
+        # 2C: aria-label
+        label = _normalize(element.get('aria-label') or '')
+        if label:
+            return label, 'aria-label'
+
+        # 2D: host language label
+        native = self._native_name(element)
+        if native:
+            return native
+
+        # 2F: name from content
+        if implicit_role(element) in NAME_FROM_CONTENT_ROLES:
+            text = _normalize(self._subtree_text(element, False))
+            if text:
+                return text, 'content'
+
+        # 2I: tooltip, then placeholder for text fields
+        title = _normalize(element.get('title') or '')
+        if title:
+            return title, 'title'
+        if element.name in ('input', 'textarea'):
+            placeholder = _normalize(element.get('placeholder') or '')
+            if placeholder:
+                return placeholder, 'placeholder'
+        return '', None
+
+    def _native_name(self, element) -> Optional[Tuple[str, str]]:
+        """Names defined by HTML-AAM for native elements"""
+        name = element.name
+        input_type = element.get('type', 'text').lower() if name == 'input' else None
+
+        if input_type in ('button', 'submit', 'reset'):
+            value = _normalize(element.get('value') or '')
+            if value:
+                return value, 'value'
+            if input_type != 'button':
+                return input_type.capitalize(), 'value'
+            return None
+        if input_type == 'image':
+            alt = _normalize(element.get('alt') or '')
+            return (alt, 'alt') if alt else None
+
+        if name in LABELABLE_TAGS:
+            labels = self.labels(element)
+            text = _normalize(' '.join(self._subtree_text(label, False, skip=element) for label in labels))
+            if text:
+                return text, 'label'
+            return None
+
+        if name in ('img', 'area'):
+            alt = _normalize(element.get('alt') or '')
+            return (alt, 'alt') if alt else None
+
+        caption_tag = {'fieldset': 'legend', 'figure': 'figcaption', 'table': 'caption', 'svg': 'title'}.get(name)
+        if caption_tag:
+            caption = element.find(caption_tag, recursive=False)
+            if caption is not None:
+                text = _normalize(self._subtree_text(caption, True))
+                if text:
+                    return text, caption_tag
+        return None
+
+    def _embedded_value(self, element) -> Optional[str]:
+        """Value of a form control embedded in another element's name"""
+        name = element.name
+        if name == 'input':
+            if element.get('type', 'text').lower() in ('checkbox', 'radio', 'hidden', 'file', 'image'):
+                return None
+            return element.get('value', '')
+        if name == 'select':
+            selected = element.find('option', selected=True) or element.find('option')
+            return selected.get_text() if selected is not None else ''
+        if name == 'textarea':
+            return element.get_text()
+        return None
+
+    def _subtree_text(self, element, include_hidden: bool, skip=None) -> str:
+        """
+        Text contributed by an element's content (unnormalized), memoized per
+        (node, include_hidden). `skip` excludes the control being labelled from
+        its own label; subtrees containing it are not memoized.
+        """
+        index = self.index
+        key = (id(element), include_hidden)
+        cacheable = skip is None or not (
+            index.position(element) is not None and index.position(skip) is not None
+            and index.position(element) < index.position(skip) < index.subtree_end(element)
+        )
+        if cacheable and key in self._content:
+            return self._content[key]
+
+        parts = []
+        for child in element.children:
+            if type(child) is NavigableString:
+                parts.append(str(child))
+                continue
+            if not isinstance(child, Tag) or child is skip:
+                continue
+            if not include_hidden and index.is_hidden(child):
+                continue
+
+            label = (child.get('aria-label') or '').strip()
+            if label:
+                parts.append(f" {label} ")
+                continue
+            if child.name in EMBEDDED_CONTROL_TAGS:
+                value = self._embedded_value(child)
+                if value:
+                    parts.append(f" {value} ")
+                continue
+            if child.name in ('img', 'area'):
+                parts.append(f" {child.get('alt', '')} ")
+                continue
+            if child.name == 'svg':
+                native = self._native_name(child)
+                if native:
+                    parts.append(f" {native[0]} ")
+                continue
+            parts.append(self._subtree_text(child, include_hidden, skip))
+
+        text = ''.join(parts)
+        if cacheable:
+            self._content[key] = text
+        return text
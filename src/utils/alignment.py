@@ -0,0 +1,136 @@
+# Offline alignment of an existing plain-text transcript to the speech in a recording
+import logging
+import re
+from typing import Dict, List, Optional
+
+from audio_stream import DEFAULT_SAMPLE_RATE
+from captions import Cue, split_cue, write_captions
+from transcription import (
+    MIN_SILENCE_SECONDS, WINDOW_SECONDS, SilenceSegmenter, _require_numpy,
+    stream_energies, window_energies
+)
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+# Voiced runs shorter than this are clicks or breaths, not speech (seconds)
+MIN_SPEECH_SECONDS = 0.15
+# Furthest a sentence boundary is moved to land on a pause (seconds of speech)
+MAX_SNAP_SECONDS = 1.5
+
+_SENTENCE_BREAK = re.compile(r'(?<=[.!?…])\s+|\s*\n\s*')
+
+def split_sentences(transcript: str) -> List[str]:
+    """Sentences of a plain transcript; line breaks also end a sentence"""
+    return [' '.join(s.split()) for s in _SENTENCE_BREAK.split(transcript) if s.strip()]
+
+def speech_regions(energies: "np.ndarray",
+                   window_seconds: float = WINDOW_SECONDS,
+                   threshold: Optional[float] = None,
+                   min_silence: float = MIN_SILENCE_SECONDS,
+                   min_speech: float = MIN_SPEECH_SECONDS) -> "np.ndarray":
+    """
+    Voice activity as an (n, 2) array of [start, end] seconds. Voiced runs are
+    found from the edges of the thresholded energy signal; pauses shorter than
+    min_silence are bridged and runs shorter than min_speech dropped, all as
+    array operations with no per-window Python loop.
+    """
+    _require_numpy()
+    if len(energies) == 0:
+        return np.zeros((0, 2))
+    if threshold is None:
+        threshold = SilenceSegmenter.threshold_for(energies)
+
+    voiced = np.concatenate(([0], (energies >= threshold).astype(np.int8), [0]))
+    edges = np.flatnonzero(np.diff(voiced))
+    starts, ends = edges[0::2], edges[1::2]
+    if len(starts) == 0:
+        return np.zeros((0, 2))
+
+    keep = starts[1:] - ends[:-1] >= max(int(min_silence / window_seconds), 1)
+    starts = np.concatenate((starts[:1], starts[1:][keep]))
+    ends = np.concatenate((ends[:-1][keep], ends[-1:]))
+    long_enough = ends - starts >= int(min_speech / window_seconds)
+    return np.stack((starts[long_enough], ends[long_enough]), axis=1) * window_seconds
+
+def align_sentences(sentences: List[str], regions: "np.ndarray", snap: float = MAX_SNAP_SECONDS) -> List[Cue]:
+    """
+    Distribute sentences over speech regions in proportion to their length.
+
+    Regions are laid end to end on a speech-only timeline, sentence
+    boundaries are placed on it by cumulative character count and moved onto
+    a nearby pause when one lies within snap seconds (and within half of
+    either neighbouring sentence, so no sentence collapses). Long sentences
+    are split into readable cues before the speech timeline is mapped back
+    to recording time, so no cue starts or ends in the silence between regions.
+    """
+    _require_numpy()
+    if not sentences:
+        return []
+    if len(regions) == 0:
+        raise ValueError("No speech detected in the audio")
+
+    durations = regions[:, 1] - regions[:, 0]
+    speech_ends = np.cumsum(durations)
+    speech_starts = speech_ends - durations
+
+    lengths = np.array([len(s) for s in sentences], dtype=float)
+    bounds = np.concatenate(([0.0], np.cumsum(lengths) / lengths.sum() * speech_ends[-1]))
+
+    pauses = speech_ends[:-1]
+    if len(pauses) and len(sentences) > 1:
+        inner = bounds[1:-1]
+        spans = np.diff(bounds)
+        tolerance = np.minimum(snap, 0.5 * np.minimum(spans[:-1], spans[1:]))
+        after = np.clip(np.searchsorted(pauses, inner), 0, len(pauses) - 1)
+        before = np.clip(after - 1, 0, len(pauses) - 1)
+        nearest = np.where(np.abs(inner - pauses[before]) <= np.abs(pauses[after] - inner),
+                           pauses[before], pauses[after])
+        bounds[1:-1] = np.where(np.abs(nearest - inner) < tolerance, nearest, inner)
+
+    pieces = [cue for sentence, start, end in zip(sentences, bounds[:-1], bounds[1:])
+              for cue in split_cue(float(start), float(end), sentence)]
+    starts = np.array([cue.start for cue in pieces])
+    ends = np.array([cue.end for cue in pieces])
+
+    # A position on a pause starts in the next region but ends in the previous one
+    last = len(regions) - 1
+    start_region = np.minimum(np.searchsorted(speech_ends, starts, side='right'), last)
+    end_region = np.minimum(np.searchsorted(speech_ends, ends, side='left'), last)
+    real_starts = regions[start_region, 0] + (starts - speech_starts[start_region])
+    real_ends = regions[end_region, 0] + (ends - speech_starts[end_region])
+
+    return [Cue(round(float(start), 3), round(float(end), 3), cue.text)
+            for cue, start, end in zip(pieces, real_starts, real_ends)]
+
+def align_transcript(media_path: str, transcript: str,
+                     sample_rate: int = DEFAULT_SAMPLE_RATE) -> Dict:
+    """
+    Time a plain transcript against a recording. WAV files (such as the
+    output of accessibility.extract_audio_from_video) are read in blocks;
+    other media is streamed through ffmpeg. No recognizer is involved.
+    """
+    if media_path.lower().endswith('.wav'):
+        energies = window_energies(media_path)
+    else:
+        from audio_stream import stream_pcm
+        energies = stream_energies(stream_pcm(media_path, sample_rate), sample_rate)
+
+    regions = speech_regions(energies)
+    cues = align_sentences(split_sentences(transcript), regions)
+    return {
+        'cues': cues,
+        'speech_regions': [[round(float(start), 3), round(float(end), 3)] for start, end in regions],
+        'duration': round(len(energies) * WINDOW_SECONDS, 3)
+    }
+
+def align_to_captions(media_path: str, transcript: str, output_path: str,
+                      format_type: str = 'srt') -> Dict:
+    """Align a transcript to a recording and write timed SRT/VTT captions"""
+    result = align_transcript(media_path, transcript)
+    write_captions(result['cues'], output_path, format_type)
+    logging.info(f"Caption file created: {output_path} ({len(result['cues'])} cues, "
+                 f"{len(result['speech_regions'])} speech regions)")
+    return dict(result, output=output_path)
@@ -0,0 +1,183 @@
+# Site-wide alt text consistency index with perceptual-hash image grouping
+import json
+import os
+from typing import Dict, List, Optional
+
+from asset_cache import write_json_atomic
+from image_assets import DEFAULT_METADATA_CACHE, ImageMetadataCache
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None
+
+def perceptual_hash(path: str, metadata_cache: Optional[ImageMetadataCache] = None) -> Optional[str]:
+    """
+    64-bit difference hash (dHash) of an image, computed once per file
+    content and stored alongside its header metadata. Identical images
+    re-encoded or copied under different names share the same hash.
+    Returns None when the image cannot be decoded (e.g. SVG), is a flat fill,
+    or numpy/Pillow are unavailable.
+    """
+    cache = metadata_cache or DEFAULT_METADATA_CACHE
+    digest = cache.digest(path)
+    if digest not in cache.images:
+        cache.get(path)
+    metadata = cache.images[digest]
+    if 'phash' in metadata:
+        return metadata['phash']
+
+    phash = None
+    if np is not None and Image is not None:
+        try:
+            with Image.open(path) as img:
+                img.draft('L', (64, 64))
+                pixels = np.asarray(img.convert('L').resize((9, 8), Image.BILINEAR), dtype=np.int16)
+            bits = (pixels[:, 1:] > pixels[:, :-1]).ravel()
+            # Flat images (solid fills, spacers) have no gradients to compare
+            # and would all collide on the same hash
+            if 0 < bits.sum() < bits.size:
+                phash = f"{int(np.packbits(bits).view('>u8')[0]):016x}"
+        except (OSError, ValueError):
+            phash = None
+
+    metadata['phash'] = phash
+    return phash
+
+def _normalize_alt(alt: Optional[str]) -> Optional[str]:
+    return ' '.join(alt.lower().split()) if alt is not None else None
+
+class AltTextIndex:
+    """
+    Index of every image occurrence across pages, grouped by image identity
+    (perceptual hash, falling back to content hash or the src itself).
+
+    Pages are added incrementally: update_page() removes the page's previous
+    occurrences from their groups and adds the new ones, so the cost is
+    proportional to the page, never to the whole index. With a state_path the
+    index is persisted between runs.
+    """
+
+    def __init__(self, state_path: Optional[str] = None,
+                 metadata_cache: Optional[ImageMetadataCache] = None):
+        self.state_path = state_path
+        self.metadata_cache = metadata_cache or DEFAULT_METADATA_CACHE
+        # page id -> {'digest': page content hash, 'entries': [[group, alt, src], ...]}
+        self.pages: Dict[str, Dict] = {}
+        # group key -> {page id: [alt, ...]}
+        self.groups: Dict[str, Dict[str, List[Optional[str]]]] = {}
+        # group key -> representative asset path or src
+        self.group_assets: Dict[str, str] = {}
+
+        if state_path and os.path.exists(state_path):
+            try:
+                with open(state_path, 'r', encoding='utf-8') as f:
+                    stored = json.load(f)
+                self.pages = stored.get('pages', {})
+                self.groups = stored.get('groups', {})
+                self.group_assets = stored.get('group_assets', {})
+            except (OSError, ValueError):
+                pass
+
+    def group_key(self, image: Dict) -> str:
+        """Identity of an analyzed image: perceptual hash > content hash > src"""
+        asset = image.get('asset')
+        if asset and asset.get('path'):
+            phash = perceptual_hash(asset['path'], self.metadata_cache)
+            if phash:
+                return f"phash:{phash}"
+            if asset.get('digest'):
+                return f"sha1:{asset['digest']}"
+        return f"src:{image.get('src', '')}"
+
+    def _is_current(self, page_id: str, page_digest: Optional[str]) -> bool:
+        """True if the page was indexed from the same content and assets"""
+        return page_digest is not None and self.pages.get(page_id, {}).get('digest') == page_digest
+
+    def remove_page(self, page_id: str) -> None:
+        previous = self.pages.pop(page_id, None)
+        if not previous:
+            return
+        for group, _alt, _src in previous['entries']:
+            occurrences = self.groups.get(group)
+            if occurrences is None:
+                continue
+            occurrences.pop(page_id, None)
+            if not occurrences:
+                del self.groups[group]
+                self.group_assets.pop(group, None)
+
+    def update_page(self, page_id: str, images: List[Dict], page_digest: Optional[str] = None) -> None:
+        """Replace a page's image occurrences with a fresh analysis"""
+        if page_digest is not None:
+            # A page is unchanged only if its markup and every referenced asset are
+            asset_digests = [(image.get('asset') or {}).get('digest') or '' for image in images]
+            page_digest = ':'.join([page_digest] + asset_digests)
+        if self._is_current(page_id, page_digest):
+            return
+        self.remove_page(page_id)
+
+        entries = []
+        for image in images:
+            if not image.get('src'):
+                continue
+            group = self.group_key(image)
+            alt = image.get('alt_text')
+            entries.append([group, alt, image['src']])
+            self.groups.setdefault(group, {}).setdefault(page_id, []).append(alt)
+            asset = image.get('asset') or {}
+            self.group_assets.setdefault(group, asset.get('path') or image['src'])
+
+        self.pages[page_id] = {'digest': page_digest, 'entries': entries}
+
+    def inconsistencies(self) -> List[Dict]:
+        """Images used with different (or missing) alt text on different occurrences"""
+        from image_alt_checker import ImageAccessibilityAnalyzer
+
+        report = []
+        for group, occurrences in self.groups.items():
+            variants: Dict[Optional[str], Dict] = {}
+            for page_id, alts in occurrences.items():
+                for alt in alts:
+                    key = _normalize_alt(alt)
+                    variant = variants.setdefault(key, {'alt_text': alt, 'pages': []})
+                    if page_id not in variant['pages']:
+                        variant['pages'].append(page_id)
+
+            if len(variants) < 2:
+                continue
+
+            asset = self.group_assets.get(group, '')
+            for variant in variants.values():
+                # Memoized per (alt text, file name): shared with the per-page analysis
+                quality = ImageAccessibilityAnalyzer._assess_alt_quality(variant['alt_text'], asset)
+                variant['quality_score'] = quality['score']
+
+            report.append({
+                'image': asset,
+                'group': group,
+                'pages': len(occurrences),
+                'missing_alt_on': sorted(variants.get(None, {}).get('pages', [])),
+                'variants': sorted(variants.values(), key=lambda v: -len(v['pages']))
+            })
+
+        return sorted(report, key=lambda r: -r['pages'])
+
+    def report(self) -> Dict:
+        inconsistent = self.inconsistencies()
+        return {
+            'pages_indexed': len(self.pages),
+            'unique_images': len(self.groups),
+            'inconsistent_images': len(inconsistent),
+            'inconsistencies': inconsistent
+        }
+
+    def save(self) -> None:
+        if not self.state_path:
+            return
+        write_json_atomic(self.state_path, {'pages': self.pages, 'groups': self.groups, 'group_assets': self.group_assets})
@@ -0,0 +1,201 @@
+# HTML documents streamed out of tar, zip and WARC archives, one member at a time
+import gzip
+import queue
+import tarfile
+import threading
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+HTML_SUFFIXES = ('.html', '.htm', '.xhtml')
+TAR_SUFFIXES = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+ZIP_SUFFIXES = ('.zip',)
+WARC_SUFFIXES = ('.warc', '.warc.gz')
+ARCHIVE_SUFFIXES = TAR_SUFFIXES + ZIP_SUFFIXES + WARC_SUFFIXES
+
+_SKIP_CHUNK = 1 << 20
+
+@dataclass
+class ArchiveMember:
+    archive: str
+    name: str  # member path, or target URI for WARC records
+    data: bytes = b''
+    charset: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        """Stable identifier of the document: archive!member"""
+        return f"{self.archive}!{self.name}"
+
+    def text(self) -> str:
+        try:
+            return self.data.decode(self.charset or 'utf-8', errors='replace')
+        except LookupError:  # Unknown charset label
+            return self.data.decode('utf-8', errors='replace')
+
+def is_archive(path: str) -> bool:
+    return path.lower().endswith(ARCHIVE_SUFFIXES)
+
+def _is_html(name: str) -> bool:
+    return name.lower().endswith(HTML_SUFFIXES)
+
+def iter_tar(path: str) -> Iterator[ArchiveMember]:
+    """Stream mode: members are decompressed in order and never seeked back to"""
+    with tarfile.open(path, 'r|*') as tar:
+        for info in tar:
+            if info.isfile() and _is_html(info.name):
+                handle = tar.extractfile(info)
+                if handle is not None:
+                    yield ArchiveMember(path, info.name, handle.read())
+
+def iter_zip(path: str) -> Iterator[ArchiveMember]:
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            if not info.is_dir() and _is_html(info.filename):
+                yield ArchiveMember(path, info.filename, archive.read(info))
+
+def _read_headers(stream: BinaryIO, skip_blank: bool = False) -> Tuple[Optional[bytes], Dict[str, str], int]:
+    """First line, lower-cased header map and bytes consumed, up to the blank line"""
+    first = stream.readline()
+    consumed = len(first)
+    while skip_blank and first in (b'\r\n', b'\n'):
+        first = stream.readline()
+        consumed += len(first)
+    if not first:
+        return None, {}, consumed
+    headers = {}
+    while True:
+        line = stream.readline()
+        consumed += len(line)
+        if not line or line in (b'\r\n', b'\n'):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    return (first.strip() or None), headers, consumed
+
+def _skip(stream: BinaryIO, length: int) -> None:
+    while length > 0:
+        chunk = stream.read(min(length, _SKIP_CHUNK))
+        if not chunk:
+            return
+        length -= len(chunk)
+
+def _charset(content_type: str) -> Optional[str]:
+    for parameter in content_type.split(';')[1:]:
+        name, _, value = parameter.partition('=')
+        if name.strip().lower() == 'charset':
+            return value.strip().strip('"\'') or None
+    return None
+
+def _dechunk(body: bytes) -> bytes:
+    parts, position = [], 0
+    while position < len(body):
+        end = body.find(b'\r\n', position)
+        if end < 0:
+            break
+        size = int(body[position:end].split(b';')[0] or b'0', 16)
+        if size == 0:
+            break
+        parts.append(body[end + 2:end + 2 + size])
+        position = end + 2 + size + 2
+    return b''.join(parts)
+
+def _decode_http_body(body: bytes, headers: Dict[str, str]) -> bytes:
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        body = _dechunk(body)
+    encoding = headers.get('content-encoding', '').lower()
+    if encoding in ('gzip', 'x-gzip'):
+        body = zlib.decompress(body, 16 + zlib.MAX_WBITS)
+    elif encoding == 'deflate':
+        body = zlib.decompress(body)
+    return body
+
+def iter_warc(path: str) -> Iterator[ArchiveMember]:
+    """
+    HTML responses and resources of a WARC file (plain or per-record gzip).
+    Records are read sequentially; non-HTML payloads are skipped in chunks
+    without being held in memory.
+    """
+    opener = gzip.open if path.lower().endswith('.gz') else open
+    with opener(path, 'rb') as stream:
+        while True:
+            version, headers, _ = _read_headers(stream, skip_blank=True)
+            if version is None:
+                return  # End of file
+            length = int(headers.get('content-length', '0'))
+            record_type = headers.get('warc-type', '')
+            uri = headers.get('warc-target-uri', '').strip('<>')
+
+            if record_type == 'response' and headers.get('content-type', '').startswith('application/http'):
+                status, http_headers, consumed = _read_headers(stream)
+                content_type = http_headers.get('content-type', '')
+                successful = status is not None and status.split(b' ')[1:2] == [b'200']
+                if successful and 'html' in content_type.lower():
+                    body = _decode_http_body(stream.read(length - consumed), http_headers)
+                    yield ArchiveMember(path, uri, body, _charset(content_type))
+                else:
+                    _skip(stream, length - consumed)
+            elif record_type == 'resource' and 'html' in headers.get('content-type', '').lower():
+                yield ArchiveMember(path, uri, stream.read(length), _charset(headers['content-type']))
+            else:
+                _skip(stream, length)
+
+def iter_archive(path: str) -> Iterator[ArchiveMember]:
+    lowered = path.lower()
+    if lowered.endswith(WARC_SUFFIXES):
+        return iter_warc(path)
+    if lowered.endswith(ZIP_SUFFIXES):
+        return iter_zip(path)
+    if lowered.endswith(TAR_SUFFIXES):
+        return iter_tar(path)
+    raise ValueError(f"Unsupported archive type: {path}")
+
+def read_archives(paths: List[str], readers: Optional[int] = None, max_pending: int = 8) -> Iterator[ArchiveMember]:
+    """
+    HTML members of several archives, read concurrently by one thread per
+    archive (decompression releases the GIL, so it overlaps with analysis of
+    the members already yielded). At most max_pending members wait in the
+    queue, so memory is bounded by a small multiple of the largest member.
+    A failing archive yields a single member with `error` set.
+    """
+    if not paths:
+        return
+    pending: queue.Queue = queue.Queue(maxsize=max_pending)
+    stop = threading.Event()
+    finished = object()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                pending.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def read(path: str) -> None:
+        try:
+            for member in iter_archive(path):
+                if not put(member):
+                    return
+        except Exception as e:
+            put(ArchiveMember(path, '', error=f"Could not read archive: {e}"))
+        finally:
+            put(finished)
+
+    with ThreadPoolExecutor(max_workers=readers or min(len(paths), 4)) as pool:
+        for path in paths:
+            pool.submit(read, path)
+        try:
+            remaining = len(paths)
+            while remaining:
+                item = pending.get()
+                if item is finished:
+                    remaining -= 1
+                else:
+                    yield item
+        finally:
+            stop.set()  # Unblock readers if the consumer stops early
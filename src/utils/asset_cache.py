@@ -0,0 +1,53 @@
+# Content-hash helpers shared by the asset-level accessibility checks
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+# Absolute path -> (size, mtime_ns, digest)
+_DIGEST_CACHE: Dict[str, Tuple[int, int, str]] = {}
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Return the SHA-1 of a file's contents.
+    Digests are memoized by (size, mtime) so unchanged files are hashed once
+    per process no matter how many pages reference them.
+    """
+    key = os.path.abspath(path)
+    stat = os.stat(key)
+    
+    cached = _DIGEST_CACHE.get(key)
+    if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+        return cached[2]
+    
+    digest = hashlib.sha1()
+    with open(key, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    
+    _DIGEST_CACHE[key] = (stat.st_size, stat.st_mtime_ns, digest.hexdigest())
+    return _DIGEST_CACHE[key][2]
+
+def file_identity(path: str) -> str:
+    """
+    Identify a file by absolute path, size and modification time, without
+    reading it. Keys resumable state of large media, where hashing the
+    content would cost a full extra read before any work starts.
+    """
+    key = os.path.abspath(path)
+    stat = os.stat(key)
+    return f"{key}:{stat.st_size}:{stat.st_mtime_ns}"
+
+def write_atomic(path: str, content: str) -> None:
+    """Write a text file through a temporary file and rename, so readers never see partial output"""
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_name(f".{target.name}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, target)
+
+def write_json_atomic(path: str, data: Any, indent: Optional[int] = None) -> None:
+    """Persist a cache or state file atomically, so an interrupted run never leaves it truncated"""
+    write_atomic(path, json.dumps(data, indent=indent))
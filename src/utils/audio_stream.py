@@ -0,0 +1,60 @@
+# Streaming audio extraction: PCM piped from an ffmpeg subprocess in fixed-size chunks
+import shutil
+import subprocess
+import threading
+from collections import deque
+from typing import Iterator, Optional
+
+# Rate expected by the speech recognizers
+DEFAULT_SAMPLE_RATE = 16000
+
+def ffmpeg_command(media_path: str, sample_rate: int = DEFAULT_SAMPLE_RATE, ffmpeg: str = 'ffmpeg') -> list:
+    """Decode the first audio track, downmixed to mono 16-bit PCM at sample_rate, to stdout"""
+    return [
+        ffmpeg, '-nostdin', '-hide_banner', '-loglevel', 'error',
+        '-i', media_path, '-vn', '-map', '0:a:0',
+        '-ac', '1', '-ar', str(sample_rate), '-f', 's16le', '-acodec', 'pcm_s16le', 'pipe:1'
+    ]
+
+def stream_pcm(media_path: str,
+               sample_rate: int = DEFAULT_SAMPLE_RATE,
+               chunk_seconds: float = 1.0,
+               ffmpeg: Optional[str] = None) -> Iterator[bytes]:
+    """
+    Yield mono 16-bit little-endian PCM in chunks of chunk_seconds (the last
+    one may be shorter). Nothing is written to disk and only one chunk plus
+    the pipe buffer is held in memory; stopping iteration terminates ffmpeg.
+    """
+    ffmpeg = ffmpeg or shutil.which('ffmpeg')
+    if not ffmpeg:
+        raise FileNotFoundError("ffmpeg not found on PATH; it is required for streaming audio extraction")
+
+    chunk_size = max(int(sample_rate * chunk_seconds), 1) * 2
+    process = subprocess.Popen(
+        ffmpeg_command(media_path, sample_rate, ffmpeg),
+        stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=chunk_size
+    )
+
+    # Drain stderr concurrently so a chatty ffmpeg can never block on a full pipe
+    errors = deque(maxlen=20)
+    drain = threading.Thread(target=lambda: errors.extend(process.stderr), daemon=True)
+    drain.start()
+
+    finished = False
+    try:
+        while True:
+            chunk = process.stdout.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+        finished = True
+    finally:
+        if not finished:
+            process.kill()
+        process.stdout.close()
+        return_code = process.wait()
+        drain.join(timeout=1.0)
+
+    if return_code != 0:
+        message = b''.join(errors).decode('utf-8', 'replace').strip()
+        raise RuntimeError(f"ffmpeg failed for {media_path} (exit {return_code}): {message}")
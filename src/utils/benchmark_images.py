@@ -0,0 +1,142 @@
+# Benchmark of the image check on generated pages with many images
+import argparse
+import os
+import re
+import struct
+import tempfile
+import time
+import zlib
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+import asset_cache
+from image_alt_checker import ImageAccessibilityAnalyzer
+from image_assets import ImageMetadataCache
+
+_NAMES = ['hero', 'team-photo', 'sales-chart', 'divider', 'bullet', 'product', 'site-map', 'avatar', 'texture']
+_ALTS = [None, '', 'Image of our team', 'image1', 'Quarterly revenue by region', 'logo.png',
+         'A volunteer reading to children', 'placeholder', 'Flowchart of the signup process']
+_CLASSES = ['', 'rounded', 'icon-only', 'shadow background', 'w-full']
+
+def _png(width: int, height: int) -> bytes:
+    """Smallest valid PNG: signature, IHDR and an empty IEND"""
+    ihdr = struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)
+    chunk = lambda kind, data: (struct.pack('>I', len(data)) + kind + data
+                                + struct.pack('>I', zlib.crc32(kind + data) & 0xFFFFFFFF))
+    return b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', ihdr) + chunk(b'IEND', b'')
+
+def generate_page(images: int, asset_dir: Optional[str] = None) -> str:
+    """A page with the given number of <img> elements cycling through names, alt texts and classes"""
+    tags = []
+    for i in range(images):
+        src = f'img/{_NAMES[i % len(_NAMES)]}-{i}.png'
+        alt = _ALTS[i % len(_ALTS)]
+        alt_attr = '' if alt is None else f' alt="{alt}"'
+        tags.append(f'<img src="{src}" class="{_CLASSES[i % len(_CLASSES)]}"{alt_attr}>')
+        if asset_dir is not None:
+            size = 1 if i % 9 == 3 else 200 + (i % 5) * 400
+            path = Path(asset_dir) / src
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(_png(size, size))
+    return f'<html><body><main>{"".join(tags)}</main></body></html>'
+
+def _baseline_heuristics(img, src: str, alt: Optional[str]) -> Tuple[bool, bool, Dict]:
+    """The per-pattern loops the compiled matchers replaced, kept as the reference"""
+    analyzer = ImageAccessibilityAnalyzer
+    filename = os.path.basename(src).lower() if src else ''
+    img_classes = ' '.join(img.get('class', [])).lower()
+    decorative = alt == '' or any(re.search(p, filename) for p in analyzer.DECORATIVE_PATTERNS) or any(
+        p in img_classes for p in analyzer.DECORATIVE_PATTERNS)
+    content = f"{src} {alt or ''}".lower()
+    complex_image = bool(src or alt) and any(t in content for t in analyzer.COMPLEX_IMAGE_TYPES)
+
+    if not alt:
+        return decorative, complex_image, {'score': 0, 'issues': ['Missing alt text']}
+    issues, score, alt_lower = [], 10, alt.lower()
+    if len(alt) > 125:
+        issues.append("Too long (>125 characters)")
+        score -= 3
+    elif len(alt) < 3:
+        issues.append("Too short")
+        score -= 2
+    for phrase in sorted(analyzer.REDUNDANT_PHRASES, key=len, reverse=True):
+        if alt_lower.startswith(phrase):
+            issues.append(f"Starts with redundant phrase: '{phrase}'")
+            score -= 2
+            break
+    if filename and alt_lower == os.path.splitext(filename)[0]:
+        issues.append("Alt text is just filename")
+        score -= 4
+    if any(re.fullmatch(p, alt_lower) for p in analyzer.PLACEHOLDER_PATTERNS):
+        issues.append("Appears to be placeholder text")
+        score -= 5
+    return decorative, complex_image, {'score': max(0, score), 'issues': issues, 'length': len(alt)}
+
+def _compiled_heuristics(img, src: str, alt: Optional[str]) -> Tuple[bool, bool, Dict]:
+    analyzer = ImageAccessibilityAnalyzer
+    return (analyzer._is_likely_decorative(img, src, alt), analyzer._is_complex_image(src, alt),
+            analyzer._assess_alt_quality(alt, src))
+
+def _best_of(repeat: int, run: Callable[[], object]) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def benchmark_heuristics(images: int, repeat: int = 5) -> Dict[str, float]:
+    """Seconds per pass of the decorative/complex/alt-quality rules over every image of a page"""
+    imgs = BeautifulSoup(generate_page(images), 'html.parser').find_all('img')
+    inputs = [(img, img.get('src', ''), img.get('alt')) for img in imgs]
+    baseline = [_baseline_heuristics(*args) for args in inputs]
+    compiled = [_compiled_heuristics(*args) for args in inputs]
+    assert baseline == compiled, "compiled matchers disagree with the per-pattern rules"
+
+    def run_compiled():
+        ImageAccessibilityAnalyzer._assess_alt_text.cache_clear()
+        for args in inputs:
+            _compiled_heuristics(*args)
+    return {
+        'per_pattern': _best_of(repeat, lambda: [_baseline_heuristics(*args) for args in inputs]),
+        'compiled': _best_of(repeat, run_compiled),
+    }
+
+def benchmark_metadata_cache(images: int) -> Dict[str, float]:
+    """Seconds for a full image check of a page whose images exist on disk, without and with the metadata cache"""
+    with tempfile.TemporaryDirectory() as root:
+        html = generate_page(images, root)
+        resolve = lambda src: os.path.join(root, src)
+        cache_path = os.path.join(root, 'image-metadata.json')
+
+        def run(cache: ImageMetadataCache) -> float:
+            # A fresh process: no digests memoized in memory
+            asset_cache._DIGEST_CACHE.clear()
+            start = time.perf_counter()
+            ImageAccessibilityAnalyzer.analyze_images_in_html(html, resolve, cache)
+            return time.perf_counter() - start
+
+        uncached = run(ImageMetadataCache())
+        cold_cache = ImageMetadataCache(cache_path)
+        cold = run(cold_cache)
+        cold_cache.save()
+        warm = run(ImageMetadataCache(cache_path))
+    return {'no_cache': uncached, 'cold_cache': cold, 'warm_cache': warm}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the image check on generated pages")
+    parser.add_argument("--images", type=int, default=10000, help="Images per page (default: 10000)")
+    parser.add_argument("--repeat", type=int, default=5, help="Passes per heuristics timing; the best is kept")
+    args = parser.parse_args()
+
+    print(f"Rule heuristics, {args.images} images (best of {args.repeat}):")
+    for name, seconds in benchmark_heuristics(args.images, args.repeat).items():
+        print(f"  {name:<12} {seconds:.3f}s")
+    print(f"Full image check with local assets, {args.images} images:")
+    for name, seconds in benchmark_metadata_cache(args.images).items():
+        print(f"  {name:<12} {seconds:.3f}s")
+
+if __name__ == "__main__":
+    main()
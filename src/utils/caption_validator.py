@@ -0,0 +1,386 @@
+# WebVTT / SRT caption files: streaming parser, readability checks and a cue time index
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+from asset_cache import file_digest, write_json_atomic
+from captions import Cue
+from dom_index import DocumentIndex
+
+# Readability limits commonly used for closed captions
+MAX_LINE_CHARS = 42
+MAX_CUE_LINES = 2
+MIN_CUE_SECONDS = 0.7
+MAX_CUE_SECONDS = 7.0
+MAX_CHARS_PER_SECOND = 20.0
+
+# Bump when the checks change so cached caption reports are recomputed
+VALIDATOR_VERSION = 1
+
+_TIMESTAMP_PATTERNS = {
+    'vtt': re.compile(r'(?:(\d{2,}):)?([0-5]\d):([0-5]\d)\.(\d{3})'),
+    'srt': re.compile(r'(\d{2,}):([0-5]\d):([0-5]\d),(\d{3})'),
+}
+_TIMING_LINE = re.compile(r'^(\S+)[ \t]+-->[ \t]+(\S+)(.*)$')
+_VTT_TAG = re.compile(r'<[^>]*>')
+_VTT_HEADER = re.compile(r'^WEBVTT([ \t].*)?$')
+
+# Tracks that carry text alternatives for the audio
+CAPTION_TRACK_KINDS = {'captions', 'subtitles'}
+
+@dataclass
+class TimedCue(Cue):
+    line: int = 0  # line of the timing line in the source file
+    identifier: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        return round(self.end - self.start, 3)  # Timestamps have millisecond precision
+
+    @property
+    def lines(self) -> List[str]:
+        return self.text.split('\n') if self.text else []
+
+    @property
+    def plain_text(self) -> str:
+        """Text as read on screen: markup removed, lines joined"""
+        return ' '.join(_VTT_TAG.sub('', line).strip() for line in self.lines).strip()
+
+@dataclass
+class CaptionFile:
+    format_type: str
+    cues: List[TimedCue] = field(default_factory=list)
+    findings: List[Dict] = field(default_factory=list)
+    _index: Optional['CueIndex'] = field(default=None, repr=False)
+
+    @property
+    def index(self) -> 'CueIndex':
+        if self._index is None:
+            self._index = CueIndex(self.cues)
+        return self._index
+
+def parse_timestamp(value: str, format_type: str) -> Optional[float]:
+    """Seconds for an SRT (HH:MM:SS,mmm) or WebVTT ([HH:]MM:SS.mmm) timestamp"""
+    match = _TIMESTAMP_PATTERNS[format_type].fullmatch(value)
+    if match is None:
+        return None
+    hours, minutes, seconds, millis = match.groups()
+    return int(hours or 0) * 3600 + int(minutes) * 60 + int(seconds) + int(millis) / 1000
+
+def _blocks(lines: Iterable[str]) -> Iterator[Tuple[int, List[str]]]:
+    """(first line number, lines) of each blank-line separated block"""
+    block, first = [], 0
+    for number, line in enumerate(lines, 1):
+        line = line.rstrip('\r\n')
+        if number == 1:
+            line = line.lstrip('\ufeff')
+        if line.strip():
+            if not block:
+                first = number
+            block.append(line)
+        elif block:
+            yield first, block
+            block = []
+    if block:
+        yield first, block
+
+def iter_cues(lines: Iterable[str], findings: List[Dict], format_type: Optional[str] = None) -> Iterator[TimedCue]:
+    """
+    Parse cues from an iterable of lines, one block at a time, so a file is
+    never held in memory. Syntax problems are appended to findings.
+    The format is detected from the WEBVTT header when not given.
+    """
+    blocks = _blocks(lines)
+    first = next(blocks, None)
+    if first is None:
+        findings.append({'severity': 'error', 'message': 'Caption file is empty', 'line': 1})
+        return
+
+    has_header = _VTT_HEADER.match(first[1][0]) is not None
+    format_type = format_type or ('vtt' if has_header else 'srt')
+    if format_type == 'vtt':
+        if has_header:
+            first = None  # The header block carries no cues
+        else:
+            findings.append({'severity': 'error', 'message': 'Missing WEBVTT header', 'line': first[0]})
+
+    def all_blocks():
+        if first is not None:
+            yield first
+        yield from blocks
+
+    for start_line, block in all_blocks():
+        if format_type == 'vtt' and block[0].split(' ', 1)[0] in ('NOTE', 'STYLE', 'REGION'):
+            continue
+        timing_at = 0 if '-->' in block[0] else 1
+        if timing_at >= len(block) or '-->' not in block[timing_at]:
+            findings.append({'severity': 'error', 'message': 'Cue block without a timing line', 'line': start_line})
+            continue
+
+        line = start_line + timing_at
+        match = _TIMING_LINE.match(block[timing_at].strip())
+        start = end = None
+        if match:
+            start = parse_timestamp(match.group(1), format_type)
+            end = parse_timestamp(match.group(2), format_type)
+        if start is None or end is None:
+            findings.append({
+                'severity': 'error',
+                'message': f'Malformed {format_type.upper()} timing "{block[timing_at].strip()}"',
+                'line': line
+            })
+            continue
+
+        identifier = block[0].strip() if timing_at else None
+        yield TimedCue(start, end, '\n'.join(text.strip() for text in block[timing_at + 1:]), line, identifier)
+
+def validate_cues(cues: Iterable[TimedCue], findings: List[Dict]) -> Iterator[TimedCue]:
+    """
+    Pass cues through while checking ordering, overlap, duration, reading
+    speed and line layout. Runs in the same single pass as the parser.
+    """
+    previous_start, latest_end = None, None
+    for cue in cues:
+        def report(severity: str, message: str) -> None:
+            findings.append({'severity': severity, 'message': message, 'line': cue.line})
+
+        duration = cue.duration
+        if duration <= 0:
+            report('error', f'Cue ends at or before it starts ({cue.start:.3f}s --> {cue.end:.3f}s)')
+        elif duration < MIN_CUE_SECONDS:
+            report('warning', f'Cue is shown for only {duration:.2f}s (minimum {MIN_CUE_SECONDS}s)')
+        elif duration > MAX_CUE_SECONDS:
+            report('warning', f'Cue is shown for {duration:.1f}s (maximum {MAX_CUE_SECONDS}s)')
+
+        if previous_start is not None and cue.start < previous_start:
+            report('error', f'Cue at {cue.start:.3f}s starts before the previous cue ({previous_start:.3f}s)')
+        elif latest_end is not None and cue.start < latest_end:
+            report('warning', f'Cue at {cue.start:.3f}s overlaps a cue that ends at {latest_end:.3f}s')
+
+        text = cue.plain_text
+        if not text:
+            report('warning', 'Cue has no text')
+        elif duration > 0:
+            cps = len(text) / duration
+            if cps > MAX_CHARS_PER_SECOND:
+                report('warning', f'Reading speed {cps:.1f} characters/second exceeds {MAX_CHARS_PER_SECOND:g}')
+
+        lines = cue.lines
+        if len(lines) > MAX_CUE_LINES:
+            report('warning', f'Cue has {len(lines)} lines (maximum {MAX_CUE_LINES})')
+        longest = max((len(_VTT_TAG.sub('', line)) for line in lines), default=0)
+        if longest > MAX_LINE_CHARS:
+            report('warning', f'Caption line has {longest} characters (maximum {MAX_LINE_CHARS})')
+
+        previous_start = cue.start if previous_start is None else max(previous_start, cue.start)
+        latest_end = cue.end if latest_end is None else max(latest_end, cue.end)
+        yield cue
+
+def parse_caption_file(path: str, format_type: Optional[str] = None) -> CaptionFile:
+    """Parse and validate a .vtt or .srt file, streaming it line by line"""
+    findings: List[Dict] = []
+    with open(path, 'r', encoding='utf-8-sig', errors='replace') as f:
+        if format_type is None:
+            has_header = _VTT_HEADER.match(f.readline().rstrip('\n')) is not None
+            format_type = 'vtt' if has_header or path.lower().endswith('.vtt') else 'srt'
+            f.seek(0)
+        cues = list(validate_cues(iter_cues(f, findings, format_type), findings))
+    findings.sort(key=lambda finding: finding['line'])
+    return CaptionFile(format_type, cues, findings)
+
+class CueIndex:
+    """
+    Centered interval tree over cues. Each node holds the cues on screen at
+    its center time, sorted by start and by end; earlier and later cues go
+    to its children. A lookup walks one root-to-leaf path and stops scanning
+    a node's lists at the first cue that does not match, so it costs
+    O(log n + k) for k results however long the longest cue is.
+    """
+
+    def __init__(self, cues: Iterable[Cue]):
+        self.cues = sorted(cues, key=lambda cue: (cue.start, cue.end))
+        # Nodes: [center, cues by start, cues by end (descending), left, right].
+        # Cues that end before they start are never on screen
+        self._root = self._build([cue for cue in self.cues if cue.end >= cue.start])
+
+    @staticmethod
+    def _build(cues: List[Cue]) -> Optional[list]:
+        if not cues:
+            return None
+        center = cues[len(cues) // 2].start
+        left, here, right = [], [], []
+        for cue in cues:
+            if cue.end <= center and cue.start < center:
+                left.append(cue)
+            elif cue.start > center:
+                right.append(cue)
+            else:
+                here.append(cue)
+        by_end = sorted(here, key=lambda cue: cue.end, reverse=True)
+        return [center, here, by_end, CueIndex._build(left), CueIndex._build(right)]
+
+    def __len__(self) -> int:
+        return len(self.cues)
+
+    def at(self, seconds: float) -> List[Cue]:
+        """Cues on screen at a moment (start inclusive, end exclusive)"""
+        return self.overlapping(seconds, seconds)
+
+    def overlapping(self, start: float, end: float) -> List[Cue]:
+        """Cues shown at any time within [start, end) (the moment start when end <= start)"""
+        point = end <= start
+        end = max(end, start)
+        if point:
+            starts_too_late = lambda cue: cue.start > start
+        else:
+            starts_too_late = lambda cue: cue.start >= end
+        found = []
+        pending = [self._root]
+        while pending:
+            node = pending.pop()
+            if node is None:
+                continue
+            center, by_start, by_end, left, right = node
+            if end <= center and start < center:
+                # Node cues end after the center: keep those starting in time
+                for cue in by_start:
+                    if starts_too_late(cue):
+                        break
+                    found.append(cue)
+                pending.append(left)
+            elif start >= center:
+                # Node cues start by the center: keep those still on screen
+                for cue in by_end:
+                    if cue.end <= start:
+                        break
+                    found.append(cue)
+                pending.append(right)
+            else:
+                found.extend(by_start)
+                pending.append(left)
+                pending.append(right)
+        found.sort(key=lambda cue: (cue.start, cue.end))
+        return found
+
+class CaptionReportCache:
+    """
+    Validation reports keyed by caption file content hash, validator version
+    and readability limits, persisted between runs when cache_path is given.
+    A track shared by several pages, or left unchanged since the last audit,
+    is parsed once; changing a limit revalidates it.
+    """
+
+    def __init__(self, cache_path: Optional[str] = None):
+        self.cache_path = cache_path
+        self.reports: Dict[str, Dict] = {}
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    self.reports = json.load(f).get('reports', {})
+            except (OSError, ValueError):
+                pass
+
+    @staticmethod
+    def _settings() -> str:
+        limits = (MAX_LINE_CHARS, MAX_CUE_LINES, MIN_CUE_SECONDS, MAX_CUE_SECONDS, MAX_CHARS_PER_SECOND)
+        return f"v{VALIDATOR_VERSION}:" + ':'.join(f'{limit:g}' for limit in limits)
+
+    def get(self, path: str) -> Dict:
+        key = f"{file_digest(path)}:{self._settings()}"
+        report = self.reports.get(key)
+        if report is None:
+            report = caption_file_report(parse_caption_file(path))
+            self.reports[key] = report
+        return report
+
+    def save(self) -> None:
+        if not self.cache_path:
+            return
+        write_json_atomic(self.cache_path, {'reports': self.reports})
+
+def caption_file_report(parsed: CaptionFile) -> Dict:
+    cues = parsed.cues
+    speeds = [len(cue.plain_text) / cue.duration for cue in cues if cue.duration > 0]
+    return {
+        'format': parsed.format_type,
+        'findings': parsed.findings,
+        'summary': {
+            'cues': len(cues),
+            'duration': max((cue.end for cue in cues), default=0.0),
+            'max_chars_per_second': round(max(speeds, default=0.0), 1),
+            'errors': sum(1 for f in parsed.findings if f['severity'] == 'error'),
+            'warnings': sum(1 for f in parsed.findings if f['severity'] == 'warning')
+        }
+    }
+
+def check_video_captions(html: str,
+                         resolve: Callable[[str], Optional[str]],
+                         cache: Optional[CaptionReportCache] = None,
+                         index: Optional[DocumentIndex] = None) -> Dict:
+    """
+    Validate the caption and subtitle tracks of every <video> on a page.
+    resolve maps a track src to a local file (None when it cannot be found).
+    Videos without such a track are reported unless they are muted.
+    index reuses an existing parse of the page.
+
+    Page findings cover the markup only. Problems inside a caption file are
+    summarised as one finding per track in track_findings, with the per-cue
+    detail under tracks[], so a long or shared track does not swamp the page.
+    """
+    cache = cache or CaptionReportCache()
+    if index is None:
+        index = DocumentIndex(BeautifulSoup(html, 'html.parser'))
+    videos, tracks, findings, track_findings = [], [], [], []
+
+    for video in (element for element in index.elements if element.name == 'video'):
+        line = getattr(video, 'sourceline', None)
+        caption_tracks = [
+            track for track in video.find_all('track')
+            if (track.get('kind') or 'subtitles').lower() in CAPTION_TRACK_KINDS
+        ]
+        videos.append({'line': line, 'tracks': len(caption_tracks)})
+        if not caption_tracks and not video.has_attr('muted'):
+            findings.append({'severity': 'error', 'message': '<video> has no captions or subtitles track', 'line': line})
+
+        for track in caption_tracks:
+            src = (track.get('src') or '').strip()
+            track_line = getattr(track, 'sourceline', None)
+            path = resolve(src) if src else None
+            if path is None:
+                message = f'Caption track "{src}" not found' if src else 'Caption track has no src'
+                findings.append({'severity': 'warning', 'message': message, 'line': track_line})
+                continue
+
+            report = cache.get(path)
+            summary = report['summary']
+            tracks.append({'src': src, 'file': path, 'line': track_line, 'format': report['format'],
+                           'summary': summary, 'findings': report['findings']})
+            if summary['errors'] or summary['warnings']:
+                track_findings.append({
+                    'severity': 'error' if summary['errors'] else 'warning',
+                    'message': (f"{src}: {summary['errors']} error(s) and {summary['warnings']} "
+                                f"warning(s) in {summary['cues']} cues"),
+                    'line': track_line,
+                    'file': path,
+                    'errors': summary['errors'],
+                    'warnings': summary['warnings']
+                })
+
+    return {
+        'videos': videos,
+        'tracks': tracks,
+        'findings': findings,
+        'track_findings': track_findings,
+        'summary': {
+            'videos': len(videos),
+            'tracks_validated': len(tracks),
+            'errors': sum(1 for f in findings if f['severity'] == 'error'),
+            'warnings': sum(1 for f in findings if f['severity'] == 'warning'),
+            'track_errors': sum(f['errors'] for f in track_findings),
+            'track_warnings': sum(f['warnings'] for f in track_findings)
+        }
+    }
@@ -0,0 +1,68 @@
+# Timed caption cues and SRT / WebVTT rendering
+from dataclasses import dataclass
+from typing import Iterable, List
+
+from asset_cache import write_atomic
+
+# Roughly two lines of 42 characters, the common caption line length
+MAX_CUE_CHARS = 84
+
+CAPTION_FORMATS = ('srt', 'vtt')
+
+@dataclass
+class Cue:
+    start: float  # seconds
+    end: float  # seconds
+    text: str
+
+def format_timestamp(seconds: float, format_type: str = 'srt') -> str:
+    """HH:MM:SS,mmm for SRT, HH:MM:SS.mmm for WebVTT"""
+    millis = int(round(max(seconds, 0.0) * 1000))
+    hours, millis = divmod(millis, 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    separator = ',' if format_type == 'srt' else '.'
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+def split_cue(start: float, end: float, text: str, max_chars: int = MAX_CUE_CHARS) -> List[Cue]:
+    """
+    Break a long transcript span into readable cues at word boundaries,
+    sharing the span's duration in proportion to each cue's length.
+    """
+    words = text.split()
+    if not words:
+        return []
+
+    chunks, current = [], []
+    for word in words:
+        if current and len(' '.join(current + [word])) > max_chars:
+            chunks.append(' '.join(current))
+            current = []
+        current.append(word)
+    chunks.append(' '.join(current))
+
+    total = sum(len(chunk) for chunk in chunks)
+    duration = max(end - start, 0.0)
+    cues, position = [], start
+    for chunk in chunks:
+        chunk_end = position + duration * len(chunk) / total
+        cues.append(Cue(position, chunk_end, chunk))
+        position = chunk_end
+    cues[-1].end = end
+    return cues
+
+def render_captions(cues: Iterable[Cue], format_type: str = 'srt') -> str:
+    format_type = format_type.lower()
+    if format_type not in CAPTION_FORMATS:
+        raise ValueError(f"Unsupported caption format: {format_type}")
+
+    blocks = ["WEBVTT\n"] if format_type == 'vtt' else []
+    for number, cue in enumerate(cues, 1):
+        timing = f"{format_timestamp(cue.start, format_type)} --> {format_timestamp(cue.end, format_type)}"
+        header = f"{number}\n" if format_type == 'srt' else ""
+        blocks.append(f"{header}{timing}\n{cue.text}\n")
+    return '\n'.join(blocks)
+
+def write_captions(cues: Iterable[Cue], output_path: str, format_type: str = 'srt') -> None:
+    """Render cues and write them atomically"""
+    write_atomic(output_path, render_captions(cues, format_type))
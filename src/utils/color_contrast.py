@@ -1,8 +1,31 @@
 # Enhanced color contrast analyzer with comprehensive WCAG support
 import colorsys
 import re
-from typing import Tuple, Dict, List, Optional, Union
+from functools import lru_cache
+from typing import Tuple, Dict, List, Optional, Union, Callable, Any
 import math
+from bs4 import BeautifulSoup, NavigableString
+
+from dom_index import NON_RENDERED_TAGS, DocumentIndex, parse_style as _parse_style_declarations
+
+# RGBA color with 0-255 float channels and 0-1 alpha
+RGBA = Tuple[float, float, float, float]
+# Fractional (left, top, right, bottom) region of an image layer, 0..1
+Box = Tuple[float, float, float, float]
+
+# Basic CSS named colors (CSS Color Module Level 4 basic keywords)
+CSS_NAMED_COLORS = {
+    'black': '#000000', 'silver': '#c0c0c0', 'gray': '#808080', 'grey': '#808080',
+    'white': '#ffffff', 'maroon': '#800000', 'red': '#ff0000', 'purple': '#800080',
+    'fuchsia': '#ff00ff', 'magenta': '#ff00ff', 'green': '#008000', 'lime': '#00ff00',
+    'olive': '#808000', 'yellow': '#ffff00', 'navy': '#000080', 'blue': '#0000ff',
+    'teal': '#008080', 'aqua': '#00ffff', 'cyan': '#00ffff', 'orange': '#ffa500',
+}
+
+_FUNCTIONAL_COLOR = re.compile(r'^(rgba?|hsla?)\(\s*(.*?)\s*\)$')
+_CSS_URL = re.compile(r'url\(\s*([\'"]?)(.*?)\1\s*\)')
+# Tailwind offsets and sizes with a fractional value: top-0, inset-x-0, w-1/2, h-full
+_FRACTION_UTILITY = re.compile(r'^(top|right|bottom|left|inset|inset-x|inset-y|w|h)-(0|full|\d+/\d+)$')
 
 class ColorContrastAnalyzer:
     """Enhanced color contrast analyzer following WCAG 2.1 guidelines"""
@@ -40,20 +63,121 @@ class ColorContrastAnalyzer:
         r, g, b = colorsys.hls_to_rgb(h, l, s)
         return (int(r * 255), int(g * 255), int(b * 255))
     
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def parse_color(value: str) -> Optional[RGBA]:
+        """
+        Parse a CSS color value into an RGBA tuple.
+        Supports #rgb/#rgba/#rrggbb/#rrggbbaa, rgb()/rgba(), hsl()/hsla()
+        (comma or space syntax, optional '/ alpha'), named colors and
+        'transparent'. Returns None for values that cannot be resolved
+        statically (currentColor, var(), gradients, ...).
+        """
+        value = value.strip().lower()
+        if not value:
+            return None
+        
+        if value == 'transparent':
+            return (0.0, 0.0, 0.0, 0.0)
+        
+        value = CSS_NAMED_COLORS.get(value, value)
+        
+        if value.startswith('#'):
+            digits = value[1:]
+            if len(digits) in (3, 4):
+                digits = ''.join(c * 2 for c in digits)
+            if len(digits) not in (6, 8):
+                return None
+            try:
+                channels = [int(digits[i:i + 2], 16) for i in range(0, len(digits), 2)]
+            except ValueError:
+                return None
+            alpha = channels[3] / 255.0 if len(channels) == 4 else 1.0
+            return (float(channels[0]), float(channels[1]), float(channels[2]), alpha)
+        
+        match = _FUNCTIONAL_COLOR.match(value)
+        if not match:
+            return None
+        
+        function, body = match.groups()
+        alpha_part = None
+        if '/' in body:
+            body, alpha_part = body.split('/', 1)
+        parts = [p for p in re.split(r'[\s,]+', body.strip()) if p]
+        if len(parts) == 4 and alpha_part is None:
+            alpha_part = parts.pop()
+        if len(parts) != 3:
+            return None
+        
+        def number(token: str, scale: float) -> float:
+            if token.endswith('%'):
+                return float(token[:-1]) * scale / 100.0
+            return float(token)
+        
+        try:
+            alpha = number(alpha_part.strip(), 1.0) if alpha_part else 1.0
+            if function.startswith('rgb'):
+                r, g, b = (number(p, 255.0) for p in parts)
+            else:
+                hue = float(parts[0].replace('deg', '')) % 360
+                sat = float(parts[1].rstrip('%'))
+                light = float(parts[2].rstrip('%'))
+                r, g, b = colorsys.hls_to_rgb(hue / 360.0, light / 100.0, sat / 100.0)
+                r, g, b = r * 255, g * 255, b * 255
+        except ValueError:
+            return None
+        
+        def clamp(c: float, upper: float) -> float:
+            return min(max(c, 0.0), upper)
+        
+        return (clamp(r, 255.0), clamp(g, 255.0), clamp(b, 255.0), clamp(alpha, 1.0))
+    
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def composite(top: RGBA, bottom: RGBA) -> RGBA:
+        """
+        Composite a translucent color over another (Porter-Duff source-over).
+        """
+        top_alpha = top[3]
+        if top_alpha >= 1.0:
+            return top
+        if top_alpha <= 0.0:
+            return bottom
+        
+        out_alpha = top_alpha + bottom[3] * (1 - top_alpha)
+        if out_alpha <= 0.0:
+            return (0.0, 0.0, 0.0, 0.0)
+        
+        def channel(i: int) -> float:
+            return (top[i] * top_alpha + bottom[i] * bottom[3] * (1 - top_alpha)) / out_alpha
+        
+        return (channel(0), channel(1), channel(2), out_alpha)
+    
+    @staticmethod
+    def to_rgba(color: Union[str, Tuple]) -> RGBA:
+        """Normalize a color string, RGB or RGBA tuple into an RGBA tuple"""
+        if isinstance(color, str):
+            rgba = ColorContrastAnalyzer.parse_color(color)
+            if rgba is None:
+                raise ValueError(f"Unsupported color format: {color}")
+            return rgba
+        if len(color) == 4:
+            return tuple(float(c) for c in color)
+        r, g, b = color
+        return (float(r), float(g), float(b), 1.0)
+    
     @staticmethod
     def get_luminance(color: Union[str, Tuple[int, int, int]]) -> float:
         """
         Calculate relative luminance according to WCAG 2.1
         https://www.w3.org/WAI/WCAG21/Understanding/contrast-minimum.html
+        
+        Translucent colors are composited over a white canvas first.
         """
-        if isinstance(color, str):
-            if color.startswith('#'):
-                r, g, b = ColorContrastAnalyzer.hex_to_rgb(color)
-            else:
-                # Handle CSS color names or other formats
-                raise ValueError(f"Unsupported color format: {color}")
-        else:
-            r, g, b = color
+        rgba = ColorContrastAnalyzer.to_rgba(color)
+        if rgba[3] < 1.0:
+            rgba = ColorContrastAnalyzer.composite(rgba, (255.0, 255.0, 255.0, 1.0))
+        r, g, b = rgba[:3]
         
         def linearize(c):
             c = c / 255.0
@@ -75,8 +199,15 @@ class ColorContrastAnalyzer:
         Calculate contrast ratio between two colors according to WCAG 2.1
         Returns a value between 1 (no contrast) and 21 (maximum contrast)
         """
-        luminance1 = ColorContrastAnalyzer.get_luminance(color1)
-        luminance2 = ColorContrastAnalyzer.get_luminance(color2)
+        # color2 is treated as the background: a translucent foreground is
+        # composited over it before measuring
+        background = ColorContrastAnalyzer.to_rgba(color2)
+        if background[3] < 1.0:
+            background = ColorContrastAnalyzer.composite(background, (255.0, 255.0, 255.0, 1.0))
+        foreground = ColorContrastAnalyzer.composite(ColorContrastAnalyzer.to_rgba(color1), background)
+        
+        luminance1 = ColorContrastAnalyzer.get_luminance(foreground)
+        luminance2 = ColorContrastAnalyzer.get_luminance(background)
         
         # Ensure lighter color is numerator
         lighter = max(luminance1, luminance2)
@@ -244,7 +375,308 @@ class ColorContrastAnalyzer:
         
         return colors_found
 
-def analyze_web_page_contrast(html_content: str, css_content: str = "") -> Dict:
+def inline_style_colors(element) -> Tuple[Optional[str], Optional[str]]:
+    """Return the (color, background) declared in an element's inline style"""
+    style = element.get('style')
+    if not style:
+        return None, None
+    
+    declarations = _parse_style_declarations(style)
+    background = declarations.get('background-color')
+    if background is None and 'background' in declarations:
+        # Shorthand: pick the first token that is a color
+        for token in re.findall(r'(?:rgba?|hsla?)\([^)]*\)|#[0-9a-fA-F]+|[a-zA-Z]+', declarations['background']):
+            if ColorContrastAnalyzer.parse_color(token) is not None:
+                background = token
+                break
+    
+    return declarations.get('color'), background
+
+def background_image_url(element) -> Optional[str]:
+    """Return the url() of an element's inline background-image, if any"""
+    style = element.get('style')
+    if not style or 'url(' not in style:
+        return None
+    
+    declarations = _parse_style_declarations(style)
+    value = declarations.get('background-image') or declarations.get('background') or ''
+    match = _CSS_URL.search(value)
+    return match.group(2) if match else None
+
+def _covers_parent(element) -> bool:
+    """Heuristic for absolutely positioned layers stretched over their parent"""
+    classes = element.get('class') or []
+    if 'absolute' in classes or 'fixed' in classes:
+        return 'inset-0' in classes or ('w-full' in classes and 'h-full' in classes)
+    
+    style = element.get('style')
+    if style:
+        declarations = _parse_style_declarations(style)
+        return declarations.get('position') in ('absolute', 'fixed') and declarations.get('inset') in ('0', '0px')
+    return False
+
+def _fraction(value: Optional[str]) -> Optional[float]:
+    """A CSS length as a fraction of the containing block: percentages and 0 only"""
+    if value is None:
+        return None
+    value = value.replace('!important', '').strip().lower()
+    if value in ('0', '0px', 'full'):
+        return 1.0 if value == 'full' else 0.0
+    try:
+        if value.endswith('%'):
+            return float(value[:-1]) / 100.0
+        if '/' in value:
+            numerator, denominator = value.split('/')
+            return int(numerator) / int(denominator)
+    except (ValueError, ZeroDivisionError):
+        pass
+    return None
+
+def _layer_box(element) -> Optional[Box]:
+    """
+    Fractional box of an absolutely positioned element within the layer it
+    is positioned against, from Tailwind fraction utilities or percentage
+    offsets in its inline style. None when the geometry is not known.
+    """
+    classes = element.get('class') or []
+    declarations = _parse_style_declarations(element.get('style') or '')
+    if not ('absolute' in classes or 'fixed' in classes
+            or declarations.get('position') in ('absolute', 'fixed')):
+        return None
+
+    edges: Dict[str, float] = {}
+    for class_name in classes:
+        match = _FRACTION_UTILITY.match(class_name)
+        if match:
+            utility, value = match.group(1), _fraction(match.group(2))
+            sides = {'inset': ('top', 'right', 'bottom', 'left'), 'inset-x': ('left', 'right'),
+                     'inset-y': ('top', 'bottom'), 'w': ('width',), 'h': ('height',)}.get(utility, (utility,))
+            edges.update((side, value) for side in sides)
+    inset = declarations.get('inset', '').split()
+    if inset:
+        # Shorthand clockwise from the top; missing sides mirror the opposite one
+        top = inset[0]
+        right = inset[1] if len(inset) > 1 else top
+        bottom = inset[2] if len(inset) > 2 else top
+        left = inset[3] if len(inset) > 3 else right
+        declarations = {'top': top, 'right': right, 'bottom': bottom, 'left': left, **declarations}
+    for side in ('top', 'right', 'bottom', 'left', 'width', 'height'):
+        value = _fraction(declarations.get(side))
+        if value is not None:
+            edges[side] = value
+
+    def span(start: str, end: str, size: str) -> Tuple[float, float]:
+        low, high, extent = edges.get(start), edges.get(end), edges.get(size)
+        high = 1.0 - high if high is not None else None
+        if low is None and high is not None and extent is not None:
+            low = high - extent
+        if high is None and low is not None and extent is not None:
+            high = low + extent
+        low = min(max(low if low is not None else 0.0, 0.0), 1.0)
+        high = min(max(high if high is not None else 1.0, low), 1.0)
+        return low, high
+
+    left, right = span('left', 'right', 'width')
+    top, bottom = span('top', 'bottom', 'height')
+    box = (left, top, right, bottom)
+    return None if box == (0.0, 0.0, 1.0, 1.0) or right <= left or bottom <= top else box
+
+def _within(outer: Optional[Box], inner: Box) -> Box:
+    """A box given relative to another, expressed in the outer layer's fractions"""
+    if outer is not None:
+        left, top, right, bottom = outer
+        width, height = right - left, bottom - top
+        inner = (left + inner[0] * width, top + inner[1] * height,
+                 left + inner[2] * width, top + inner[3] * height)
+    return tuple(round(edge, 4) for edge in inner)
+
+def resolve_element_colors(root,
+                           style_resolver: Callable[[Any], Tuple[Optional[str], Optional[str]]] = inline_style_colors,
+                           canvas: str = '#ffffff') -> List[Dict]:
+    """
+    Resolve the effective foreground and background of every text-bearing
+    element in a single top-down pass.
+    
+    Backgrounds are alpha-composited down the ancestor chain onto the first
+    opaque layer (the canvas at the root). Each element composites its own
+    layer once over its parent's already-resolved background, so siblings
+    share the parent's composite and deep stacks cost one step per level.
+    
+    Text that sits on a background image (inline background-image, or an
+    <img> stretched over its parent) is reported with the image source and
+    the translucent overlay composited above it instead of a flat background.
+    Absolutely positioned elements with known geometry (see _layer_box)
+    narrow the image region under their text; box is None when the text
+    could be anywhere over the image.
+    
+    style_resolver returns the (color, background) CSS values declared on an
+    element; the default reads inline styles.
+    """
+    canvas_rgba = ColorContrastAnalyzer.to_rgba(canvas)
+    black = (0.0, 0.0, 0.0, 1.0)
+    clear = (0.0, 0.0, 0.0, 0.0)
+    resolved = []
+    
+    # Stack entries: (element, inherited fg, parent background, layers, explicit,
+    # image layer as (src, overlay, box))
+    stack = [(child, black, canvas_rgba, 0, False, None)
+             for child in reversed(list(getattr(root, 'children', [])))]
+    
+    while stack:
+        element, parent_fg, parent_bg, layers, explicit, image = stack.pop()
+        if not hasattr(element, 'attrs') or element.name in NON_RENDERED_TAGS:
+            continue
+        
+        declared_fg, declared_bg = style_resolver(element)
+        fg = parent_fg
+        bg = parent_bg
+        
+        if declared_fg:
+            parsed = ColorContrastAnalyzer.parse_color(declared_fg)
+            if parsed is not None:
+                fg = parsed
+                explicit = True
+        
+        if declared_bg:
+            parsed = ColorContrastAnalyzer.parse_color(declared_bg)
+            if parsed is not None and parsed[3] > 0.0:
+                bg = ColorContrastAnalyzer.composite(parsed, parent_bg)
+                explicit = True
+                if parsed[3] < 1.0:
+                    layers += 1
+                    if image:
+                        image = (image[0], ColorContrastAnalyzer.composite(parsed, image[1]), image[2])
+                else:
+                    image = None
+        
+        if image:
+            box = _layer_box(element)
+            if box is not None:
+                image = (image[0], image[1], _within(image[2], box))
+        
+        image_url = background_image_url(element)
+        if image_url:
+            image = (image_url, clear, None)
+        
+        has_text = any(
+            type(child) is NavigableString and child.strip()
+            for child in element.children
+        )
+        if has_text:
+            resolved.append({
+                'element': element,
+                'foreground': ColorContrastAnalyzer.composite(fg, bg),
+                'text_color': fg,
+                'background': bg,
+                'background_image': {'src': image[0], 'overlay': image[1], 'box': image[2]} if image else None,
+                'translucent_layers': layers,
+                'explicit': explicit
+            })
+        
+        # Layers stretched over this element (a cover <img>, a tinted overlay
+        # div) sit behind the siblings that follow them
+        pending = []
+        child_bg, child_image = bg, image
+        for child in element.children:
+            if not hasattr(child, 'attrs'):
+                continue
+            pending.append((child, fg, child_bg, layers, explicit, child_image))
+            
+            if not _covers_parent(child):
+                continue
+            if child.name == 'img' and child.get('src'):
+                child_image = (child['src'], clear, None)
+            else:
+                overlay = style_resolver(child)[1]
+                parsed = ColorContrastAnalyzer.parse_color(overlay) if overlay else None
+                if parsed is not None and parsed[3] > 0.0:
+                    child_bg = ColorContrastAnalyzer.composite(parsed, child_bg)
+                    if parsed[3] >= 1.0:
+                        child_image = None
+                    elif child_image:
+                        child_image = (child_image[0], ColorContrastAnalyzer.composite(parsed, child_image[1]),
+                                       child_image[2])
+        
+        stack.extend(reversed(pending))
+    
+    return resolved
+
+def _rounded_hex(rgba: RGBA) -> str:
+    return ColorContrastAnalyzer.rgb_to_hex(tuple(int(round(c)) for c in rgba[:3]))
+
+def analyze_element_contrast(html_content: str,
+                             style_resolver: Callable[[Any], Tuple[Optional[str], Optional[str]]] = inline_style_colors,
+                             image_resolver: Optional[Callable[[str], Optional[str]]] = None,
+                             max_samples: int = 10,
+                             index: Optional[DocumentIndex] = None) -> List[Dict]:
+    """
+    Analyze the effective contrast of every element with explicit colors.
+    Elements are grouped by resolved color pair so each pair is analyzed once.
+    
+    Text over background images is sampled against the image pixels when
+    image_resolver maps the image src to a local file; text over images that
+    cannot be resolved is skipped rather than measured against a guess.
+    Only the region under the text is sampled when its geometry is known;
+    otherwise the result is marked image_wide.
+    index reuses an existing parse of the page.
+    """
+    soup = index.root if index is not None else BeautifulSoup(html_content, 'html.parser')
+    pairs: Dict[Tuple, Dict] = {}
+    
+    for entry in resolve_element_colors(soup, style_resolver):
+        image = entry['background_image']
+        if image:
+            image_path = image_resolver(image['src']) if image_resolver else None
+            if not image_path:
+                continue
+            box = image['box']
+            key = ('image', image_path, entry['text_color'], image['overlay'], box)
+            if key not in pairs:
+                try:
+                    from image_contrast import analyze_text_over_image
+                    analysis = analyze_text_over_image(image_path, entry['text_color'], box=box,
+                                                       overlay=image['overlay'])
+                except (ImportError, OSError):
+                    continue
+                analysis['source'] = 'text_over_image'
+                analysis['image'] = image['src']
+                # Without known geometry the whole image is sampled, so the
+                # worst case may come from pixels nowhere near the text
+                analysis['image_wide'] = box is None
+                analysis['text_color'] = _rounded_hex(entry['text_color'])
+                analysis['contrast_ratio'] = analysis['worst_case_ratio']
+                analysis['occurrences'] = 0
+                analysis['elements'] = []
+                pairs[key] = analysis
+        else:
+            if not entry['explicit']:
+                continue
+            fg_hex = _rounded_hex(entry['foreground'])
+            bg_hex = _rounded_hex(entry['background'])
+            key = (fg_hex, bg_hex)
+            if key not in pairs:
+                analysis = ColorContrastAnalyzer.analyze_color_pair(fg_hex, bg_hex)
+                analysis['source'] = 'element'
+                analysis['occurrences'] = 0
+                analysis['elements'] = []
+                pairs[key] = analysis
+        
+        analysis = pairs[key]
+        analysis['occurrences'] += 1
+        if len(analysis['elements']) < max_samples:
+            element = entry['element']
+            analysis['elements'].append({
+                'tag': element.name,
+                'line': getattr(element, 'sourceline', None),
+                'translucent_layers': entry['translucent_layers']
+            })
+    
+    return list(pairs.values())
+
+def analyze_web_page_contrast(html_content: str, css_content: str = "",
+                               image_resolver: Optional[Callable[[str], Optional[str]]] = None,
+                               style_resolver: Callable[[Any], Tuple[Optional[str], Optional[str]]] = inline_style_colors,
+                               index: Optional[DocumentIndex] = None) -> Dict:
     """
     Analyze contrast ratios in a web page
     This is a simplified version - in production, you'd need a proper DOM parser
@@ -274,6 +706,12 @@ def analyze_web_page_contrast(html_content: str, css_content: str = "") -> Dict:
         analysis = analyzer.analyze_color_pair(fg, bg)
         results['color_pairs_analyzed'].append(analysis)
     
+    # Analyze the effective colors of the page's own elements
+    if html_content:
+        results['color_pairs_analyzed'].extend(
+            analyze_element_contrast(html_content, style_resolver, image_resolver, index=index)
+        )
+    
     # Calculate overall accessibility score
     passing_combinations = sum(1 for pair in results['color_pairs_analyzed'] 
                               if pair['wcag_aa']['normal']['passes'])
@@ -0,0 +1,306 @@
+# Shared per-document index built in a single top-down DOM walk
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+import re
+from urllib.parse import unquote
+
+from bs4 import NavigableString, Tag
+
+_STYLE_DECLARATION = re.compile(r'\s*([\w-]+)\s*:\s*([^;]+)')
+
+# Attributes holding ID references (space-separated lists or a single id)
+IDREF_ATTRIBUTES = {
+    'aria-labelledby', 'aria-describedby', 'aria-controls', 'aria-owns', 'aria-flowto',
+    'aria-details', 'aria-errormessage', 'aria-activedescendant', 'for', 'list', 'headers', 'form'
+}
+
+# Elements whose content is never rendered
+NON_RENDERED_TAGS = {'script', 'style', 'template', 'noscript', 'head', 'title', 'meta', 'link'}
+
+# Attributes that make an SVG node relevant to the link, focus and reference checks
+_SVG_INDEXED_ATTRIBUTES = IDREF_ATTRIBUTES | {'href', 'xlink:href', 'tabindex', 'role'}
+
+@lru_cache(maxsize=4096)
+def parse_style(style: str) -> Dict[str, str]:
+    """Parse an inline style attribute into a property -> value dict (memoized)"""
+    return {prop.lower(): value.strip() for prop, value in _STYLE_DECLARATION.findall(style)}
+
+def _is_zero(value: Optional[str]) -> bool:
+    return value is not None and re.fullmatch(r'0(\.0+)?(px|em|rem|%)?', value.lower().replace('!important', '').strip()) is not None
+
+@lru_cache(maxsize=4096)
+def style_visibility(style: str) -> Tuple[bool, Optional[bool]]:
+    """
+    Classify an inline style (memoized per distinct style string).
+    Returns (hides_subtree, visibility) where hides_subtree covers
+    display:none, opacity:0, zero size and off-screen positioning, and
+    visibility is True/False for an explicit visibility declaration (which
+    descendants may override) or None when not declared.
+    """
+    declarations = parse_style(style)
+    strip = lambda v: v.lower().replace('!important', '').strip() if v else v
+
+    hides = (
+        strip(declarations.get('display')) == 'none'
+        or _is_zero(declarations.get('opacity'))
+        or _is_zero(declarations.get('height'))
+        or _is_zero(declarations.get('width'))
+        or (strip(declarations.get('position')) == 'absolute'
+            and strip(declarations.get('left', '')).startswith('-9999'))
+    )
+
+    visibility = strip(declarations.get('visibility'))
+    if visibility in ('hidden', 'collapse'):
+        return hides, False
+    if visibility == 'visible':
+        return hides, True
+    return hides, None
+
+def _inherited_visibility(element, parent_hidden: bool, parent_invisible: bool) -> Tuple[bool, bool]:
+    """(subtree hidden, visibility hidden) of an element given its parent's"""
+    subtree_hidden = parent_hidden or (
+        element.has_attr('hidden')
+        or element.get('aria-hidden') == 'true'
+        or element.name in NON_RENDERED_TAGS
+        or (element.name == 'input' and element.get('type', '').lower() == 'hidden')
+    )
+    invisible = parent_invisible
+
+    style = element.get('style')
+    if style and not subtree_hidden:
+        hides, visibility = style_visibility(style)
+        subtree_hidden = hides
+        if visibility is not None:
+            invisible = not visibility
+    return subtree_hidden, invisible
+
+class DocumentIndex:
+    """
+    One top-down walk over a parsed document that records, for every element,
+    its document-order position, subtree extent and inherited visibility.
+    Checks query the index in O(1) instead of re-walking ancestors or
+    re-parsing inline styles.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.elements: List[Tag] = []  # All elements, document order
+        self._position: Dict[int, int] = {}  # id(el) -> index in elements
+        self._end: Dict[int, int] = {}  # id(el) -> index after its last descendant
+        self._hidden = set()  # id(el) of hidden elements (inherited)
+        self._figure: Dict[int, Tag] = {}  # id(el) -> nearest enclosing <figure>
+        self._figcaption: Dict[int, Tag] = {}  # id(figure) -> its first <figcaption>
+        self.ids: Dict[str, List[Tag]] = {}  # id attribute -> elements carrying it
+        self.anchor_names: Set[str] = set()  # <a name="..."> values, legacy fragment targets
+        self._svg_groups: Dict[int, List[Tag]] = {}  # id(outermost <svg>) -> nested role="img" elements
+        self._svg_sizes: Dict[int, int] = {}  # id(outermost <svg>) -> number of elements inside it
+        self._names = None  # AccessibleNameComputer, created on first use
+        # (element, attribute, referenced id) for every ID reference, incl. href="#..."
+        self.references: List[Tuple[Tag, str, str]] = []
+        self._build()
+
+    def _build(self) -> None:
+        self._walk([(child, False, False, None) for child in reversed(list(self.root.children))
+                    if isinstance(child, Tag)])
+
+    def _walk(self, stack: List[Tuple]) -> None:
+        """Index the subtrees on the stack in document order"""
+        elements = self.elements
+        position = self._position
+        hidden = self._hidden
+        figures = self._figure
+
+        # Stack entries: (element, subtree hidden, visibility hidden, nearest
+        # figure) or a close marker (None, element, None, None) used to
+        # record subtree extents
+        while stack:
+            element, parent_hidden, parent_invisible, figure = stack.pop()
+            if element is None:
+                self._end[id(parent_hidden)] = len(elements)
+                continue
+
+            self._record_references(element)
+            if figure is not None:
+                figures[id(element)] = figure
+                if element.name == 'figcaption' and id(figure) not in self._figcaption:
+                    self._figcaption[id(figure)] = element
+
+            subtree_hidden, invisible = _inherited_visibility(element, parent_hidden, parent_invisible)
+            position[id(element)] = len(elements)
+            elements.append(element)
+            if subtree_hidden or invisible:
+                hidden.add(id(element))
+
+            stack.append((None, element, None, None))
+            if element.name == 'svg':
+                # Plain shapes are not indexed: the walk takes a cheaper path inside the graphic
+                self._build_svg(element, subtree_hidden, invisible, figure)
+                continue
+            child_figure = element if element.name == 'figure' else figure
+            for child in reversed(element.contents):
+                if isinstance(child, Tag):
+                    stack.append((child, subtree_hidden, invisible, child_figure))
+
+    def _record_references(self, element) -> None:
+        """Register the element's id and the ID references it makes"""
+        element_id = element.get('id')
+        if element_id:
+            self.ids.setdefault(element_id, []).append(element)
+
+        attrs = element.attrs
+        if element.name == 'a' and attrs.get('name'):
+            self.anchor_names.add(attrs['name'])
+        for attribute in IDREF_ATTRIBUTES.intersection(attrs):
+            value = attrs[attribute]
+            # bs4 already splits some multi-valued attributes (e.g. headers)
+            for ref in (value if isinstance(value, list) else value.split()):
+                self.references.append((element, attribute, ref))
+        # SVG links may still use the deprecated xlink:href
+        href = attrs.get('href') or attrs.get('xlink:href')
+        if href and href.startswith('#') and element.name in ('a', 'area'):
+            fragment = unquote(href[1:])
+            # Empty, "#top" (any case) and hash-router fragments don't target an element
+            if fragment and fragment.lower() != 'top' and fragment[0] not in '/!':
+                self.references.append((element, 'href', fragment))
+
+    def _build_svg(self, svg, svg_hidden: bool, svg_invisible: bool, figure: Optional[Tag]) -> None:
+        """
+        Index what the checks read inside an outermost <svg>: its direct-child
+        <title>/<desc>, nested role="img" groups and their own direct-child
+        <title>/<desc>, nodes that link, take focus, carry a role or make ID
+        references, and every <foreignObject> subtree (indexed as ordinary
+        HTML). Plain shapes are passed over for their ids and inherited
+        visibility but not recorded, so the element list does not grow with
+        the number of paths.
+        """
+        elements = self.elements
+        groups: List[Tag] = []
+        size = 0
+        # Stack entries: (element, subtree hidden, visibility hidden, nearest
+        # recorded container) or a close marker (None, element, None, None)
+        stack: List[Tuple] = [(child, svg_hidden, svg_invisible, svg) for child in reversed(svg.contents)
+                              if isinstance(child, Tag)]
+
+        while stack:
+            element, parent_hidden, parent_invisible, container = stack.pop()
+            if element is None:
+                self._end[id(parent_hidden)] = len(elements)
+                continue
+
+            size += 1
+            subtree_hidden, invisible = _inherited_visibility(element, parent_hidden, parent_invisible)
+            attrs = element.attrs
+            is_group = attrs.get('role') == 'img'
+            is_foreign = element.name == 'foreignobject'
+            if (is_group or is_foreign or (element.name in ('title', 'desc') and element.parent is container)
+                    or _SVG_INDEXED_ATTRIBUTES.intersection(attrs)):
+                self._record_references(element)
+                if figure is not None:
+                    self._figure[id(element)] = figure
+                self._position[id(element)] = len(elements)
+                elements.append(element)
+                if subtree_hidden or invisible:
+                    self._hidden.add(id(element))
+                stack.append((None, element, None, None))
+                if is_foreign:
+                    # Embedded HTML is indexed like the rest of the page
+                    self._walk([(child, subtree_hidden, invisible, figure) for child in reversed(element.contents)
+                                if isinstance(child, Tag)])
+                    continue
+                if is_group:
+                    groups.append(element)
+                    container = element
+            elif attrs.get('id'):
+                self.ids.setdefault(attrs['id'], []).append(element)
+
+            for child in reversed(element.contents):
+                if isinstance(child, Tag):
+                    stack.append((child, subtree_hidden, invisible, container))
+
+        self._svg_groups[id(svg)] = groups
+        self._svg_sizes[id(svg)] = size
+
+    def nearest_figure(self, element) -> Optional[Tag]:
+        """The closest <figure> ancestor of the element"""
+        return self._figure.get(id(element))
+
+    def figcaption(self, figure) -> Optional[Tag]:
+        """The first <figcaption> inside a <figure>"""
+        return self._figcaption.get(id(figure))
+
+    def svg_groups(self, svg) -> List[Tag]:
+        """role="img" elements nested inside an outermost <svg>"""
+        return self._svg_groups.get(id(svg), [])
+
+    def svg_size(self, svg) -> int:
+        """Number of elements inside an outermost <svg>, indexed or not"""
+        return self._svg_sizes.get(id(svg), 0)
+
+    def get_by_id(self, element_id: str) -> Optional[Tag]:
+        """First element with the given id (what the browser resolves)"""
+        matches = self.ids.get(element_id)
+        return matches[0] if matches else None
+
+    def resolve_idrefs(self, value: Optional[str]) -> Tuple[List[Tag], List[str]]:
+        """Resolve a space-separated ID reference list into (found elements, missing ids)"""
+        found, missing = [], []
+        for ref in (value or '').split():
+            target = self.get_by_id(ref)
+            if target is None:
+                missing.append(ref)
+            else:
+                found.append(target)
+        return found, missing
+
+    def is_hidden(self, element) -> bool:
+        """True if the element or one of its ancestors hides it"""
+        return id(element) in self._hidden
+
+    def position(self, element) -> Optional[int]:
+        """Document-order position of the element"""
+        return self._position.get(id(element))
+
+    def subtree_end(self, element) -> int:
+        """Position just after the element's last descendant"""
+        return self._end.get(id(element), len(self.elements))
+
+    def descendants(self, element) -> List[Tag]:
+        """All elements inside `element`, in document order, without re-walking the tree"""
+        if element is self.root or not isinstance(element, Tag) or id(element) not in self._position:
+            return self.elements
+        start = self._position[id(element)]
+        return self.elements[start + 1:self._end[id(element)]]
+
+    def visible_elements(self, element=None) -> Iterator[Tag]:
+        """Visible elements, optionally limited to a subtree"""
+        for el in (self.descendants(element) if element is not None else self.elements):
+            if id(el) not in self._hidden:
+                yield el
+
+    @property
+    def names(self):
+        """Accessible name computer shared by every check on this document"""
+        if self._names is None:
+            from accessible_name import AccessibleNameComputer
+            self._names = AccessibleNameComputer(self)
+        return self._names
+
+    def accessible_name(self, element) -> str:
+        """Accessible name of an element (W3C accname), memoized"""
+        return self.names.name(element)
+
+    def visible_text(self, element, separator: str = ' ') -> str:
+        """Text content of an element, excluding hidden descendants"""
+        parts = []
+        for node in element.descendants:
+            if type(node) is not NavigableString:
+                continue
+            # Text inside <svg> shapes takes the visibility of the closest indexed ancestor
+            parent = node.parent
+            while parent is not element and id(parent) not in self._position and parent.parent is not None:
+                parent = parent.parent
+            if id(parent) not in self._hidden:
+                text = node.strip()
+                if text:
+                    parts.append(text)
+        return separator.join(parts)
@@ -1,8 +1,11 @@
 # Enhanced heading hierarchy validator with comprehensive WCAG support
-from bs4 import BeautifulSoup, Comment
+from bs4 import BeautifulSoup
 from dataclasses import dataclass
-from typing import List, Optional, Dict, Any
-import re
+from typing import List, Optional, Dict, Any, Tuple
+
+from dom_index import DocumentIndex
+
+HEADING_TAGS = ("h1", "h2", "h3", "h4", "h5", "h6")
 
 @dataclass
 class Heading:
@@ -11,6 +14,7 @@ class Heading:
     text: str  # Text content of the header
     line: Optional[int] = None  # Line number if available
     attributes: Optional[Dict[str, str]] = None  # Additional attributes
+    section: Optional[str] = None  # Tag of the enclosing sectioning root
 
 @dataclass
 class Finding:
@@ -20,63 +24,27 @@ class Finding:
     curr: Optional[Heading] = None
     line: Optional[int] = None
 
-def _parse_headings(html: str, scope: str = "document") -> List[Heading]:
+# Sectioning content and landmark roles that start a new outline scope
+SECTIONING_TAGS = ("main", "article", "section", "aside", "nav")
+SECTIONING_ROLES = ("main", "article", "region", "complementary", "navigation")
+
+@dataclass
+class DocumentOutline:
+    headings: List[Heading]  # Visible headings, document order
+    compare_to: List[Optional[int]]  # Per heading: index of the heading it follows in its section context
+    positions: List[int]  # Per heading: document-order position of the element
+    scopes: Dict[str, Tuple[int, int]]  # scope name -> (start, end) position range
+    outline: Dict[str, Any]  # Section tree with a nested heading tree per section
+
+def _heading_level(el) -> int:
     """
-    Enhanced heading parser with better error handling and accessibility checks.
-    scope: 'document' (default), 'main' (limits to <main> / [role=main]), or 'article'
+    Classify native and ARIA headings together.
+    Returns the heading level, or 0 if the element is not a heading.
     """
-    try:
-        # Use 'lxml' for better sourceline support, fallback to html.parser
-        soup = BeautifulSoup(html, "lxml")
-    except:
-        soup = BeautifulSoup(html, "html.parser")
-    
-    # Determine scope
-    if scope == "main":
-        root = soup.select_one("main, [role=main]")
-    elif scope == "article":
-        root = soup.select_one("article, [role=article]")
-    else:
-        root = soup
+    role = el.get("role")
+    native = el.name in HEADING_TAGS
     
-    if not root:
-        root = soup  # Fallback to full document
-
-    def is_hidden(el) -> bool:
-        """Enhanced visibility check"""
-        # Check HTML5 hidden attribute
-        if el.has_attr("hidden"):
-            return True
-        
-        # Check aria-hidden
-        if el.get("aria-hidden") == "true":
-            return True
-        
-        # Check CSS visibility/display
-        style = el.get("style", "")
-        style_clean = re.sub(r'\s+', '', style.lower())
-        
-        hidden_patterns = [
-            "display:none", "visibility:hidden", "opacity:0",
-            "position:absolute;left:-9999", "height:0", "width:0"
-        ]
-        
-        return any(pattern in style_clean for pattern in hidden_patterns)
-
-    def is_heading(el) -> bool:
-        """Check if element is a heading"""
-        if hasattr(el, 'name') and el.name in ("h1", "h2", "h3", "h4", "h5", "h6"):
-            return True
-        return el.get("role") == "heading" and el.get("aria-level")
-
-    def level_of(el) -> int:
-        """Get heading level"""
-        if hasattr(el, 'name') and el.name and el.name.startswith("h"):
-            try:
-                return int(el.name[1])
-            except (ValueError, IndexError):
-                return 0
-        
+    if role == "heading":
         aria_level = el.get("aria-level")
         if aria_level:
             try:
@@ -84,58 +52,125 @@ def _parse_headings(html: str, scope: str = "document") -> List[Heading]:
                 return level if 1 <= level <= 6 else 0
             except (ValueError, TypeError):
                 return 0
-        return 0
+        # Without aria-level, native headings keep their own level and
+        # ARIA headings default to level 2
+        return int(el.name[1]) if native else 2
+    
+    if native and role not in ("presentation", "none"):
+        return int(el.name[1])
+    return 0
 
-    def get_text_content(el) -> str:
-        """Get meaningful text content, excluding hidden elements"""
-        text_parts = []
-        for content in el.contents:
-            if hasattr(content, 'get_text'):
-                if not is_hidden(content):
-                    text_parts.append(content.get_text(strip=True))
-            elif isinstance(content, str) and not isinstance(content, Comment):
-                text_parts.append(content.strip())
-        
-        return ' '.join(filter(None, text_parts))
+def _section_node(el) -> Dict[str, Any]:
+    return {
+        "tag": el.name,
+        "role": el.get("role"),
+        "id": el.get("id"),
+        "line": getattr(el, "sourceline", None),
+        "headings": [],
+        "sections": []
+    }
 
+def _build_outline(html: Optional[str], index: Optional[DocumentIndex] = None) -> DocumentOutline:
+    """
+    Extract headings and the sectioning outline in one document-order pass.
+    
+    Every sectioning root (main, article, section, aside, nav and their
+    landmark roles) gets its own heading tree. Each heading records the
+    heading it should be compared with: the previous heading in the same
+    section or, for the first heading of a section, the latest heading of
+    the enclosing sections - never a heading from a sibling section.
+    An existing index of the page is used as is instead of parsing html.
+    """
+    if index is None:
+        try:
+            # Use 'lxml' for better sourceline support, fallback to html.parser
+            soup = BeautifulSoup(html or "", "lxml")
+        except:
+            soup = BeautifulSoup(html or "", "html.parser")
+        # Inherited visibility and subtree extents for the whole document
+        index = DocumentIndex(soup)
+    
+    elements = index.elements
+    
+    document = {"tag": "document", "role": None, "id": None, "line": None, "headings": [], "sections": []}
+    # Open sections: [node, end position, last heading index, heading stack]
+    open_sections: List[list] = [[document, len(elements), None, []]]
+    
     headings: List[Heading] = []
+    compare_to: List[Optional[int]] = []
+    positions: List[int] = []
+    scopes: Dict[str, Tuple[int, int]] = {"document": (0, len(elements))}
     
-    # Find all potential heading elements
-    for el in root.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']) + root.find_all(attrs={"role": "heading"}):
-        if not is_heading(el) or is_hidden(el):
+    for position, el in enumerate(elements):
+        while position >= open_sections[-1][1]:
+            open_sections.pop()
+        
+        role = el.get("role")
+        # Scopes follow the first <main>/[role=main] and <article>/[role=article]
+        for scope_name in ("main", "article"):
+            if scope_name not in scopes and (el.name == scope_name or role == scope_name):
+                scopes[scope_name] = (position, index.subtree_end(el))
+        
+        if index.is_hidden(el):
             continue
-            
-        level = level_of(el)
-        if level == 0:  # Invalid level
+        
+        if el.name in SECTIONING_TAGS or role in SECTIONING_ROLES:
+            node = _section_node(el)
+            open_sections[-1][0]["sections"].append(node)
+            open_sections.append([node, index.subtree_end(el), None, []])
+            continue
+        
+        level = _heading_level(el)
+        if level == 0:  # Not a heading, or invalid level
             continue
-            
-        tag = el.name if el.name in ("h1", "h2", "h3", "h4", "h5", "h6") else "role=heading"
-        text = get_text_content(el)
         
+        text = index.visible_text(el)
         if not text.strip():  # Skip empty headings
             continue
-            
+        
+        section = open_sections[-1]
+        context = next((s[2] for s in reversed(open_sections) if s[2] is not None), None)
+        
+        tag = el.name if el.name in HEADING_TAGS else "role=heading"
         line = getattr(el, "sourceline", None)
         attributes = dict(el.attrs) if hasattr(el, 'attrs') else {}
+        headings.append(Heading(tag, level, text, line, attributes, section[0]["tag"]))
+        compare_to.append(context)
+        positions.append(position)
+        section[2] = len(headings) - 1
         
-        headings.append(Heading(tag, level, text, line, attributes))
+        # Nest the heading under the closest lower-level heading of its section
+        tree_node = {"level": level, "text": text, "line": line, "children": []}
+        stack = section[3]
+        while stack and stack[-1]["level"] >= level:
+            stack.pop()
+        (stack[-1]["children"] if stack else section[0]["headings"]).append(tree_node)
+        stack.append(tree_node)
     
-    return headings
+    return DocumentOutline(headings, compare_to, positions, scopes, document)
 
-def check_header_hierarchy(
-    html: str,
-    *,
-    allow_multiple_h1: bool = False,  # Changed default to False for better accessibility
-    allow_start_at_h2: bool = False,
-    scope: str = "document",
-    check_empty_headings: bool = True,
-    check_long_headings: bool = True,
-    max_heading_length: int = 120
-) -> Dict[str, Any]:
+def _parse_headings(html: str, scope: str = "document") -> List[Heading]:
     """
-    Enhanced heading hierarchy validator with comprehensive WCAG checks.
+    Enhanced heading parser with better error handling and accessibility checks.
+    scope: 'document' (default), 'main' (limits to <main> / [role=main]), or 'article'
     """
-    headers = _parse_headings(html, scope=scope)
+    outline = _build_outline(html)
+    start, end = outline.scopes.get(scope, outline.scopes["document"])
+    return [h for h, pos in zip(outline.headings, outline.positions) if start <= pos < end]
+
+def _evaluate_scope(
+    outline: DocumentOutline,
+    scope: str,
+    allow_multiple_h1: bool,
+    allow_start_at_h2: bool,
+    check_empty_headings: bool,
+    check_long_headings: bool,
+    max_heading_length: int
+) -> Dict[str, Any]:
+    """Run the hierarchy checks for one scope of an already-built outline"""
+    start, end = outline.scopes.get(scope, outline.scopes["document"])
+    selected = [i for i, pos in enumerate(outline.positions) if start <= pos < end]
+    headers = [outline.headings[i] for i in selected]
     findings: List[Finding] = []
 
     if not headers:
@@ -146,7 +181,8 @@ def check_header_hierarchy(
         return {
             "headers": [],
             "findings": [f.__dict__ for f in findings],
-            "summary": {"h1_count": 0, "total": 0, "valid_hierarchy": False}
+            "summary": {"h1_count": 0, "total": 0, "valid_hierarchy": False, "scope": scope},
+            "outline": outline.outline
         }
 
     # Check first heading level
@@ -171,10 +207,14 @@ def check_header_hierarchy(
             "No H1 heading found. Each page should have exactly one H1 for the main title.",
         ))
 
-    # Check heading level jumps
+    # Check heading level jumps relative to each heading's section context
     valid_hierarchy = True
-    for i in range(1, len(headers)):
-        prev, curr = headers[i - 1], headers[i]
+    in_scope = set(selected)
+    for i in selected:
+        context = outline.compare_to[i]
+        if context is None or context not in in_scope:
+            continue
+        prev, curr = outline.headings[context], outline.headings[i]
         
         # Check for level jumps (going up more than 1 level)
         if curr.level > prev.level + 1:
@@ -206,14 +246,6 @@ def check_header_hierarchy(
                     None, header, header.line
                 ))
 
-    # Check for proper nesting in sectioning content
-    section_stack = []
-    for header in headers:
-        # This is a simplified check - in practice, you'd want to track actual DOM structure
-        while section_stack and section_stack[-1] >= header.level:
-            section_stack.pop()
-        section_stack.append(header.level)
-
     return {
         "headers": [h.__dict__ for h in headers],
         "findings": [f.__dict__ for f in findings],
@@ -223,7 +255,52 @@ def check_header_hierarchy(
             "valid_hierarchy": valid_hierarchy,
             "max_level": max(h.level for h in headers) if headers else 0,
             "scope": scope
-        }
+        },
+        "outline": outline.outline
+    }
+
+def check_header_hierarchy(
+    html: Optional[str] = None,
+    *,
+    index: Optional[DocumentIndex] = None,
+    allow_multiple_h1: bool = False,  # Changed default to False for better accessibility
+    allow_start_at_h2: bool = False,
+    scope: str = "document",
+    check_empty_headings: bool = True,
+    check_long_headings: bool = True,
+    max_heading_length: int = 120
+) -> Dict[str, Any]:
+    """
+    Enhanced heading hierarchy validator with comprehensive WCAG checks.
+    Level jumps are evaluated within each sectioning root of the outline.
+    index reuses an existing parse of the page instead of parsing html.
+    """
+    return _evaluate_scope(
+        _build_outline(html, index), scope, allow_multiple_h1, allow_start_at_h2,
+        check_empty_headings, check_long_headings, max_heading_length
+    )
+
+def check_all_scopes(
+    html: str,
+    *,
+    scopes: Tuple[str, ...] = ("document", "main", "article"),
+    allow_multiple_h1: bool = False,
+    allow_start_at_h2: bool = False,
+    check_empty_headings: bool = True,
+    check_long_headings: bool = True,
+    max_heading_length: int = 120
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Evaluate several scopes from a single parse and traversal.
+    Scopes that do not exist in the document are omitted.
+    """
+    outline = _build_outline(html)
+    return {
+        scope: _evaluate_scope(
+            outline, scope, allow_multiple_h1, allow_start_at_h2,
+            check_empty_headings, check_long_headings, max_heading_length
+        )
+        for scope in scopes if scope in outline.scopes
     }
 
 def pretty_print_report(report: Dict[str, Any]) -> None:
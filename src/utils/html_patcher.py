@@ -0,0 +1,164 @@
+# Offset-preserving HTML rewriting: edits are recorded as patches against the original source
+import re
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+
+# Elements that never have an end tag
+VOID_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr'
+}
+
+@dataclass
+class TagSpan:
+    """An element located in the source: offsets of its start and end tags"""
+    name: str
+    attrs: Dict[str, Optional[str]]
+    start: int  # offset of '<'
+    start_end: int  # offset just after the start tag's '>'
+    end_start: Optional[int] = None  # offset of '</', None for void/unclosed elements
+    end_end: Optional[int] = None
+    has_text: bool = False  # non-whitespace text anywhere inside
+    raw: str = field(default='', repr=False)  # start tag source text
+
+class _TagScanner(HTMLParser):
+    def __init__(self, source: str):
+        super().__init__(convert_charrefs=False)
+        self.source = source
+        self._line_starts = [0] + [m.end() for m in re.finditer('\n', source)]
+        self.tags: List[TagSpan] = []
+        self._open: List[TagSpan] = []
+
+    def _offset(self) -> int:
+        line, column = self.getpos()
+        return self._line_starts[line - 1] + column
+
+    def handle_starttag(self, tag, attrs):
+        raw = self.get_starttag_text() or ''
+        start = self._offset()
+        span = TagSpan(tag, dict(attrs), start, start + len(raw), raw=raw)
+        self.tags.append(span)
+        if tag not in VOID_TAGS:
+            self._open.append(span)
+
+    def handle_startendtag(self, tag, attrs):
+        raw = self.get_starttag_text() or ''
+        start = self._offset()
+        self.tags.append(TagSpan(tag, dict(attrs), start, start + len(raw), raw=raw))
+
+    def handle_endtag(self, tag):
+        # Close up to the matching open element (implicitly closed ones included)
+        for depth in range(len(self._open) - 1, -1, -1):
+            if self._open[depth].name == tag:
+                break
+        else:
+            return
+        start = self._offset()
+        end = self.source.find('>', start)
+        end = len(self.source) if end < 0 else end + 1
+        while len(self._open) > depth:
+            span = self._open.pop()
+            if self._open and span.has_text:
+                self._open[-1].has_text = True
+        span.end_start, span.end_end = start, end
+
+    def handle_data(self, data):
+        if self._open and data.strip():
+            self._open[-1].has_text = True
+
+    def handle_entityref(self, name):
+        self.handle_data('&')
+
+    def handle_charref(self, name):
+        self.handle_data('&')
+
+def scan_tags(source: str) -> List[TagSpan]:
+    """Locate every element of the document in one tokenizer pass"""
+    scanner = _TagScanner(source)
+    scanner.feed(source)
+    scanner.close()
+    return scanner.tags
+
+# One attribute of a start tag (leading whitespace, name, optional value), or
+# stray whitespace and slashes between attributes
+_ATTRIBUTE = re.compile(r'(\s*)([^\s"\'>/=]+)(?:\s*=\s*("[^"]*"|\'[^\']*\'|[^\s>]*))?|[\s/]+')
+
+def _attribute_match(span: TagSpan, attribute: str) -> Optional[re.Match]:
+    """Match of an attribute in a start tag, walking attributes in order so values are never searched"""
+    attribute = attribute.lower()
+    for match in _ATTRIBUTE.finditer(span.raw, len(span.name) + 1, len(span.raw) - 1):
+        if match.group(2) is not None and match.group(2).lower() == attribute:
+            return match
+    return None
+
+def _attribute_span(span: TagSpan, attribute: str) -> Optional[Tuple[int, int]]:
+    """Source offsets of an attribute (with its leading whitespace) inside a start tag"""
+    match = _attribute_match(span, attribute)
+    if match is None:
+        return None
+    return span.start + match.start(), span.start + match.end()
+
+def _escape_attribute(value: str) -> str:
+    return value.replace('&', '&amp;').replace('"', '&quot;')
+
+class HtmlPatcher:
+    """
+    Collects edits as (start, end, replacement) patches against the original
+    source and applies them in a single splice. Markup that is not edited is
+    preserved byte for byte.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self._patches: List[Tuple[int, int, int, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._patches)
+
+    def replace(self, start: int, end: int, text: str) -> None:
+        self._patches.append((start, end, len(self._patches), text))
+
+    def insert(self, offset: int, text: str) -> None:
+        self.replace(offset, offset, text)
+
+    def rename(self, span: TagSpan, name: str) -> None:
+        """Rename an element in its start and end tags"""
+        self.replace(span.start + 1, span.start + 1 + len(span.name), name)
+        if span.end_start is not None:
+            self.replace(span.end_start + 2, span.end_start + 2 + len(span.name), name)
+
+    def set_attribute(self, span: TagSpan, attribute: str, value: str) -> None:
+        """
+        Set an attribute. An existing one (e.g. an empty id="") is replaced
+        in place; otherwise it is appended before the start tag's closing
+        '>' (or '/>').
+        """
+        text = f'{attribute}="{_escape_attribute(value)}"'
+        match = _attribute_match(span, attribute)
+        if match is not None:
+            self.replace(span.start + match.start(2), span.start + match.end(), text)
+            return
+        close = span.start_end - (2 if span.raw.endswith('/>') else 1)
+        self.insert(close, f' {text}')
+
+    def remove_attribute(self, span: TagSpan, attribute: str) -> None:
+        location = _attribute_span(span, attribute)
+        if location is not None:
+            self.replace(location[0], location[1], '')
+
+    def apply(self) -> str:
+        """Splice all patches into the source in one linear pass"""
+        if not self._patches:
+            return self.source
+
+        parts = []
+        position = 0
+        for start, end, _, text in sorted(self._patches):
+            if start < position:
+                raise ValueError(f"Overlapping HTML patches at offset {start}")
+            parts.append(self.source[position:start])
+            parts.append(text)
+            position = end
+        parts.append(self.source[position:])
+        return ''.join(parts)
@@ -0,0 +1,61 @@
+# ID and ARIA reference integrity: duplicate ids and references to missing elements
+from bs4 import BeautifulSoup
+from typing import Any, Dict, Optional
+
+from dom_index import DocumentIndex
+
+# References whose breakage removes an accessible name, description or label
+NAMING_ATTRIBUTES = {'aria-labelledby', 'aria-describedby', 'for'}
+
+def check_id_references(html: Optional[str] = None, index: Optional[DocumentIndex] = None) -> Dict[str, Any]:
+    """
+    Report duplicate ids and ID references (aria-*, for, list, headers,
+    form, href="#...") that resolve to no element. A fragment link is also
+    resolved by an <a name> target, and "#" / "#top" need none. Uses the id
+    map and reference list collected by the shared DocumentIndex walk, so
+    every lookup is O(1).
+    """
+    if index is None:
+        index = DocumentIndex(BeautifulSoup(html or "", "html.parser"))
+
+    referenced = {ref for _, _, ref in index.references}
+    findings = []
+
+    duplicates = []
+    for element_id, elements in index.ids.items():
+        if len(elements) < 2:
+            continue
+        lines = [getattr(el, 'sourceline', None) for el in elements]
+        duplicates.append({'id': element_id, 'count': len(elements), 'lines': lines})
+        # A referenced duplicate makes the reference target ambiguous
+        findings.append({
+            'severity': 'error' if element_id in referenced else 'warning',
+            'message': f'Duplicate id "{element_id}" used {len(elements)} times',
+            'line': lines[1]
+        })
+
+    unresolved = []
+    for element, attribute, ref in index.references:
+        # Fragment links also scroll to a legacy <a name> target
+        if ref in index.ids or (attribute == 'href' and ref in index.anchor_names):
+            continue
+        line = getattr(element, 'sourceline', None)
+        unresolved.append({'tag': element.name, 'attribute': attribute, 'id': ref, 'line': line})
+        findings.append({
+            'severity': 'error' if attribute in NAMING_ATTRIBUTES else 'warning',
+            'message': f'<{element.name} {attribute}> references missing id "{ref}"',
+            'line': line
+        })
+
+    findings.sort(key=lambda f: f['line'] or 0)
+    return {
+        'duplicates': duplicates,
+        'unresolved': unresolved,
+        'findings': findings,
+        'summary': {
+            'ids': len(index.ids),
+            'references': len(index.references),
+            'duplicate_ids': len(duplicates),
+            'unresolved_references': len(unresolved)
+        }
+    }
@@ -1,9 +1,16 @@
 # Enhanced image alt text analyzer with comprehensive accessibility checks
-from bs4 import BeautifulSoup, Comment
-from typing import Dict, List, Optional, Set
+from bs4 import BeautifulSoup, Comment, Tag
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Set
 import re
 from urllib.parse import urlparse
 import os
+import struct
+from pathlib import Path
+
+from color_contrast import background_image_url
+from dom_index import DocumentIndex
+from image_assets import ImageMetadataCache, inspect_image_asset, resolve_image_src
 
 class ImageAccessibilityAnalyzer:
     """Enhanced analyzer for image accessibility following WCAG 2.1 guidelines"""
@@ -20,25 +27,142 @@ class ImageAccessibilityAnalyzer:
         'flowchart', 'screenshot', 'data-viz'
     ]
     
+    # Alt text openings that repeat what assistive technology already announces
+    REDUNDANT_PHRASES = [
+        'image of', 'picture of', 'photo of', 'graphic of',
+        'icon of', 'logo of', 'illustration of'
+    ]
+    
+    # Alt text that is clearly a placeholder (matched against the whole text)
+    PLACEHOLDER_PATTERNS = [
+        r'\w+\.(jpg|jpeg|png|gif|svg)',  # Just filename with extension
+        r'image\d*',  # "image" or "image1", etc.
+        r'(untitled|placeholder|default)'
+    ]
+    
     # File extensions for different image types
     IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.svg', '.webp', '.bmp', '.tiff'}
     
+    # Combined matchers compiled from the rule tables above (see _matchers)
+    _compiled_matchers: Optional[Dict[str, 're.Pattern']] = None
+    
+    @classmethod
+    def configure_patterns(cls,
+                           decorative: Optional[List[str]] = None,
+                           complex_types: Optional[List[str]] = None,
+                           redundant_phrases: Optional[List[str]] = None,
+                           placeholder_patterns: Optional[List[str]] = None) -> None:
+        """
+        Replace the rule tables with project-specific lists.
+        Decorative and placeholder entries are regular expressions; complex
+        types and redundant phrases are literal strings.
+        """
+        if decorative is not None:
+            cls.DECORATIVE_PATTERNS = list(decorative)
+        if complex_types is not None:
+            cls.COMPLEX_IMAGE_TYPES = list(complex_types)
+        if redundant_phrases is not None:
+            cls.REDUNDANT_PHRASES = list(redundant_phrases)
+        if placeholder_patterns is not None:
+            cls.PLACEHOLDER_PATTERNS = list(placeholder_patterns)
+        cls._compiled_matchers = None
+        cls._assess_alt_text.cache_clear()
+    
+    @classmethod
+    def _matchers(cls) -> Dict[str, 're.Pattern']:
+        """
+        Compile each rule table once into a single alternation so every string
+        is scanned a single time instead of once per pattern.
+        """
+        if cls._compiled_matchers is None:
+            def alternation(patterns: List[str]) -> str:
+                return '|'.join(f'(?:{p})' for p in patterns) or r'(?!)'
+            
+            cls._compiled_matchers = {
+                'decorative': re.compile(alternation(cls.DECORATIVE_PATTERNS)),
+                'complex': re.compile(alternation([re.escape(t) for t in cls.COMPLEX_IMAGE_TYPES])),
+                # Longest phrases first so the reported phrase is the most specific
+                'redundant': re.compile(alternation(
+                    [re.escape(p) for p in sorted(cls.REDUNDANT_PHRASES, key=len, reverse=True)]
+                )),
+                'placeholder': re.compile(alternation(cls.PLACEHOLDER_PATTERNS)),
+            }
+        return cls._compiled_matchers
+    
     @staticmethod
-    def analyze_images_in_html(html_content: str) -> Dict:
+    def analyze_images_in_html(html_content: str,
+                               asset_resolver: Optional[Callable[[str], Optional[str]]] = None,
+                               metadata_cache: Optional[ImageMetadataCache] = None,
+                               index: Optional[DocumentIndex] = None) -> Dict:
         """
         Comprehensive analysis of images in HTML content
-        """
-        soup = BeautifulSoup(html_content, 'html.parser')
         
-        # Find all image elements
-        img_elements = soup.find_all('img')
-        svg_elements = soup.find_all('svg')
-        figure_elements = soup.find_all('figure')
+        With an asset_resolver (src -> local file path), referenced image files
+        are inspected through their headers and the dimensions feed the
+        decorative/complex heuristics. index reuses an existing parse of the page.
+        """
+        if index is None:
+            index = DocumentIndex(BeautifulSoup(html_content, 'html.parser'))
+        
+        # Collect every form of image from the shared walk: <img> (a <picture>
+        # counts once, through its <img>), <input type="image">, role="img"
+        # containers and inline CSS background images. Hidden ones (including
+        # aria-hidden icons and anything inside a hidden container) are not
+        # exposed to assistive technology and need no alternative text
+        img_elements, svg_elements, figure_elements, background_elements = [], [], [], []
+        hidden_images = 0
+        # (end, end of the current <foreignObject>) of the <svg> elements
+        # being walked: graphics content is skipped, since nested role="img"
+        # groups are analyzed with their <svg>, but embedded HTML is not
+        graphics = []
+        for position, element in enumerate(index.elements):
+            while graphics and position >= graphics[-1][0]:
+                graphics.pop()
+            if graphics and position >= graphics[-1][1]:
+                if element.name == 'foreignobject':
+                    graphics[-1] = (graphics[-1][0], index.subtree_end(element))
+                continue
+            name = element.name
+            if name == 'svg':
+                kind = 'svg'
+                graphics.append((index.subtree_end(element), 0))
+            elif name == 'img':
+                parent = element.parent
+                kind = 'picture' if parent is not None and parent.name == 'picture' else 'img'
+            elif name == 'input' and element.get('type', '').lower() == 'image':
+                kind = 'input'
+            elif name == 'figure':
+                kind = name
+            elif element.get('role') == 'img':
+                kind = 'role_img'
+            elif element.get('style') and background_image_url(element):
+                kind = 'background'
+            else:
+                continue
+            
+            if index.is_hidden(element):
+                if kind != 'figure':
+                    hidden_images += 1
+                continue
+            if kind == 'svg':
+                svg_elements.append(element)
+            elif kind == 'figure':
+                figure_elements.append(element)
+            elif kind == 'background':
+                background_elements.append(element)
+            else:
+                img_elements.append((element, kind))
         
+        kinds = [kind for _, kind in img_elements]
         analysis = {
             'total_images': len(img_elements),
             'svg_count': len(svg_elements),
             'figures_count': len(figure_elements),
+            'picture_count': kinds.count('picture'),
+            'input_image_count': kinds.count('input'),
+            'role_img_count': kinds.count('role_img'),
+            'background_image_count': len(background_elements),
+            'hidden_images': hidden_images,
             'images': [],
             'issues': [],
             'summary': {
@@ -47,18 +171,39 @@ class ImageAccessibilityAnalyzer:
                 'good_alt': 0,
                 'decorative': 0,
                 'complex_images': 0,
+                'oversized_assets': 0,
                 'accessibility_score': 0
             },
             'recommendations': []
         }
         
         # Analyze each image
-        for i, img in enumerate(img_elements, 1):
-            img_analysis = ImageAccessibilityAnalyzer._analyze_single_image(img, i)
+        for i, (img, kind) in enumerate(img_elements, 1):
+            img_analysis = ImageAccessibilityAnalyzer._analyze_single_image(
+                img, i, index, asset_resolver, metadata_cache, kind
+            )
             analysis['images'].append(img_analysis)
             
+            if img_analysis['asset'] and img_analysis['asset']['issues']:
+                analysis['summary']['oversized_assets'] += 1
+            
             # Update summary counts
-            if img_analysis['has_alt']:
+            if kind == 'role_img' and not img_analysis['has_alt']:
+                analysis['summary']['missing_alt'] += 1
+                analysis['issues'].append({
+                    'severity': 'error',
+                    'message': f"Image #{i} (role=\"img\" <{img.name}>) has no accessible name",
+                    'element': img_analysis
+                })
+            elif kind == 'input' and not img_analysis['alt_text']:
+                # An image button always needs a name; empty alt is not decorative here
+                analysis['summary']['missing_alt'] += 1
+                analysis['issues'].append({
+                    'severity': 'error',
+                    'message': f"Image #{i} (image button) needs alt text describing its action: {img_analysis['src']}",
+                    'element': img_analysis
+                })
+            elif img_analysis['has_alt']:
                 if img_analysis['alt_text'] == '':
                     analysis['summary']['decorative'] += 1
                 elif img_analysis['alt_quality']['score'] >= 7:
@@ -73,15 +218,35 @@ class ImageAccessibilityAnalyzer:
                     'element': img_analysis
                 })
         
+        # CSS background images have no text alternative; when the element has
+        # no text or accessible name of its own the image content is lost
+        for element in background_elements:
+            if not (element.get('aria-label') or element.get('aria-labelledby')
+                    or index.visible_text(element)):
+                analysis['issues'].append({
+                    'severity': 'warning',
+                    'message': (f"Background image on <{element.name}> has no text alternative: "
+                                f"{background_image_url(element)}. If it conveys information, "
+                                "add role=\"img\" with an aria-label"),
+                    'element': {'tag': element.name, 'src': background_image_url(element)}
+                })
+        
         # Analyze SVG elements
         for i, svg in enumerate(svg_elements, 1):
-            svg_analysis = ImageAccessibilityAnalyzer._analyze_svg_element(svg, i)
+            svg_analysis = ImageAccessibilityAnalyzer._analyze_svg_element(svg, i, index)
             if svg_analysis['needs_attention']:
                 analysis['issues'].append({
                     'severity': 'warning',
                     'message': f"SVG #{i} may need accessibility improvements",
                     'element': svg_analysis
                 })
+            for group in svg_analysis['groups']:
+                if group['needs_attention']:
+                    analysis['issues'].append({
+                        'severity': 'warning',
+                        'message': f"SVG #{i}: nested role=\"img\" <{group['tag']}> has no accessible name",
+                        'element': group
+                    })
         
         # Calculate accessibility score
         if analysis['total_images'] > 0:
@@ -94,9 +259,46 @@ class ImageAccessibilityAnalyzer:
         return analysis
     
     @staticmethod
-    def _analyze_single_image(img_element, image_number: int) -> Dict:
-        """Analyze a single image element"""
-        src = img_element.get('src', '')
+    def _reference_text(index: DocumentIndex, idrefs: str) -> Dict:
+        """Resolve an ID reference list and collect the referenced text"""
+        found, missing = index.resolve_idrefs(idrefs)
+        text = ' '.join(filter(None, (index.names.referenced_text(el) for el in found)))
+        return {'text': text, 'missing': missing}
+    
+    @staticmethod
+    def _srcset_urls(srcset: Optional[str]) -> List[str]:
+        """URLs of the candidates in a srcset attribute (descriptors dropped)"""
+        return [candidate.split()[0] for candidate in (srcset or '').split(',') if candidate.strip()]
+    
+    @staticmethod
+    def _candidate_urls(img_element, src: str, kind: str):
+        """
+        Lazily yield every URL the image may load: src, its own srcset, then
+        the srcset of each <source> of an enclosing <picture>.
+        """
+        if src:
+            yield src
+        yield from ImageAccessibilityAnalyzer._srcset_urls(img_element.get('srcset'))
+        if kind == 'picture':
+            for source in img_element.parent.find_all('source', recursive=False):
+                yield from ImageAccessibilityAnalyzer._srcset_urls(source.get('srcset'))
+    
+    @staticmethod
+    def _analyze_single_image(img_element, image_number: int, index: Optional[DocumentIndex] = None,
+                              asset_resolver: Optional[Callable[[str], Optional[str]]] = None,
+                              metadata_cache: Optional[ImageMetadataCache] = None,
+                              kind: str = 'img') -> Dict:
+        """Analyze a single logical image (img, picture, image input or role=img container)"""
+        if index is None:
+            root = img_element
+            while root.parent is not None:
+                root = root.parent
+            index = DocumentIndex(root)
+        
+        if kind == 'role_img':
+            src = background_image_url(img_element) or ''
+        else:
+            src = img_element.get('src', '')
         alt_text = img_element.get('alt')
         title = img_element.get('title', '')
         aria_label = img_element.get('aria-label', '')
@@ -104,14 +306,35 @@ class ImageAccessibilityAnalyzer:
         aria_describedby = img_element.get('aria-describedby', '')
         role = img_element.get('role', '')
         
-        # Check if image is in a figure with caption
-        figure_parent = img_element.find_parent('figure')
-        figcaption = None
-        if figure_parent:
-            figcaption = figure_parent.find('figcaption')
+        labelledby = ImageAccessibilityAnalyzer._reference_text(index, aria_labelledby)
+        describedby = ImageAccessibilityAnalyzer._reference_text(index, aria_describedby)
+        
+        if kind == 'role_img':
+            # role="img" containers are named through ARIA, not alt
+            alt_text = index.accessible_name(img_element) or None
+        
+        # Check if image is in a figure with caption (O(1) index lookups)
+        figure_parent = index.nearest_figure(img_element)
+        figcaption = index.figcaption(figure_parent) if figure_parent else None
+        
+        # Header-only inspection of the referenced file, when it is local.
+        # srcset candidates are only parsed and resolved when inspection is
+        # enabled, and stop at the first local file
+        asset = None
+        asset_path = None
+        if asset_resolver:
+            candidates = ImageAccessibilityAnalyzer._candidate_urls(img_element, src, kind)
+            asset_path = next(filter(None, map(asset_resolver, candidates)), None)
+        if asset_path:
+            try:
+                asset = inspect_image_asset(asset_path, metadata_cache)
+                asset['path'] = asset_path
+            except (OSError, ValueError, struct.error):
+                asset = None
         
         analysis = {
             'image_number': image_number,
+            'kind': kind,
             'src': src,
             'alt_text': alt_text,
             'has_alt': alt_text is not None,
@@ -123,92 +346,151 @@ class ImageAccessibilityAnalyzer:
             'in_figure': figure_parent is not None,
             'has_figcaption': figcaption is not None,
             'figcaption_text': figcaption.get_text(strip=True) if figcaption else '',
-            'is_decorative': ImageAccessibilityAnalyzer._is_likely_decorative(img_element, src, alt_text),
-            'is_complex': ImageAccessibilityAnalyzer._is_complex_image(src, alt_text),
+            'labelledby_text': labelledby['text'],
+            'describedby_text': describedby['text'],
+            'is_decorative': ImageAccessibilityAnalyzer._is_likely_decorative(img_element, src, alt_text, asset),
+            'is_complex': ImageAccessibilityAnalyzer._is_complex_image(src, alt_text, asset),
+            'asset': asset,
             'alt_quality': ImageAccessibilityAnalyzer._assess_alt_quality(alt_text, src),
             'issues': []
         }
         
         # Check for common issues
         if not analysis['has_alt']:
-            analysis['issues'].append("Missing alt attribute")
+            analysis['issues'].append("Missing accessible name" if kind == 'role_img' else "Missing alt attribute")
         elif alt_text and len(alt_text) > 125:
             analysis['issues'].append("Alt text too long (>125 characters)")
-        elif alt_text and alt_text.lower().startswith(('image of', 'picture of', 'photo of')):
+        elif alt_text and ImageAccessibilityAnalyzer._matchers()['redundant'].match(alt_text.lower()):
             analysis['issues'].append("Alt text includes redundant phrases")
         
-        if analysis['is_complex'] and not (aria_describedby or analysis['has_figcaption']):
+        for attribute, reference in (('aria-labelledby', labelledby), ('aria-describedby', describedby)):
+            if reference['missing']:
+                analysis['issues'].append(
+                    f"{attribute} references missing element(s): {', '.join(reference['missing'])}"
+                )
+            elif img_element.get(attribute) and not reference['text']:
+                analysis['issues'].append(f"{attribute} references element(s) without text")
+        
+        if asset:
+            analysis['issues'].extend(asset['issues'])
+        
+        has_long_description = bool(describedby['text'] or analysis['figcaption_text'])
+        if analysis['is_complex'] and not has_long_description:
             analysis['issues'].append("Complex image needs long description")
         
         return analysis
     
     @staticmethod
-    def _analyze_svg_element(svg_element, svg_number: int) -> Dict:
-        """Analyze SVG element for accessibility"""
-        title_elem = svg_element.find('title')
-        desc_elem = svg_element.find('desc')
-        aria_label = svg_element.get('aria-label', '')
-        aria_labelledby = svg_element.get('aria-labelledby', '')
-        role = svg_element.get('role', '')
-        
-        analysis = {
+    def _svg_label_children(element) -> Dict[str, Optional[Tag]]:
+        """Direct-child <title> and <desc> only; descendants belong to nested groups"""
+        found = {'title': None, 'desc': None}
+        for child in element.children:
+            if isinstance(child, Tag) and child.name in found and found[child.name] is None:
+                found[child.name] = child
+                if found['title'] is not None and found['desc'] is not None:
+                    break
+        return found
+    
+    @staticmethod
+    def _analyze_svg_element(svg_element, svg_number: int, index: Optional[DocumentIndex] = None) -> Dict:
+        """
+        Analyze SVG element for accessibility.
+        Only the element's own ARIA attributes and direct-child title/desc are
+        inspected, so the cost does not grow with the number of paths; nested
+        role="img" groups are analyzed the same way and listed separately.
+        """
+        if index is None:
+            root = svg_element
+            while root.parent is not None:
+                root = root.parent
+            index = DocumentIndex(root)
+        
+        def describe(element) -> Dict:
+            labels = ImageAccessibilityAnalyzer._svg_label_children(element)
+            title_elem, desc_elem = labels['title'], labels['desc']
+            aria_labelledby = element.get('aria-labelledby', '')
+            labelledby = ImageAccessibilityAnalyzer._reference_text(index, aria_labelledby)
+            return {
+                'tag': element.name,
+                'has_title': title_elem is not None,
+                'title_text': title_elem.get_text(strip=True) if title_elem else '',
+                'has_desc': desc_elem is not None,
+                'desc_text': desc_elem.get_text(strip=True) if desc_elem else '',
+                'aria_label': element.get('aria-label', ''),
+                'aria_labelledby': aria_labelledby,
+                'labelledby_text': labelledby['text'],
+                'role': element.get('role', ''),
+            }
+        
+        analysis = describe(svg_element)
+        # Only an explicit presentation role marks the graphic as decorative;
+        # role="img" declares it meaningful
+        analysis['is_decorative'] = analysis['role'] in ('presentation', 'none')
+        has_accessible_name = bool(
+            analysis['title_text'] or analysis['aria_label'] or analysis['labelledby_text']
+        )
+        analysis['needs_attention'] = not analysis['is_decorative'] and not has_accessible_name
+        
+        groups = []
+        for group in index.svg_groups(svg_element):
+            if index.is_hidden(group):
+                continue
+            group_analysis = describe(group)
+            group_analysis['needs_attention'] = not (
+                group_analysis['title_text'] or group_analysis['aria_label'] or group_analysis['labelledby_text']
+            )
+            groups.append(group_analysis)
+        
+        analysis.update({
             'svg_number': svg_number,
-            'has_title': title_elem is not None,
-            'title_text': title_elem.get_text(strip=True) if title_elem else '',
-            'has_desc': desc_elem is not None,
-            'desc_text': desc_elem.get_text(strip=True) if desc_elem else '',
-            'aria_label': aria_label,
-            'aria_labelledby': aria_labelledby,
-            'role': role,
-            'is_decorative': role == 'presentation' or role == 'img',
-            'needs_attention': False
-        }
-        
-        # Determine if SVG needs attention
-        has_accessible_name = any([
-            analysis['has_title'],
-            aria_label,
-            aria_labelledby
-        ])
-        
-        if not analysis['is_decorative'] and not has_accessible_name:
-            analysis['needs_attention'] = True
-        
+            'element_count': index.svg_size(svg_element),
+            'groups': groups
+        })
         return analysis
     
     @staticmethod
-    def _is_likely_decorative(img_element, src: str, alt_text: Optional[str]) -> bool:
+    def _is_likely_decorative(img_element, src: str, alt_text: Optional[str],
+                              asset: Optional[Dict] = None) -> bool:
         """Determine if image is likely decorative"""
         if alt_text == '':  # Empty alt explicitly marks as decorative
             return True
         
-        # Check file name patterns
-        filename = os.path.basename(src).lower() if src else ''
-        for pattern in ImageAccessibilityAnalyzer.DECORATIVE_PATTERNS:
-            if re.search(pattern, filename):
-                return True
+        if asset and asset.get('is_spacer'):  # 1x1 / 2x2 spacer pixels
+            return True
         
-        # Check CSS classes or nearby context
+        # Check file name and CSS classes in a single scan
+        filename = os.path.basename(src).lower() if src else ''
         img_classes = ' '.join(img_element.get('class', [])).lower()
-        for pattern in ImageAccessibilityAnalyzer.DECORATIVE_PATTERNS:
-            if pattern in img_classes:
-                return True
-        
-        return False
+        return ImageAccessibilityAnalyzer._matchers()['decorative'].search(f"{filename}\n{img_classes}") is not None
     
     @staticmethod
-    def _is_complex_image(src: str, alt_text: Optional[str]) -> bool:
+    def _is_complex_image(src: str, alt_text: Optional[str], asset: Optional[Dict] = None) -> bool:
         """Determine if image is complex and needs long description"""
         if not src and not alt_text:
             return False
         
+        if asset and asset.get('is_large_graphic'):
+            return True
+        
         content_to_check = f"{src} {alt_text or ''}".lower()
         
-        return any(img_type in content_to_check for img_type in ImageAccessibilityAnalyzer.COMPLEX_IMAGE_TYPES)
+        return ImageAccessibilityAnalyzer._matchers()['complex'].search(content_to_check) is not None
     
     @staticmethod
     def _assess_alt_quality(alt_text: Optional[str], src: str) -> Dict:
         """Assess the quality of alt text"""
+        filename = os.path.basename(src).lower() if src else ''
+        assessment = ImageAccessibilityAnalyzer._assess_alt_text(alt_text, filename)
+        return dict(assessment, issues=list(assessment['issues']))
+    
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _assess_alt_text(alt_text: Optional[str], filename: str) -> Dict:
+        """
+        Alt text assessment, memoized per (alt text, file name) so the same
+        image/alt pair repeated across pages is scored once. The result is
+        shared between callers; _assess_alt_quality hands out copies.
+        """
         if not alt_text:
             return {'score': 0, 'issues': ['Missing alt text']}
         
@@ -226,36 +508,24 @@ class ImageAccessibilityAnalyzer:
             issues.append("Too short")
             score -= 2
         
-        # Check for redundant phrases
-        redundant_phrases = [
-            'image of', 'picture of', 'photo of', 'graphic of',
-            'icon of', 'logo of', 'illustration of'
-        ]
+        matchers = ImageAccessibilityAnalyzer._matchers()
+        alt_lower = alt_text.lower()
         
-        for phrase in redundant_phrases:
-            if alt_text.lower().startswith(phrase):
-                issues.append(f"Starts with redundant phrase: '{phrase}'")
-                score -= 2
-                break
+        # Check for redundant phrases
+        redundant = matchers['redundant'].match(alt_lower)
+        if redundant:
+            issues.append(f"Starts with redundant phrase: '{redundant.group(0)}'")
+            score -= 2
         
         # Check if it's just the filename
-        filename = os.path.basename(src).lower() if src else ''
-        if filename and alt_text.lower() == os.path.splitext(filename)[0]:
+        if filename and alt_lower == os.path.splitext(filename)[0]:
             issues.append("Alt text is just filename")
             score -= 4
         
         # Check for placeholder text
-        placeholder_patterns = [
-            r'^\w+\.(jpg|jpeg|png|gif|svg)$',  # Just filename with extension
-            r'^image\d*$',  # "image" or "image1", etc.
-            r'^(untitled|placeholder|default)$'
-        ]
-        
-        for pattern in placeholder_patterns:
-            if re.match(pattern, alt_text.lower()):
-                issues.append("Appears to be placeholder text")
-                score -= 5
-                break
+        if matchers['placeholder'].fullmatch(alt_lower):
+            issues.append("Appears to be placeholder text")
+            score -= 5
         
         return {
             'score': max(0, score),
@@ -287,6 +557,10 @@ class ImageAccessibilityAnalyzer:
         if complex_without_desc > 0:
             recommendations.append(f"Add long descriptions for {complex_without_desc} complex images")
         
+        oversized = analysis['summary'].get('oversized_assets', 0)
+        if oversized > 0:
+            recommendations.append(f"Resize or compress {oversized} oversized image files")
+        
         if analysis['summary']['good_alt'] < total * 0.8:
             recommendations.append("Review and improve alt text quality - aim for concise, descriptive text")
         
@@ -295,14 +569,23 @@ class ImageAccessibilityAnalyzer:
         
         return recommendations
 
-def check_images_accessibility(file_path: str) -> Dict:
-    """Main function to check image accessibility in HTML file"""
+def check_images_accessibility(file_path: str, base_dir: Optional[str] = None,
+                               metadata_cache: Optional[ImageMetadataCache] = None) -> Dict:
+    """
+    Main function to check image accessibility in HTML file.
+    With base_dir, local image files are resolved (page directory, dist/,
+    public/, src/assets) and inspected.
+    """
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
             html_content = f.read()
         
         analyzer = ImageAccessibilityAnalyzer()
-        analysis = analyzer.analyze_images_in_html(html_content)
+        asset_resolver = None
+        if base_dir is not None:
+            asset_resolver = lambda src: resolve_image_src(src, Path(file_path), base_dir)
+        
+        analysis = analyzer.analyze_images_in_html(html_content, asset_resolver, metadata_cache)
         
         return analysis
         
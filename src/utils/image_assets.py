@@ -0,0 +1,204 @@
+# Local image asset inspection: src resolution and header-only metadata reads
+import json
+import mmap
+import os
+import re
+import struct
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+from asset_cache import file_digest, write_json_atomic
+
+# Where built and source assets live, relative to the project root
+ASSET_ROOTS = ("dist", "public", "src/assets", ".")
+
+# Thresholds used by the image heuristics and the report
+SPACER_MAX_DIMENSION = 2
+COMPLEX_MIN_DIMENSION = 1000
+OVERSIZED_DIMENSION = 3000
+OVERSIZED_BYTES = 500 * 1024
+
+_SVG_ATTRIBUTE = re.compile(rb'\b(width|height|viewBox)\s*=\s*["\']([^"\']*)["\']')
+
+def resolve_image_src(src: str, page_path: Optional[Path] = None, base_dir: str = ".",
+                      roots: Sequence[str] = ASSET_ROOTS) -> Optional[str]:
+    """
+    Map an image URL referenced by a page to a local file.
+    Root-relative URLs are looked up under dist/, public/ and src/assets;
+    relative URLs are resolved against the page first. Remote and data URLs
+    are not resolved.
+    """
+    path = src.split('?', 1)[0].split('#', 1)[0].strip()
+    if not path or '://' in path or path.startswith(('data:', '//')):
+        return None
+
+    base = Path(base_dir)
+    candidates = []
+    if path.startswith('@/'):
+        # Vite alias used in component sources
+        candidates.append(base / "src" / path[2:])
+    elif path.startswith('/'):
+        candidates.extend(base / root / path.lstrip('/') for root in roots)
+        # /assets/x.png in the built site maps to src/assets/x.png in sources
+        if path.startswith('/assets/'):
+            candidates.append(base / "src" / path.lstrip('/'))
+    else:
+        if page_path is not None:
+            candidates.append(Path(page_path).parent / path)
+        candidates.extend(base / root / path for root in roots)
+
+    for candidate in candidates:
+        if candidate.is_file():
+            return str(candidate)
+    return None
+
+def _jpeg_size(data) -> Optional[tuple]:
+    """Walk JPEG markers up to the first SOFn frame header"""
+    offset = 2
+    length = len(data)
+    while offset + 9 < length:
+        if data[offset] != 0xFF:
+            offset += 1
+            continue
+        marker = data[offset + 1]
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            offset += 2
+            continue
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack('>HH', data[offset + 5:offset + 9])
+            return width, height
+        segment_length = struct.unpack('>H', data[offset + 2:offset + 4])[0]
+        offset += 2 + segment_length
+    return None
+
+def _svg_size(data) -> Optional[tuple]:
+    head = bytes(data[:4096])
+    start = head.find(b'<svg')
+    if start < 0:
+        return None
+    end = head.find(b'>', start)
+    attributes = dict(_SVG_ATTRIBUTE.findall(head[start:end if end > 0 else None]))
+
+    def number(value: Optional[bytes]) -> Optional[float]:
+        match = re.match(rb'\s*([\d.]+)\s*(px)?\s*$', value or b'')
+        return float(match.group(1)) if match else None
+
+    width, height = number(attributes.get(b'width')), number(attributes.get(b'height'))
+    if (width is None or height is None) and attributes.get(b'viewBox'):
+        parts = attributes[b'viewBox'].replace(b',', b' ').split()
+        if len(parts) == 4:
+            width, height = float(parts[2]), float(parts[3])
+    if width is None or height is None:
+        return None
+    return int(width), int(height)
+
+def read_image_header(path: str) -> Dict:
+    """
+    Read format and pixel dimensions from the file header only (no decode).
+    The file is memory-mapped so only the pages holding the header are read.
+    """
+    size = os.path.getsize(path)
+    metadata = {'format': None, 'width': None, 'height': None, 'file_size': size}
+    if size == 0:
+        return metadata
+
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        dimensions = None
+        if data[:8] == b'\x89PNG\r\n\x1a\n':
+            metadata['format'] = 'png'
+            dimensions = struct.unpack('>II', data[16:24])
+        elif data[:6] in (b'GIF87a', b'GIF89a'):
+            metadata['format'] = 'gif'
+            dimensions = struct.unpack('<HH', data[6:10])
+        elif data[:2] == b'\xff\xd8':
+            metadata['format'] = 'jpeg'
+            dimensions = _jpeg_size(data)
+        elif data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+            metadata['format'] = 'webp'
+            chunk = data[12:16]
+            if chunk == b'VP8 ':
+                width, height = struct.unpack('<HH', data[26:30])
+                dimensions = (width & 0x3FFF, height & 0x3FFF)
+            elif chunk == b'VP8L':
+                bits = struct.unpack('<I', data[21:25])[0]
+                dimensions = ((bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1)
+            elif chunk == b'VP8X':
+                width = int.from_bytes(data[24:27], 'little') + 1
+                height = int.from_bytes(data[27:30], 'little') + 1
+                dimensions = (width, height)
+        elif b'<svg' in data[:4096]:
+            metadata['format'] = 'svg'
+            dimensions = _svg_size(data)
+
+        if dimensions:
+            metadata['width'], metadata['height'] = int(dimensions[0]), int(dimensions[1])
+
+    return metadata
+
+class ImageMetadataCache:
+    """
+    Image header metadata keyed by file content hash.
+    With a cache_path the entries (and the path -> hash map, keyed by size
+    and mtime) are persisted between runs.
+    """
+
+    def __init__(self, cache_path: Optional[str] = None):
+        self.cache_path = cache_path
+        self.images: Dict[str, Dict] = {}  # digest -> metadata
+        self.paths: Dict[str, list] = {}  # abs path -> [size, mtime_ns, digest]
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    stored = json.load(f)
+                self.images = stored.get('images', {})
+                self.paths = stored.get('paths', {})
+            except (OSError, ValueError):
+                pass
+
+    def digest(self, path: str) -> str:
+        """Content hash of a file, reusing the persisted hash when unchanged"""
+        key = os.path.abspath(path)
+        stat = os.stat(key)
+        known = self.paths.get(key)
+        if known and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+            return known[2]
+        digest = file_digest(key)
+        self.paths[key] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+    def get(self, path: str) -> Dict:
+        digest = self.digest(path)
+        metadata = self.images.get(digest)
+        if metadata is None:
+            metadata = read_image_header(path)
+            self.images[digest] = metadata
+        return dict(metadata, digest=digest)
+
+    def save(self) -> None:
+        if not self.cache_path:
+            return
+        write_json_atomic(self.cache_path, {'images': self.images, 'paths': self.paths})
+
+# Process-wide cache used when no persistent cache is supplied
+DEFAULT_METADATA_CACHE = ImageMetadataCache()
+
+def inspect_image_asset(path: str, cache: Optional[ImageMetadataCache] = None) -> Dict:
+    """Header metadata plus the findings the image checks care about"""
+    metadata = (cache or DEFAULT_METADATA_CACHE).get(path)
+    width, height = metadata.get('width'), metadata.get('height')
+
+    metadata['is_spacer'] = bool(width and height and
+                                 width <= SPACER_MAX_DIMENSION and height <= SPACER_MAX_DIMENSION)
+    # Large line art (PNG/GIF/SVG) is typically a chart, diagram or screenshot
+    metadata['is_large_graphic'] = bool(
+        metadata.get('format') in ('png', 'gif', 'svg') and
+        max(width or 0, height or 0) >= COMPLEX_MIN_DIMENSION
+    )
+
+    issues = []
+    if metadata['file_size'] > OVERSIZED_BYTES:
+        issues.append(f"Image file is large ({metadata['file_size'] // 1024} KB)")
+    if max(width or 0, height or 0) > OVERSIZED_DIMENSION:
+        issues.append(f"Image dimensions are very large ({width}x{height})")
+    metadata['issues'] = issues
+    return metadata
@@ -0,0 +1,146 @@
+# Text-over-image contrast analysis using cached, downsampled luminance maps
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+from asset_cache import file_digest
+from color_contrast import Box, ColorContrastAnalyzer, RGBA
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None
+
+LUMINANCE_WEIGHTS = (0.2126, 0.7152, 0.0722)
+
+def _require_dependencies() -> None:
+    if np is None or Image is None:
+        raise ImportError("Text-over-image analysis requires numpy and Pillow (pip install numpy Pillow)")
+
+def _linear_luminance(rgb: "np.ndarray") -> "np.ndarray":
+    """Vectorized WCAG relative luminance for an (..., 3) array of 0-255 sRGB values"""
+    c = rgb / 255.0
+    linear = np.where(c <= 0.03928, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+    return linear @ np.asarray(LUMINANCE_WEIGHTS, dtype=np.float32)
+
+class ImageLuminanceCache:
+    """
+    Decoded images downsampled once and kept as NumPy arrays.
+    Entries are keyed by file content hash, so the same asset referenced from
+    many pages (or copied to several paths) is decoded a single time.
+    """
+
+    def __init__(self, max_dimension: int = 256, max_entries: int = 64):
+        self.max_dimension = max_dimension
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, np.ndarray]]" = OrderedDict()
+
+    def _load(self, image_path: str) -> Dict[str, "np.ndarray"]:
+        _require_dependencies()
+        digest = file_digest(image_path)
+
+        entry = self._entries.get(digest)
+        if entry is not None:
+            self._entries.move_to_end(digest)
+            return entry
+
+        with Image.open(image_path) as img:
+            # draft() lets the JPEG decoder skip work at reduced scale
+            img.draft('RGB', (self.max_dimension, self.max_dimension))
+            img = img.convert('RGB')
+            img.thumbnail((self.max_dimension, self.max_dimension), Image.BILINEAR)
+            rgb = np.asarray(img, dtype=np.float32)
+
+        entry = {'rgb': rgb, 'luminance': _linear_luminance(rgb).astype(np.float32)}
+        self._entries[digest] = entry
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def rgb(self, image_path: str) -> "np.ndarray":
+        """Downsampled (H, W, 3) sRGB array"""
+        return self._load(image_path)['rgb']
+
+    def luminance(self, image_path: str) -> "np.ndarray":
+        """Downsampled (H, W) relative luminance array"""
+        return self._load(image_path)['luminance']
+
+# Shared across pages for the lifetime of the process
+DEFAULT_IMAGE_CACHE = ImageLuminanceCache()
+
+def _crop(array: "np.ndarray", box: Optional[Box]) -> "np.ndarray":
+    if box is None:
+        return array
+
+    height, width = array.shape[:2]
+    left, top, right, bottom = box
+    x0 = min(max(int(left * width), 0), width - 1)
+    y0 = min(max(int(top * height), 0), height - 1)
+    x1 = max(int(round(right * width)), x0 + 1)
+    y1 = max(int(round(bottom * height)), y0 + 1)
+    return array[y0:y1, x0:x1]
+
+def analyze_text_over_image(image_path: str,
+                            text_color: Union[str, Tuple],
+                            box: Optional[Box] = None,
+                            overlay: Optional[RGBA] = None,
+                            percentiles: Sequence[int] = (5, 10, 50),
+                            cache: Optional[ImageLuminanceCache] = None) -> Dict:
+    """
+    Measure the contrast of a text color against the pixels of a background
+    image, optionally restricted to the fractional box under the text and
+    tinted by a translucent overlay layer.
+
+    Reports worst-case and percentile contrast ratios; WCAG compliance is
+    graded on the worst case.
+    """
+    _require_dependencies()
+    cache = cache or DEFAULT_IMAGE_CACHE
+
+    if overlay is not None and overlay[3] > 0.0:
+        alpha = overlay[3]
+        region_rgb = _crop(cache.rgb(image_path), box)
+        tinted = region_rgb * (1.0 - alpha) + np.asarray(overlay[:3], dtype=np.float32) * alpha
+        background_rgb = tinted
+        background_lum = _linear_luminance(tinted)
+    else:
+        background_rgb = None
+        background_lum = _crop(cache.luminance(image_path), box)
+
+    text = ColorContrastAnalyzer.to_rgba(text_color)
+    if text[3] < 1.0:
+        # Translucent text blends with every pixel it sits on
+        if background_rgb is None:
+            background_rgb = _crop(cache.rgb(image_path), box)
+        blended = np.asarray(text[:3], dtype=np.float32) * text[3] + background_rgb * (1.0 - text[3])
+        text_lum = _linear_luminance(blended)
+    else:
+        text_lum = ColorContrastAnalyzer.get_luminance(text)
+
+    lighter = np.maximum(background_lum, text_lum)
+    darker = np.minimum(background_lum, text_lum)
+    ratios = ((lighter + 0.05) / (darker + 0.05)).ravel()
+
+    worst = float(ratios.min())
+    percentile_values = np.percentile(ratios, percentiles)
+
+    return {
+        'image': image_path,
+        'text_color': text_color,
+        'box': box,
+        'overlay': overlay,
+        'samples': int(ratios.size),
+        'worst_case_ratio': round(worst, 2),
+        'percentile_ratios': {
+            f"p{p}": round(float(v), 2) for p, v in zip(percentiles, percentile_values)
+        },
+        'fraction_passing_aa': round(float((ratios >= ColorContrastAnalyzer.WCAG_AA_NORMAL).mean()), 3),
+        'wcag_aa': {
+            size: ColorContrastAnalyzer.check_wcag_compliance(worst, size, 'AA')
+            for size in ('normal', 'large')
+        }
+    }
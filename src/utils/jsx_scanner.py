@@ -0,0 +1,497 @@
+# Static accessibility checks on React component source (.tsx), without a build
+import json
+import os
+import re
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from asset_cache import file_digest, write_json_atomic
+from image_alt_checker import ImageAccessibilityAnalyzer
+
+# Bump when the rules change so cached findings are recomputed
+SCANNER_VERSION = 2
+
+# Below this many changed files, scanning inline beats starting a process pool
+PARALLEL_MIN_FILES = 8
+
+# Design-system components (src/components/ui) that render a single native element
+COMPONENT_TAGS = {'Input': 'input', 'Textarea': 'textarea', 'Button': 'button', 'Label': 'label'}
+
+NON_INTERACTIVE_TAGS = {'div', 'span', 'li', 'p', 'img', 'section', 'article', 'td', 'tr', 'header', 'footer'}
+INTERACTIVE_ROLES = {'button', 'link', 'checkbox', 'radio', 'switch', 'tab', 'menuitem', 'option', 'slider'}
+UNLABELLED_INPUT_TYPES = {'hidden', 'submit', 'reset', 'button', 'image'}
+KEY_HANDLERS = ('onKeyDown', 'onKeyUp', 'onKeyPress')
+
+_TS_SPECIAL = re.compile(r'["\'`/{}<]')
+_CHILD_SPECIAL = re.compile(r'[{<]')
+_TEMPLATE_SPECIAL = re.compile(r'[`\\]|\$\{')
+_TAG_NAME = re.compile(r'[A-Za-z_$][\w$.:-]*')
+_ATTR_NAME = re.compile(r'[A-Za-z_$][\w$:-]*')
+_IDENTIFIER_BEFORE = re.compile(r'[\w$]+$')
+_COMMENTS = re.compile(r'//[^\n]*|/\*.*?\*/', re.DOTALL)
+_LITERAL_EXPRESSION = re.compile(r'\s*(?:(["\'])(.*)\1|`([^`$]*)`|(-?\d+))\s*', re.DOTALL)
+
+# Characters after which '<' starts a JSX element rather than a comparison or type argument
+_JSX_PRECEDERS = set('([{,=?:&|!;>}')
+_JSX_KEYWORDS = {'return', 'yield', 'await', 'default'}
+
+@dataclass(frozen=True)
+class JsxExpression:
+    """An attribute value written as {expression}"""
+    source: str
+
+    def literal(self) -> Optional[str]:
+        """The value when the expression is just a string or number literal"""
+        match = _LITERAL_EXPRESSION.fullmatch(self.source)
+        if match is None:
+            return None
+        quoted, template, number = match.group(2), match.group(3), match.group(4)
+        return next(value for value in (quoted, template, number) if value is not None)
+
+@dataclass
+class JsxElement:
+    name: str  # '' for fragments
+    line: int
+    attrs: Dict[str, Any]  # str literal, JsxExpression, or True for bare attributes
+    parent: Optional['JsxElement'] = field(default=None, repr=False)
+    children: List['JsxElement'] = field(default_factory=list, repr=False)
+    text: List[str] = field(default_factory=list)
+    has_expression: bool = False  # {expression} children (comments excluded)
+    spread: bool = False  # {...props}: any attribute may be supplied at runtime
+
+    @property
+    def tag(self) -> Optional[str]:
+        """Native element rendered, or None for components the scanner cannot see into"""
+        if self.name in COMPONENT_TAGS:
+            return COMPONENT_TAGS[self.name]
+        return self.name if self.name[:1].islower() else None
+
+    def literal(self, attribute: str) -> Optional[str]:
+        value = self.attrs.get(attribute)
+        if isinstance(value, JsxExpression):
+            return value.literal()
+        return value if isinstance(value, str) else None
+
+    def has_content(self) -> bool:
+        return bool(''.join(self.text).strip() or self.children or self.has_expression)
+
+class _JsxParser:
+    """
+    Recursive-descent scan of TypeScript source that skips strings, template
+    literals, comments and regular expressions and parses every JSX element
+    it meets into a tree, remembering literal attribute values.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self.length = len(source)
+        self.elements: List[JsxElement] = []
+        self._line_starts = [0] + [m.end() for m in re.finditer('\n', source)]
+
+    def line(self, offset: int) -> int:
+        return bisect_right(self._line_starts, offset)
+
+    def parse(self) -> List[JsxElement]:
+        self.parse_ts(0, None, nested=False)
+        return self.elements
+
+    def _previous_char(self, pos: int) -> Tuple[str, int]:
+        pos -= 1
+        while pos >= 0 and self.source[pos].isspace():
+            pos -= 1
+        return (self.source[pos], pos) if pos >= 0 else ('', -1)
+
+    def _jsx_starts(self, pos: int) -> bool:
+        following = self.source[pos + 1:pos + 2]
+        if not (following.isalpha() or following in ('>', '_', '$')):
+            return False
+        previous, at = self._previous_char(pos)
+        if previous == '' or previous in _JSX_PRECEDERS:
+            return True
+        word = _IDENTIFIER_BEFORE.search(self.source, 0, at + 1)
+        return word is not None and word.group() in _JSX_KEYWORDS
+
+    def _regex_starts(self, pos: int) -> bool:
+        previous, at = self._previous_char(pos)
+        if previous == '' or previous in '(,=:[!&|?{};':
+            return True
+        word = _IDENTIFIER_BEFORE.search(self.source, 0, at + 1)
+        return word is not None and word.group() in ('return', 'typeof')
+
+    def _skip_string(self, pos: int) -> int:
+        quote = self.source[pos]
+        pos += 1
+        while pos < self.length:
+            char = self.source[pos]
+            if char == '\\':
+                pos += 2
+                continue
+            if char == quote or char == '\n':
+                return pos + 1
+            pos += 1
+        return pos
+
+    def _skip_regex(self, pos: int) -> int:
+        pos += 1
+        in_class = False
+        while pos < self.length:
+            char = self.source[pos]
+            if char == '\\':
+                pos += 2
+                continue
+            if char == '\n':
+                return pos
+            if char == '[':
+                in_class = True
+            elif char == ']':
+                in_class = False
+            elif char == '/' and not in_class:
+                return pos + 1
+            pos += 1
+        return pos
+
+    def _skip_template(self, pos: int, parent: Optional[JsxElement]) -> int:
+        pos += 1
+        while pos < self.length:
+            match = _TEMPLATE_SPECIAL.search(self.source, pos)
+            if match is None:
+                return self.length
+            token = match.group()
+            if token == '`':
+                return match.end()
+            if token == '\\':
+                pos = match.end() + 1
+            else:
+                pos = self.parse_ts(match.end(), parent, nested=True)
+        return pos
+
+    def _skip_space_and_comments(self, pos: int) -> int:
+        while pos < self.length:
+            if self.source[pos].isspace():
+                pos += 1
+            elif self.source.startswith('//', pos):
+                end = self.source.find('\n', pos)
+                pos = self.length if end < 0 else end + 1
+            elif self.source.startswith('/*', pos):
+                end = self.source.find('*/', pos + 2)
+                pos = self.length if end < 0 else end + 2
+            else:
+                break
+        return pos
+
+    def parse_ts(self, pos: int, parent: Optional[JsxElement], nested: bool) -> int:
+        """Scan code up to the '}' closing a nested expression (or the end); returns the offset after it"""
+        depth = 0
+        while True:
+            match = _TS_SPECIAL.search(self.source, pos)
+            if match is None:
+                return self.length
+            pos = match.start()
+            char = match.group()
+            if char in ('"', "'"):
+                pos = self._skip_string(pos)
+            elif char == '`':
+                pos = self._skip_template(pos, parent)
+            elif char == '/':
+                following = self.source[pos + 1:pos + 2]
+                if following in ('/', '*'):
+                    pos = self._skip_space_and_comments(pos)
+                elif self._regex_starts(pos):
+                    pos = self._skip_regex(pos)
+                else:
+                    pos += 1
+            elif char == '{':
+                depth += 1
+                pos += 1
+            elif char == '}':
+                if depth == 0 and nested:
+                    return pos + 1
+                depth -= 1
+                pos += 1
+            else:
+                end = self.parse_element(pos, parent) if self._jsx_starts(pos) else None
+                pos = pos + 1 if end is None else end
+
+    def _parse_attributes(self, pos: int) -> Optional[Tuple[Dict[str, Any], bool, int, bool]]:
+        """(attributes, has spread, offset after the start tag, self-closing) or None if not a tag"""
+        attrs: Dict[str, Any] = {}
+        spread = False
+        while True:
+            pos = self._skip_space_and_comments(pos)
+            if pos >= self.length:
+                return None
+            if self.source.startswith('/>', pos):
+                return attrs, spread, pos + 2, True
+            char = self.source[pos]
+            if char == '>':
+                return attrs, spread, pos + 1, False
+            if char == '{':
+                end = self.parse_ts(pos + 1, None, nested=True)
+                spread = spread or self.source[pos + 1:end].lstrip().startswith('...')
+                pos = end
+                continue
+
+            match = _ATTR_NAME.match(self.source, pos)
+            if match is None:
+                return None
+            name = match.group()
+            pos = self._skip_space_and_comments(match.end())
+            if not self.source.startswith('=', pos):
+                attrs[name] = True
+                continue
+
+            pos = self._skip_space_and_comments(pos + 1)
+            char = self.source[pos:pos + 1]
+            if char in ('"', "'"):
+                end = self.source.find(char, pos + 1)
+                if end < 0:
+                    return None
+                attrs[name] = self.source[pos + 1:end]
+                pos = end + 1
+            elif char == '{':
+                end = self.parse_ts(pos + 1, None, nested=True)
+                attrs[name] = JsxExpression(self.source[pos + 1:end - 1])
+                pos = end
+            elif char == '<':
+                end = self.parse_element(pos, None)
+                if end is None:
+                    return None
+                attrs[name] = JsxExpression(self.source[pos:end])
+                pos = end
+            else:
+                return None
+
+    def parse_element(self, pos: int, parent: Optional[JsxElement]) -> Optional[int]:
+        """Parse an element and its children; returns the offset after it, or None if '<' is not JSX"""
+        if self.source.startswith('<>', pos):
+            name, attrs, spread, end, self_closing = '', {}, False, pos + 2, False
+        else:
+            match = _TAG_NAME.match(self.source, pos + 1)
+            if match is None:
+                return None
+            parsed = self._parse_attributes(match.end())
+            if parsed is None:
+                return None
+            name = match.group()
+            attrs, spread, end, self_closing = parsed
+
+        element = JsxElement(name, self.line(pos), attrs, parent, spread=spread)
+        self.elements.append(element)
+        if parent is not None:
+            parent.children.append(element)
+        if self_closing:
+            return end
+
+        pos = end
+        while True:
+            match = _CHILD_SPECIAL.search(self.source, pos)
+            if match is None:
+                return self.length
+            text = self.source[pos:match.start()]
+            if text.strip():
+                element.text.append(text)
+            pos = match.start()
+            if match.group() == '{':
+                end = self.parse_ts(pos + 1, element, nested=True)
+                if _COMMENTS.sub('', self.source[pos + 1:end - 1]).strip():
+                    element.has_expression = True
+                pos = end
+            elif self.source.startswith('</', pos):
+                close = self.source.find('>', pos)
+                return self.length if close < 0 else close + 1
+            else:
+                end = self.parse_element(pos, element)
+                if end is None:
+                    element.text.append('<')
+                    pos += 1
+                else:
+                    pos = end
+
+def parse_jsx(source: str) -> List[JsxElement]:
+    """Every JSX element in a module, in source order"""
+    return _JsxParser(source).parse()
+
+def _heading_level(element: JsxElement) -> int:
+    tag = element.tag
+    if element.literal('role') == 'heading':
+        level = element.literal('aria-level')
+        return int(level) if level and level.isdigit() and 1 <= int(level) <= 6 else 2
+    if tag in ('h1', 'h2', 'h3', 'h4', 'h5', 'h6'):
+        return int(tag[1])
+    return 0
+
+def _is_aria_hidden(element: JsxElement) -> bool:
+    """aria-hidden written as "true", {true} or a bare attribute"""
+    value = element.attrs.get('aria-hidden')
+    if isinstance(value, JsxExpression):
+        return value.source.strip() == 'true' or value.literal() == 'true'
+    return value is True or value == 'true'
+
+def _is_labelled(element: JsxElement, label_targets: set) -> bool:
+    if element.spread or any(a in element.attrs for a in ('aria-label', 'aria-labelledby', 'title')):
+        return True
+    element_id = element.attrs.get('id')
+    if isinstance(element_id, JsxExpression) and element_id.literal() is None:
+        return True  # Dynamic id: a matching htmlFor cannot be checked statically
+    if element_id is not None and element.literal('id') in label_targets:
+        return True
+    parent = element.parent
+    while parent is not None:
+        if parent.tag == 'label':
+            return True
+        parent = parent.parent
+    return False
+
+def scan_source(source: str) -> List[Dict]:
+    """Heading, image alt, keyboard focus and form label findings for one component module"""
+    elements = parse_jsx(source)
+    findings = []
+
+    def report(check: str, severity: str, message: str, element: JsxElement) -> None:
+        findings.append({'check': check, 'severity': severity, 'message': message, 'line': element.line})
+
+    label_targets = {el.literal('htmlFor') for el in elements if el.tag == 'label' and el.literal('htmlFor')}
+    previous_level = 0
+    hidden: Set[int] = set()  # id() of elements inside an aria-hidden subtree
+
+    for element in elements:
+        parent = element.parent
+        if parent is None:
+            # A new top-level JSX tree: headings of other components are unrelated
+            previous_level = 0
+        if _is_aria_hidden(element) or (parent is not None and id(parent) in hidden):
+            hidden.add(id(element))
+        tag = element.tag
+        if tag is None and element.literal('role') is None:
+            continue
+
+        # Headings: empty headings and skipped levels within the component
+        level = _heading_level(element)
+        if level:
+            if not (element.has_content() or element.spread or 'aria-label' in element.attrs):
+                report('headings', 'error', f'Empty heading <{element.name}>', element)
+            if previous_level and level > previous_level + 1:
+                report('headings', 'warning', f'Heading level skips from h{previous_level} to h{level}', element)
+            previous_level = level
+
+        # Images: missing or low-quality literal alt text
+        if tag == 'img' and not element.spread:
+            alt = element.attrs.get('alt')
+            if alt is None:
+                report('images', 'error', '<img> is missing alt text', element)
+            else:
+                alt = element.literal('alt')
+                if alt:
+                    src = element.literal('src') or ''
+                    issues = ImageAccessibilityAnalyzer._assess_alt_quality(alt, src)['issues']
+                    if issues:
+                        report('images', 'warning', f'Alt text "{alt}": {", ".join(issues)}', element)
+
+        # Keyboard: positive tabIndex and mouse-only interactive elements. An
+        # aria-hidden element (e.g. a backdrop closing a drawer) is not exposed
+        # to assistive technology, so it needs neither focus nor a role
+        tabindex = element.literal('tabIndex')
+        if tabindex is not None and tabindex.lstrip('-').isdigit() and int(tabindex) > 0:
+            report('keyboard', 'warning', f'Positive tabIndex ({tabindex}) overrides the natural focus order', element)
+        role = element.literal('role')
+        # Explicit non-widget roles (dialog, presentation...) often take clicks only to stop propagation
+        if (tag in NON_INTERACTIVE_TAGS and not element.spread and id(element) not in hidden
+                and (role is None or role in INTERACTIVE_ROLES)):
+            clickable = 'onClick' in element.attrs
+            if (clickable or role in INTERACTIVE_ROLES) and 'tabIndex' not in element.attrs:
+                report('keyboard', 'error', f'Interactive <{element.name}> is not keyboard focusable', element)
+            elif clickable and not any(h in element.attrs for h in KEY_HANDLERS):
+                report('keyboard', 'warning', f'Clickable <{element.name}> has no keyboard handler', element)
+            if clickable and role is None and not isinstance(element.attrs.get('role'), JsxExpression):
+                report('keyboard', 'warning', f'Clickable <{element.name}> has no role', element)
+
+        # Labels: form controls need a programmatic label
+        if tag in ('input', 'select', 'textarea'):
+            input_type = (element.literal('type') or 'text').lower() if tag == 'input' else None
+            if input_type not in UNLABELLED_INPUT_TYPES and not _is_labelled(element, label_targets):
+                hint = ' (placeholder is not a label)' if 'placeholder' in element.attrs else ''
+                report('labels', 'error', f'<{element.name}> has no associated label{hint}', element)
+
+    return findings
+
+def _scan_file(path: str) -> List[Dict]:
+    """Worker entry point: runs in a pool process"""
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        return scan_source(f.read())
+
+class ComponentScanCache:
+    """
+    Findings keyed by component file content hash, persisted between runs.
+    Only the digests of files seen in the current run are saved, so entries
+    for edited or deleted components do not accumulate.
+    """
+
+    def __init__(self, cache_path: Optional[str] = None):
+        self.cache_path = cache_path
+        self.findings: Dict[str, List[Dict]] = {}
+        self.seen: Set[str] = set()
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    stored = json.load(f)
+                if stored.get('version') == SCANNER_VERSION:
+                    self.findings = stored.get('findings', {})
+            except (OSError, ValueError):
+                pass
+
+    def save(self) -> None:
+        if not self.cache_path:
+            return
+        findings = {digest: found for digest, found in self.findings.items() if digest in self.seen}
+        write_json_atomic(self.cache_path, {'version': SCANNER_VERSION, 'findings': findings})
+
+def scan_components(source_dir: str = 'src',
+                    cache: Optional[ComponentScanCache] = None,
+                    workers: Optional[int] = None,
+                    pattern: str = '**/*.tsx') -> Dict:
+    """
+    Scan every component under source_dir. Only files whose content hash is
+    not cached are parsed, in a process pool when there are enough of them,
+    so re-running after an edit costs little more than hashing the tree.
+    Findings carry a 'location' of file:line relative to source_dir's parent.
+    """
+    cache = cache or ComponentScanCache()
+    root = Path(source_dir)
+    files = sorted(root.glob(pattern))
+    digests = {str(path): file_digest(str(path)) for path in files}
+    cache.seen.update(digests.values())
+
+    stale = [path for path, digest in digests.items() if digest not in cache.findings]
+    if len(stale) >= PARALLEL_MIN_FILES:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            scanned = list(pool.map(_scan_file, stale, chunksize=4))
+    else:
+        scanned = [_scan_file(path) for path in stale]
+    for path, findings in zip(stale, scanned):
+        cache.findings[digests[path]] = findings
+
+    reports = []
+    for path in files:
+        name = str(path.relative_to(root.parent))
+        findings = [dict(f, location=f"{name}:{f['line']}") for f in cache.findings[digests[str(path)]]]
+        reports.append({
+            'file': name,
+            'findings': findings,
+            'summary': {
+                'errors': sum(1 for f in findings if f['severity'] == 'error'),
+                'warnings': sum(1 for f in findings if f['severity'] == 'warning')
+            }
+        })
+
+    return {
+        'files': reports,
+        'summary': {
+            'files_scanned': len(files),
+            'files_parsed': len(stale),
+            'errors': sum(r['summary']['errors'] for r in reports),
+            'warnings': sum(r['summary']['warnings'] for r in reports)
+        }
+    }
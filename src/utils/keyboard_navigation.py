@@ -1,79 +1,301 @@
 # Enhanced keyboard navigation and focus management utilities
 from bs4 import BeautifulSoup
 from typing import Dict, List, Optional, Set
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 import re
 
+from asset_cache import write_atomic
+from dom_index import DocumentIndex
+from html_patcher import HtmlPatcher, scan_tags
+
 class KeyboardNavigationEnhancer:
     """Enhanced keyboard navigation with proper focus management"""
     
-    FOCUSABLE_ELEMENTS = [
-        'a[href]', 'area[href]', 'input:not([disabled])', 
-        'select:not([disabled])', 'textarea:not([disabled])',
-        'button:not([disabled])', 'iframe', 'object', 'embed',
-        '[contenteditable]', '[tabindex]:not([tabindex^="-"])'
-    ]
+    # Natively focusable elements: tag -> predicate on the element.
+    # Disabled state, inert subtrees and hidden content are applied on top
+    FOCUSABLE_TAGS = {
+        'a': lambda el: el.has_attr('href') or el.has_attr('xlink:href'),
+        'area': lambda el: el.has_attr('href'),
+        'input': lambda el: el.get('type', '').lower() != 'hidden',
+        'select': lambda el: True,
+        'textarea': lambda el: True,
+        'button': lambda el: True,
+        'iframe': lambda el: True,
+        'object': lambda el: True,
+        'embed': lambda el: True,
+        'audio': lambda el: el.has_attr('controls'),
+        'video': lambda el: el.has_attr('controls'),
+        'summary': lambda el: el.parent is not None and el.parent.name == 'details',
+    }
+    
+    # Elements the disabled attribute (own or from a disabled fieldset) applies to
+    DISABLEABLE_TAGS = {'button', 'input', 'select', 'textarea', 'optgroup', 'option', 'fieldset'}
+    
+    # Accessible names of controls that dismiss a dialog (English and the
+    # app's pt-BR), or a close glyph anywhere in the name
+    CLOSE_CONTROL = re.compile(
+        r'\b(close|dismiss|cancel|done|ok|back|fechar|cancelar|voltar|concluir|sair|dispensar)\b'
+        r'|[×✕✖]|^x$',
+        re.IGNORECASE
+    )
     
     INTERACTIVE_ROLES = {
         'button', 'checkbox', 'link', 'menuitem', 'menuitemcheckbox',
         'menuitemradio', 'option', 'radio', 'slider', 'spinbutton',
         'switch', 'tab', 'textbox', 'treeitem'
     }
+    
+    # Items managed by a composite widget -> the composite roles that own them.
+    # Only the composite (aria-activedescendant) or one item (roving
+    # tabindex) needs to be tabbable
+    COMPOSITE_ITEMS = {
+        'option': {'listbox'},
+        'menuitem': {'menu', 'menubar'},
+        'menuitemcheckbox': {'menu', 'menubar'},
+        'menuitemradio': {'menu', 'menubar'},
+        'tab': {'tablist'},
+        'treeitem': {'tree', 'treegrid'},
+        'radio': {'radiogroup'},
+    }
+    COMPOSITE_ROLES = {'listbox', 'menu', 'menubar', 'tablist', 'tree', 'treegrid', 'radiogroup'}
 
     @staticmethod
-    def analyze_focus_order(html_content: str) -> Dict:
-        """Analyze and report on keyboard focus order"""
-        soup = BeautifulSoup(html_content, "html.parser")
-        
-        # Find all potentially focusable elements
-        focusable_elements = []
-        
-        # Get elements with explicit tabindex
-        tabindex_elements = soup.find_all(attrs={"tabindex": True})
-        
-        # Get naturally focusable elements
-        for selector in KeyboardNavigationEnhancer.FOCUSABLE_ELEMENTS:
-            elements = soup.select(selector)
-            focusable_elements.extend(elements)
-        
-        # Add elements with interactive roles
-        role_elements = soup.find_all(attrs={"role": True})
-        for element in role_elements:
-            if element.get("role") in KeyboardNavigationEnhancer.INTERACTIVE_ROLES:
-                focusable_elements.append(element)
-        
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_elements = []
-        for elem in focusable_elements:
-            elem_id = id(elem)
-            if elem_id not in seen:
-                seen.add(elem_id)
-                unique_elements.append(elem)
+    def _parse_tabindex(value: Optional[str]) -> Optional[int]:
+        """tabindex as an integer; invalid values are ignored like in browsers"""
+        try:
+            return int(value.strip()) if value is not None else None
+        except ValueError:
+            return None
+
+    @staticmethod
+    def classify_focusable(index: DocumentIndex) -> Dict[str, List]:
+        """
+        Classify every element in one document-order pass.
+
+        Returns 'tab_order' (the sequential focus navigation order: positive
+        tabindex values ascending, then tabindex 0 and native controls in DOM
+        order), 'focusable_only' (tabindex < 0, focusable by script) and
+        'unfocusable_widgets' (interactive roles that cannot receive focus).
+        Each entry is (element, tabindex). Items of a composite widget
+        (options, menu items, tabs, tree items, radios) count only when the
+        whole composite has no focusable member and no aria-activedescendant.
+        
+        The same pass builds 'containers': every dialog (role="dialog",
+        role="alertdialog", aria-modal="true", <dialog>) and inert subtree with
+        the tabbable elements it contains. Containers are recorded whether or
+        not they are currently hidden, since closed dialogs open at runtime.
+        """
+        focusable_tags = KeyboardNavigationEnhancer.FOCUSABLE_TAGS
+        disableable = KeyboardNavigationEnhancer.DISABLEABLE_TAGS
+        interactive_roles = KeyboardNavigationEnhancer.INTERACTIVE_ROLES
+        composite_items = KeyboardNavigationEnhancer.COMPOSITE_ITEMS
+        composite_roles = KeyboardNavigationEnhancer.COMPOSITE_ROLES
+        
+        positive: Dict[int, List] = {}
+        sequential, focusable_only, unfocusable_widgets = [], [], []
+        containers, open_containers = [], []
+        # Composite widgets: whether any member (or the composite itself) is
+        # focusable, and the unfocusable items waiting on that answer
+        composites, open_composites = [], []
+        
+        # Inherited inert / disabled-fieldset state as position ranges, so no
+        # ancestor walks are needed
+        inert_until = 0
+        disabled_until = 0
+        legend_range = (0, 0)  # first <legend> of a disabled fieldset stays enabled
+        
+        for position, element in enumerate(index.elements):
+            while open_containers and position >= open_containers[-1]['end']:
+                open_containers.pop()
+            while open_composites and position >= open_composites[-1]['end']:
+                open_composites.pop()
+            
+            name = element.name
+            fieldset_disabled = position < disabled_until and not (legend_range[0] <= position < legend_range[1])
+            if position >= inert_until and element.has_attr('inert'):
+                inert_until = index.subtree_end(element)
+            if name == 'fieldset' and element.has_attr('disabled') and not fieldset_disabled:
+                disabled_until = max(disabled_until, index.subtree_end(element))
+                legend = element.find('legend', recursive=False)
+                if legend is not None:
+                    legend_range = (index.position(legend), index.subtree_end(legend))
+            
+            native = focusable_tags.get(name)
+            focusable = native is not None and native(element)
+            if focusable and name in disableable and (element.has_attr('disabled') or fieldset_disabled):
+                focusable = False
+            if not focusable and element.get('contenteditable', 'false').lower() in ('', 'true', 'plaintext-only'):
+                focusable = True
+            
+            tabindex = KeyboardNavigationEnhancer._parse_tabindex(element.get('tabindex'))
+            if tabindex is not None and not (name in disableable and (element.has_attr('disabled') or fieldset_disabled)):
+                focusable = True
+            
+            # Tabbable elements are recorded on every enclosing container
+            # (nesting depth is small, so this stays linear in practice)
+            if focusable and open_containers and (tabindex is None or tabindex >= 0):
+                for container in open_containers:
+                    container['focusables'].append(element)
+            kind = KeyboardNavigationEnhancer._container_kind(element)
+            if kind:
+                container = {'element': element, 'kind': kind, 'end': index.subtree_end(element), 'focusables': []}
+                containers.append(container)
+                open_containers.append(container)
+            role = element.get('role')
+            if role in composite_roles:
+                composite = {'role': role, 'end': index.subtree_end(element), 'items': [],
+                             'focusable': element.has_attr('aria-activedescendant')}
+                composites.append(composite)
+                open_composites.append(composite)
+            
+            if position < inert_until or index.is_hidden(element):
+                continue
+            
+            if not focusable:
+                if role in interactive_roles:
+                    owners = composite_items.get(role, ())
+                    owner = next((c for c in reversed(open_composites) if c['role'] in owners), None)
+                    if owner is not None:
+                        owner['items'].append((element, tabindex))
+                    else:
+                        unfocusable_widgets.append((element, tabindex))
+                continue
+            for composite in open_composites:
+                composite['focusable'] = True
+            
+            if tabindex is None or tabindex == 0:
+                sequential.append((element, tabindex))
+            elif tabindex > 0:
+                positive.setdefault(tabindex, []).append((element, tabindex))
+            else:
+                focusable_only.append((element, tabindex))
+        
+        tab_order = [entry for value in sorted(positive) for entry in positive[value]]
+        tab_order.extend(sequential)
+        for composite in composites:
+            if not composite['focusable']:
+                unfocusable_widgets.extend(composite['items'])
+        unfocusable_widgets.sort(key=lambda entry: index.position(entry[0]))
+        return {
+            'tab_order': tab_order,
+            'focusable_only': focusable_only,
+            'unfocusable_widgets': unfocusable_widgets,
+            'containers': containers
+        }
+
+    @staticmethod
+    def _container_kind(element) -> Optional[str]:
+        if (element.name == 'dialog' or element.get('role') in ('dialog', 'alertdialog')
+                or element.get('aria-modal') == 'true'):
+            return 'dialog'
+        if element.has_attr('inert'):
+            return 'inert'
+        return None
+
+    @staticmethod
+    def _closes_dialog(element, dialog) -> bool:
+        """Structural close controls: dismiss data attributes, formmethod="dialog" or a <form method="dialog">"""
+        if element.has_attr('data-dismiss') or element.has_attr('data-bs-dismiss'):
+            return True
+        if (element.get('formmethod') or '').lower() == 'dialog':
+            return True
+        parent = element.parent
+        while parent is not None and parent is not dialog:
+            if parent.name == 'form' and (parent.get('method') or '').lower() == 'dialog':
+                return True
+            parent = parent.parent
+        return False
+
+    @staticmethod
+    def analyze_dialogs(index: DocumentIndex, classified: Optional[Dict] = None) -> List[Dict]:
+        """
+        Static focus containment check for every dialog: a dialog needs
+        something to move focus into, a way to close it, and a name.
+        """
+        if classified is None:
+            classified = KeyboardNavigationEnhancer.classify_focusable(index)
+        
+        dialogs = []
+        for container in classified['containers']:
+            if container['kind'] != 'dialog':
+                continue
+            dialog = container['element']
+            focusables = container['focusables']
+            names = [index.accessible_name(el) for el in focusables]
+            has_close_control = any(KeyboardNavigationEnhancer.CLOSE_CONTROL.search(name) for name in names) or any(
+                KeyboardNavigationEnhancer._closes_dialog(el, dialog) for el in focusables
+            )
+            label = index.accessible_name(dialog)
+            
+            issues = []
+            if not focusables:
+                issues.append({'severity': 'error',
+                               'message': 'Dialog contains no focusable elements; keyboard focus cannot move into it'})
+            if not has_close_control:
+                issues.append({'severity': 'warning',
+                               'message': 'Dialog has no close control; keyboard users may be trapped'})
+            if not label:
+                issues.append({'severity': 'warning',
+                               'message': 'Dialog has no accessible name (add aria-labelledby pointing at its title)'})
+            
+            dialogs.append({
+                'tag': dialog.name,
+                'role': dialog.get('role') or ('dialog' if dialog.name == 'dialog' else None),
+                'modal': dialog.get('aria-modal') == 'true' or dialog.name == 'dialog',
+                'hidden': index.is_hidden(dialog),
+                'label': label,
+                'focusable_count': len(focusables),
+                'has_close_control': has_close_control,
+                'line': getattr(dialog, 'sourceline', None),
+                'issues': issues
+            })
+        return dialogs
+
+    @staticmethod
+    def analyze_focus_order(html_content: str, index: Optional[DocumentIndex] = None) -> Dict:
+        """Analyze and report on keyboard focus order (index: an existing parse of the page)"""
+        if index is None:
+            index = DocumentIndex(BeautifulSoup(html_content, "html.parser"))
+        classified = KeyboardNavigationEnhancer.classify_focusable(index)
+        unique_elements = [element for element, _ in classified['tab_order']]
         
         # Analyze focus order
         focus_analysis = {
             'total_focusable': len(unique_elements),
+            'programmatically_focusable': len(classified['focusable_only']),
             'elements': [],
             'issues': [],
             'recommendations': []
         }
         
+        for element, _ in classified['unfocusable_widgets']:
+            focus_analysis['issues'].append({
+                'severity': 'error',
+                'message': f'Element with role="{element.get("role")}" ({element.name}) is not keyboard focusable; add tabindex="0"',
+                'line': getattr(element, 'sourceline', None)
+            })
+        
         for i, element in enumerate(unique_elements):
             tabindex = element.get('tabindex')
+            name, name_source = index.names.name_and_source(element)
             element_info = {
                 'order': i + 1,
                 'tag': element.name,
                 'type': element.get('type'),
                 'role': element.get('role'),
                 'tabindex': tabindex,
+                'dom_order': index.position(element),
                 'has_aria_label': bool(element.get('aria-label')),
                 'has_aria_labelledby': bool(element.get('aria-labelledby')),
-                'text_content': element.get_text(strip=True)[:50],
+                'accessible_name': name[:100],
+                'name_source': name_source,
+                'text_content': name[:50] if name_source == 'content' else '',
                 'line': getattr(element, 'sourceline', None)
             }
             
             # Check for accessibility issues
-            if not element_info['has_aria_label'] and not element_info['has_aria_labelledby'] and not element_info['text_content']:
+            if not name:
                 focus_analysis['issues'].append({
                     'severity': 'error',
                     'element_order': i + 1,
@@ -101,46 +323,57 @@ class KeyboardNavigationEnhancer:
         return focus_analysis
 
     @staticmethod
-    def add_proper_keyboard_support(html_content: str) -> str:
-        """Add proper keyboard support to interactive elements"""
-        soup = BeautifulSoup(html_content, "html.parser")
-        
-        # Find clickable divs/spans and convert to buttons
-        clickable_elements = soup.find_all(attrs={"onclick": True})
-        clickable_elements.extend(soup.find_all(class_=re.compile(r'clickable|cursor-pointer')))
-        
-        for element in clickable_elements:
-            if element.name not in ['button', 'a', 'input', 'select', 'textarea']:
-                # Convert to button if it's acting like one
-                if element.name in ['div', 'span']:
-                    element.name = 'button'
-                    element.attrs.pop('onclick', None)  # Remove inline onclick
-                    
-                    # Add proper attributes
-                    if not element.get('type'):
-                        element['type'] = 'button'
-                    
-                    if not element.get('aria-label') and not element.get_text(strip=True):
-                        element['aria-label'] = 'Interactive element'
+    def keyboard_support_patches(html_content: str) -> HtmlPatcher:
+        """
+        Record the keyboard fixes as patches against the original source:
+        clickable div/span -> button (onclick removed, type and fallback
+        aria-label added), a skip link after <body>, and id="main-content" on
+        <main>. Nothing else in the document is touched.
+        """
+        patcher = HtmlPatcher(html_content)
+        tags = scan_tags(html_content)
+        clickable_class = re.compile(r'clickable|cursor-pointer')
+        
+        has_skip_link = any('skip-link' in (tag.attrs.get('class') or '').split() for tag in tags)
+        body = next((tag for tag in tags if tag.name == 'body'), None)
+        main = next((tag for tag in tags if tag.name == 'main'), None)
+        
+        for tag in tags:
+            if tag.name not in ('div', 'span'):
+                continue
+            classes = (tag.attrs.get('class') or '').split()
+            if 'onclick' not in tag.attrs and not any(clickable_class.search(c) for c in classes):
+                continue
+            
+            # Convert to button if it's acting like one
+            patcher.rename(tag, 'button')
+            patcher.remove_attribute(tag, 'onclick')  # Remove inline onclick
+            if not tag.attrs.get('type'):
+                patcher.set_attribute(tag, 'type', 'button')
+            if not tag.attrs.get('aria-label') and not tag.has_text:
+                patcher.set_attribute(tag, 'aria-label', 'Interactive element')
         
         # Add skip links if not present
-        body = soup.find('body')
-        if body and not soup.find(class_='skip-link'):
-            skip_link = soup.new_tag('a', href='#main-content', class_='skip-link')
-            skip_link.string = 'Skip to main content'
-            body.insert(0, skip_link)
+        if body is not None and not has_skip_link:
+            patcher.insert(body.start_end, '<a class="skip-link" href="#main-content">Skip to main content</a>')
         
         # Ensure main content area has proper id
-        main = soup.find('main')
-        if main and not main.get('id'):
-            main['id'] = 'main-content'
+        if main is not None and not main.attrs.get('id'):
+            patcher.set_attribute(main, 'id', 'main-content')
         
-        return str(soup)
+        return patcher
 
     @staticmethod
-    def validate_focus_management(html_content: str) -> Dict:
-        """Validate focus management patterns"""
-        soup = BeautifulSoup(html_content, "html.parser")
+    def add_proper_keyboard_support(html_content: str) -> str:
+        """Add proper keyboard support to interactive elements"""
+        return KeyboardNavigationEnhancer.keyboard_support_patches(html_content).apply()
+
+    @staticmethod
+    def validate_focus_management(html_content: str, index: Optional[DocumentIndex] = None) -> Dict:
+        """Validate focus management patterns (index: an existing parse of the page)"""
+        if index is None:
+            index = DocumentIndex(BeautifulSoup(html_content, "html.parser"))
+        soup = index.root
         
         validation_results = {
             'skip_links': False,
@@ -174,16 +407,19 @@ class KeyboardNavigationEnhancer:
                 'message': 'No focus indicators found in styles. All interactive elements must have visible focus indicators.'
             })
         
-        # Check for potential keyboard traps
-        tabindex_elements = soup.find_all(attrs={"tabindex": "-1"})
-        for element in tabindex_elements:
-            # This is a simplified check - real implementation would be more complex
-            if element.name in ['div', 'span'] and 'modal' in element.get('class', []):
+        # Dialog focus containment (role="dialog", aria-modal, <dialog>)
+        dialogs = KeyboardNavigationEnhancer.analyze_dialogs(index)
+        validation_results['dialogs'] = dialogs
+        for dialog in dialogs:
+            if not dialog['focusable_count'] or (dialog['modal'] and not dialog['has_close_control']):
                 validation_results['keyboard_traps'].append({
-                    'element': element.name,
-                    'classes': element.get('class', []),
-                    'warning': 'Potential keyboard trap in modal-like element'
+                    'element': dialog['tag'],
+                    'line': dialog['line'],
+                    'warning': 'Dialog focus cannot enter or leave it by keyboard'
                 })
+            for issue in dialog['issues']:
+                validation_results['issues'].append(dict(issue, line=dialog['line']))
+        validation_results['modal_focus'] = not validation_results['keyboard_traps']
         
         return validation_results
 
@@ -208,8 +444,7 @@ def enhance_keyboard_accessibility(file_path: str, output_path: Optional[str] =
         
         # Write enhanced version
         output_file = output_path or file_path.replace('.html', '_accessible.html')
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(enhanced_html)
+        write_atomic(output_file, enhanced_html)
         
         print(f"Enhanced HTML written to: {output_file}")
         print(f"Validation results: {len(validation['issues'])} remaining issues")
@@ -218,4 +453,20 @@ def enhance_keyboard_accessibility(file_path: str, output_path: Optional[str] =
         
     except Exception as e:
         print(f"Error enhancing keyboard accessibility: {e}")
-        return False
\ No newline at end of file
+        return False
+
+def enhance_directory(directory: str, in_place: bool = False, workers: Optional[int] = None) -> Dict[str, bool]:
+    """
+    Apply the keyboard fixes to every HTML file under a directory (e.g. dist/)
+    in parallel worker processes. Output is written atomically, either next to
+    each page as *_accessible.html or over the page itself with in_place.
+    """
+    files = sorted(
+        str(path) for path in Path(directory).rglob('*.html')
+        if not path.name.endswith('_accessible.html')
+    )
+    outputs = files if in_place else [None] * len(files)
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(enhance_keyboard_accessibility, files, outputs))
+    return dict(zip(files, results))
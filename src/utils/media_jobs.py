@@ -0,0 +1,245 @@
+# Batch caption generation for a library of videos, with resumable per-job state
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from asset_cache import file_identity, write_json_atomic
+from captions import CAPTION_FORMATS, write_captions
+from transcription import BACKENDS, segments_to_cues, transcribe_stream
+
+MEDIA_EXTENSIONS = {'.mp4', '.m4v', '.mov', '.webm', '.mkv', '.avi', '.mp3', '.m4a', '.ogg', '.wav'}
+
+# Job stages, in order. 'transcribed' means every segment has text but the
+# caption file has not been written yet.
+STAGES = ('pending', 'transcribing', 'transcribed', 'done')
+
+@dataclass
+class MediaJob:
+    source: str
+    output: str
+    language: str = 'en-US'
+    format_type: str = 'vtt'
+
+    @property
+    def job_id(self) -> str:
+        return hashlib.sha1(os.path.abspath(self.source).encode('utf-8')).hexdigest()[:16]
+
+    def is_up_to_date(self) -> bool:
+        """Caption output exists and is newer than the source"""
+        try:
+            return os.stat(self.output).st_mtime_ns >= os.stat(self.source).st_mtime_ns
+        except OSError:
+            return False
+
+def _caption_path(source: Path, root: Path, output_dir: Optional[str], format_type: str) -> str:
+    if output_dir is None:
+        return str(source.with_suffix(f'.{format_type}'))
+    return str(Path(output_dir) / source.relative_to(root).with_suffix(f'.{format_type}'))
+
+def discover_jobs(target: str,
+                  output_dir: Optional[str] = None,
+                  format_type: str = 'vtt',
+                  language: str = 'en-US') -> List[MediaJob]:
+    """
+    Build jobs from a directory (searched recursively for media files) or a
+    manifest. A .json manifest is a list of paths or of objects with
+    'source' and optional 'output' / 'language'; any other file is read as
+    one path per line ('#' starts a comment). Relative paths are resolved
+    against the manifest's directory. Captions default to the source path
+    with the format's extension, mirrored under output_dir when given.
+    """
+    if format_type not in CAPTION_FORMATS:
+        raise ValueError(f"Unsupported caption format: {format_type}")
+
+    root = Path(target)
+    if root.is_dir():
+        sources = sorted(p for p in root.rglob('*') if p.is_file() and p.suffix.lower() in MEDIA_EXTENSIONS)
+        return [MediaJob(str(p), _caption_path(p, root, output_dir, format_type), language, format_type)
+                for p in sources]
+
+    base = root.parent
+    with open(root, 'r', encoding='utf-8') as f:
+        if root.suffix.lower() == '.json':
+            entries = json.load(f)
+        else:
+            entries = [line.split('#', 1)[0].strip() for line in f]
+            entries = [line for line in entries if line]
+
+    jobs = []
+    for entry in entries:
+        if isinstance(entry, str):
+            entry = {'source': entry}
+        source = base / entry['source']
+        output = entry.get('output')
+        output = str(base / output) if output else _caption_path(source, base, output_dir, format_type)
+        jobs.append(MediaJob(str(source), output, entry.get('language', language), format_type))
+    return jobs
+
+class JobState:
+    """
+    Stage and outcome of every job, persisted atomically after each change
+    so an interrupted batch resumes where it stopped. Shared by the runner's
+    threads, hence the lock.
+    """
+
+    def __init__(self, state_path: str):
+        self.state_path = state_path
+        self.jobs: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(state_path):
+            try:
+                with open(state_path, 'r', encoding='utf-8') as f:
+                    self.jobs = json.load(f).get('jobs', {})
+            except (OSError, ValueError):
+                self.jobs = {}
+
+    def get(self, job_id: str) -> Dict:
+        with self._lock:
+            return dict(self.jobs.get(job_id, {}))
+
+    def update(self, job_id: str, **fields) -> None:
+        with self._lock:
+            self.jobs.setdefault(job_id, {}).update(fields, updated=time.time())
+            self._save()
+
+    def _save(self) -> None:
+        write_json_atomic(self.state_path, {'jobs': self.jobs}, indent=2)
+
+def _load_transcript(state_path: str) -> Optional[List[Dict]]:
+    """Segments with their text from a finished per-segment transcription state"""
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        return None
+    texts = stored.get('texts', {})
+    segments = stored.get('segments', [])
+    if not segments or any(s['speech_start'] is not None and str(s['index']) not in texts for s in segments):
+        return None
+    return [dict(s, text=texts.get(str(s['index']), '')) for s in segments]
+
+class MediaJobRunner:
+    """
+    Runs caption jobs as a pipeline. Each job is driven by an I/O thread that
+    streams audio out of ffmpeg and segments it at silence; voiced segments
+    from every job go to one shared process pool for recognition, so decoding
+    and file I/O of some videos overlap with transcription of others. The
+    thread then writes the captions.
+
+    Progress is recorded per job in <state_dir>/media-jobs.json and per
+    segment in <state_dir>/transcripts/, so a rerun skips finished jobs,
+    writes captions straight from completed transcripts and only
+    re-transcribes the segments that are missing.
+    """
+
+    def __init__(self,
+                 state_dir: str = '.a11y-cache',
+                 backend: str = 'google',
+                 workers: Optional[int] = None,
+                 io_workers: Optional[int] = None,
+                 force: bool = False):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown recognizer backend: {backend}")
+        self.state_dir = Path(state_dir)
+        self.backend = backend
+        self.workers = workers or os.cpu_count() or 1
+        self.io_workers = io_workers or min(4, self.workers)
+        self.force = force
+        self.state = JobState(str(self.state_dir / 'media-jobs.json'))
+
+    def transcript_path(self, job: MediaJob) -> str:
+        return str(self.state_dir / 'transcripts' / f"{job.job_id}.json")
+
+    def run(self, jobs: List[MediaJob]) -> Dict:
+        results = []
+        if jobs:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool, \
+                    ThreadPoolExecutor(max_workers=self.io_workers) as threads:
+                futures = {threads.submit(self._run_job, job, pool): job for job in jobs}
+                for future in as_completed(futures):
+                    job = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logging.error(f"Captioning {job.source} failed: {e}")
+                        self.state.update(job.job_id, error=str(e))
+                        result = {'source': job.source, 'status': 'failed', 'error': str(e)}
+                    results.append(result)
+
+        order = {job.source: i for i, job in enumerate(jobs)}
+        results.sort(key=lambda r: order[r['source']])
+        summary = {status: sum(1 for r in results if r['status'] == status)
+                   for status in ('captioned', 'skipped', 'incomplete', 'failed')}
+        return {'jobs': results, 'summary': dict(summary, total=len(results))}
+
+    def _run_job(self, job: MediaJob, pool: ProcessPoolExecutor) -> Dict:
+        job_id = job.job_id
+        # Checked before anything reads the source, so up-to-date jobs cost two stats
+        if not self.force and job.is_up_to_date():
+            self.state.update(job_id, source=job.source, output=job.output, stage='done', error=None)
+            return {'source': job.source, 'status': 'skipped', 'output': job.output}
+
+        # A changed source (size or mtime) invalidates every stage recorded
+        # for it; hashing whole videos on every run would cost a full read
+        identity = file_identity(job.source)
+        record = self.state.get(job_id)
+        if record.get('identity') != identity or self.force:
+            record = {'stage': 'pending'}
+        self.state.update(job_id, source=job.source, output=job.output, identity=identity, stage=record['stage'])
+
+        segments = None
+        if record['stage'] in ('transcribed', 'done'):
+            segments = _load_transcript(self.transcript_path(job))
+        if segments is None:
+            self.state.update(job_id, stage='transcribing')
+            result = transcribe_stream(job.source, self.backend, job.language, self.workers,
+                                       self.transcript_path(job), pool=pool)
+            if not result['complete']:
+                self.state.update(job_id, error=f"{len(result['errors'])} segment(s) failed")
+                return {'source': job.source, 'status': 'incomplete', 'errors': result['errors']}
+            segments = result['segments']
+            self.state.update(job_id, stage='transcribed')
+
+        cues = segments_to_cues(segments)
+        write_captions(cues, job.output, job.format_type)
+        self.state.update(job_id, stage='done', cues=len(cues), error=None)
+        logging.info(f"Caption file created: {job.output} ({len(cues)} cues)")
+        return {'source': job.source, 'status': 'captioned', 'output': job.output, 'cues': len(cues)}
+
+def main():
+    """Caption every video in a directory or manifest"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate captions for a batch of videos")
+    parser.add_argument("target", help="Directory of media files or manifest (.json or one path per line)")
+    parser.add_argument("--output-dir", help="Write captions under this directory instead of next to the sources")
+    parser.add_argument("--format", default="vtt", choices=CAPTION_FORMATS, help="Caption format (default: vtt)")
+    parser.add_argument("--language", default="en-US", help="Recognition language (default: en-US)")
+    parser.add_argument("--backend", default="google", choices=sorted(BACKENDS), help="Recognizer backend")
+    parser.add_argument("--workers", type=int, help="Transcription processes (default: CPU count)")
+    parser.add_argument("--io-workers", type=int, help="Videos decoded concurrently (default: up to 4)")
+    parser.add_argument("--state-dir", default=".a11y-cache", help="Directory for resumable job state")
+    parser.add_argument("--force", action="store_true", help="Redo jobs whose captions are up to date")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    jobs = discover_jobs(args.target, args.output_dir, args.format, args.language)
+    runner = MediaJobRunner(args.state_dir, args.backend, args.workers, args.io_workers, args.force)
+    report = runner.run(jobs)
+
+    for result in report['jobs']:
+        print(f"{result['status']:>10}  {result['source']}")
+    summary = report['summary']
+    print(f"\n{summary['captioned']} captioned, {summary['skipped']} skipped, "
+          f"{summary['incomplete']} incomplete, {summary['failed']} failed")
+    raise SystemExit(1 if summary['failed'] or summary['incomplete'] else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+# Precomputed Tailwind utility-class color index for contrast analysis
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from color_contrast import ColorContrastAnalyzer, RGBA, _parse_style_declarations
+
+# Utility prefix -> the color slot it sets
+COLOR_UTILITIES = {'text': 'color', 'bg': 'background'}
+
+# Tailwind v3 default palette for the families used across src/
+DEFAULT_PALETTE = {
+    'slate': ['#f8fafc', '#f1f5f9', '#e2e8f0', '#cbd5e1', '#94a3b8', '#64748b',
+              '#475569', '#334155', '#1e293b', '#0f172a', '#020617'],
+    'gray': ['#f9fafb', '#f3f4f6', '#e5e7eb', '#d1d5db', '#9ca3af', '#6b7280',
+             '#4b5563', '#374151', '#1f2937', '#111827', '#030712'],
+    'red': ['#fef2f2', '#fee2e2', '#fecaca', '#fca5a5', '#f87171', '#ef4444',
+            '#dc2626', '#b91c1c', '#991b1b', '#7f1d1d', '#450a0a'],
+    'orange': ['#fff7ed', '#ffedd5', '#fed7aa', '#fdba74', '#fb923c', '#f97316',
+               '#ea580c', '#c2410c', '#9a3412', '#7c2d12', '#431407'],
+    'yellow': ['#fefce8', '#fef9c3', '#fef08a', '#fde047', '#facc15', '#eab308',
+               '#ca8a04', '#a16207', '#854d0e', '#713f12', '#422006'],
+    'green': ['#f0fdf4', '#dcfce7', '#bbf7d0', '#86efac', '#4ade80', '#22c55e',
+              '#16a34a', '#15803d', '#166534', '#14532d', '#052e16'],
+    'blue': ['#eff6ff', '#dbeafe', '#bfdbfe', '#93c5fd', '#60a5fa', '#3b82f6',
+             '#2563eb', '#1d4ed8', '#1e40af', '#1e3a8a', '#172554'],
+    'purple': ['#faf5ff', '#f3e8ff', '#e9d5ff', '#d8b4fe', '#c084fc', '#a855f7',
+               '#9333ea', '#7e22ce', '#6b21a8', '#581c87', '#3b0764'],
+}
+PALETTE_SHADES = ['50', '100', '200', '300', '400', '500', '600', '700', '800', '900', '950']
+BASE_COLORS = {'white': '#ffffff', 'black': '#000000', 'transparent': 'transparent'}
+
+_CSS_COMMENT = re.compile(r'/\*.*?\*/', re.S)
+_CSS_BLOCK = re.compile(r'([^{}]+)\{([^{}]*)\}')
+_CSS_VARIABLE = re.compile(r'(--[\w-]+)\s*:\s*([^;]+)')
+_VAR_REFERENCE = re.compile(r'var\(\s*(--[\w-]+)\s*(?:,\s*([^)]*))?\)')
+_APPLY = re.compile(r'@apply\s+([^;]+);')
+_CONFIG_ENTRY = re.compile(r'(?:"([\w-]+)"|\'([\w-]+)\'|([\w-]+))\s*:\s*(?:"([^"]*)"|\'([^\']*)\'|(\{))')
+_THEME_SELECTOR = re.compile(r'^\.([\w-]+)$')
+_DARK_VARIANT = re.compile(r'^\.dark\s+\.(dark\\:[\w\\/.\[\]-]+)$|^\.(dark\\:[\w\\/.\[\]-]+):is\(\.dark \*\)$')
+
+def _unescape_selector(selector: str) -> str:
+    return re.sub(r'\\(.)', r'\1', selector)
+
+def _substitute_vars(value: str, variables: Dict[str, str], local: Optional[Dict[str, str]] = None) -> str:
+    """Expand var() references, innermost first"""
+    for _ in range(8):
+        def replace(match):
+            name, fallback = match.group(1), match.group(2)
+            if local and name in local:
+                return local[name]
+            return variables.get(name, fallback if fallback is not None else '1')
+        expanded = _VAR_REFERENCE.sub(replace, value)
+        if expanded == value:
+            break
+        value = expanded
+    return value
+
+def _modifier_alpha(modifier: str) -> Optional[float]:
+    """Opacity modifier ('80', '[0.35]', '[35%]') -> alpha multiplier"""
+    if modifier.startswith('[') and modifier.endswith(']'):
+        modifier = modifier[1:-1]
+        if modifier.endswith('%'):
+            modifier = str(float(modifier[:-1]))
+        else:
+            try:
+                return float(modifier)
+            except ValueError:
+                return None
+    try:
+        return float(modifier) / 100.0
+    except ValueError:
+        return None
+
+class TailwindColorIndex:
+    """
+    Map utility class names to concrete colors, per theme.
+
+    The index is built once (from compiled CSS, or from tailwind.config.ts
+    plus the CSS variable definitions) and then resolves an element's class
+    list with one dictionary lookup per class - no selector matching.
+    Opacity modifiers (bg-background/80) and dark: variants are supported;
+    other variants (hover:, focus:, sm:, ...) describe non-resting states and
+    are ignored.
+    """
+
+    def __init__(self):
+        # theme -> class name -> (slot, RGBA)
+        self.themes: Dict[str, Dict[str, Tuple[str, RGBA]]] = {'default': {}}
+        # theme -> tag name -> {slot: RGBA} for element rules such as body
+        self.element_defaults: Dict[str, Dict[str, Dict[str, RGBA]]] = {'default': {}}
+
+    # -- construction ----------------------------------------------------
+
+    @staticmethod
+    def _collect_variables(css: str) -> Dict[str, Dict[str, str]]:
+        """Variable blocks keyed by theme: ':root' -> default, '.dark' -> dark, ..."""
+        blocks: Dict[str, Dict[str, str]] = {'default': {}}
+        for selector, body in _CSS_BLOCK.findall(css):
+            selector = selector.strip().split('\n')[-1].strip()
+            if selector in (':root', 'html'):
+                theme = 'default'
+            else:
+                # Theme blocks (.dark, .light, ...) only define custom properties
+                match = _THEME_SELECTOR.match(selector)
+                declarations = _parse_style_declarations(body)
+                if not match or not declarations or not all(k.startswith('--') for k in declarations):
+                    continue
+                theme = match.group(1)
+            blocks.setdefault(theme, {}).update(
+                (name, value.strip()) for name, value in _CSS_VARIABLE.findall(body)
+            )
+        return blocks
+
+    def _theme_variables(self, blocks: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, str]]:
+        base = blocks.get('default', {})
+        themes = {'default': dict(base)}
+        for theme, overrides in blocks.items():
+            if theme != 'default':
+                themes[theme] = {**base, **overrides}
+        return themes
+
+    def _add(self, theme: str, class_name: str, slot: str, value: str) -> None:
+        rgba = ColorContrastAnalyzer.parse_color(value)
+        if rgba is not None:
+            self.themes.setdefault(theme, {})[class_name] = (slot, rgba)
+
+    def _add_element_default(self, theme: str, tag: str, slot: str, value: str) -> None:
+        rgba = ColorContrastAnalyzer.parse_color(value)
+        if rgba is not None:
+            self.element_defaults.setdefault(theme, {}).setdefault(tag, {})[slot] = rgba
+
+    @classmethod
+    def from_compiled_css(cls, css: str) -> 'TailwindColorIndex':
+        """Build the index from Tailwind's compiled output (dist/assets/*.css)"""
+        index = cls()
+        css = _CSS_COMMENT.sub('', css)
+        themes = index._theme_variables(cls._collect_variables(css))
+        rules = _CSS_BLOCK.findall(css)
+
+        for theme, variables in themes.items():
+            for selectors, body in rules:
+                declarations = _parse_style_declarations(body)
+                local = {k: v for k, v in declarations.items() if k.startswith('--')}
+
+                for selector in selectors.split(','):
+                    selector = selector.strip()
+                    class_name = None
+
+                    dark = _DARK_VARIANT.match(selector)
+                    if dark:
+                        if theme != 'dark':
+                            continue
+                        class_name = _unescape_selector(dark.group(1) or dark.group(2))
+                    elif re.match(r'^\.[\w\\/.\[\]#%()-]+$', selector) and not selector.startswith('.dark\\:'):
+                        class_name = _unescape_selector(selector[1:])
+                    elif selector in ('body', 'html'):
+                        for prop, slot in (('color', 'color'), ('background-color', 'background')):
+                            if prop in declarations:
+                                index._add_element_default(theme, selector, slot,
+                                                           _substitute_vars(declarations[prop], variables, local))
+                        continue
+                    else:
+                        continue
+
+                    for prop, slot in (('color', 'color'), ('background-color', 'background')):
+                        if prop in declarations:
+                            index._add(theme, class_name, slot,
+                                       _substitute_vars(declarations[prop], variables, local))
+        return index
+
+    @staticmethod
+    def _parse_config_colors(config_source: str) -> Dict[str, str]:
+        """Flatten theme.extend.colors from tailwind.config.ts into name -> value"""
+        start = config_source.find('colors:')
+        if start < 0:
+            return {}
+        start = config_source.index('{', start)
+
+        colors: Dict[str, str] = {}
+        path: List[str] = []
+        pending_key: Optional[str] = None
+        depth = 0
+        position = start
+
+        while position < len(config_source):
+            char = config_source[position]
+            if char == '{':
+                depth += 1
+                if pending_key is not None:
+                    path.append(pending_key)
+                    pending_key = None
+                position += 1
+                continue
+            if char == '}':
+                depth -= 1
+                if depth == 0:
+                    break
+                if path:
+                    path.pop()
+                position += 1
+                continue
+            if config_source.startswith('//', position):
+                position = config_source.find('\n', position)
+                if position < 0:
+                    break
+                continue
+
+            match = _CONFIG_ENTRY.match(config_source, position)
+            if match:
+                key = match.group(1) or match.group(2) or match.group(3)
+                value = match.group(4) if match.group(4) is not None else match.group(5)
+                if match.group(6):
+                    pending_key = key
+                    position = match.end() - 1
+                    continue
+                name = '-'.join(path + ([] if key == 'DEFAULT' else [key]))
+                colors[name] = value
+                position = match.end()
+                continue
+            position += 1
+
+        return colors
+
+    @classmethod
+    def from_sources(cls, config_source: str, css_source: str) -> 'TailwindColorIndex':
+        """Build the index from tailwind.config.ts and the CSS variable definitions"""
+        index = cls()
+        css_source = _CSS_COMMENT.sub('', css_source)
+        themes = index._theme_variables(cls._collect_variables(css_source))
+
+        colors = dict(BASE_COLORS)
+        for family, shades in DEFAULT_PALETTE.items():
+            colors.update((f"{family}-{shade}", value) for shade, value in zip(PALETTE_SHADES, shades))
+        colors.update(cls._parse_config_colors(config_source))
+
+        # Element rules such as `body { @apply bg-background text-foreground; }`
+        applied: Dict[str, List[str]] = {}
+        for selector, body in _CSS_BLOCK.findall(css_source):
+            selector = selector.strip().split('\n')[-1].strip()
+            if selector in ('body', 'html'):
+                for match in _APPLY.finditer(body):
+                    applied.setdefault(selector, []).extend(match.group(1).split())
+
+        for theme, variables in themes.items():
+            for name, value in colors.items():
+                resolved = _substitute_vars(value, variables)
+                for prefix, slot in COLOR_UTILITIES.items():
+                    index._add(theme, f"{prefix}-{name}", slot, resolved)
+
+            for tag, classes in applied.items():
+                for slot, rgba in index._lookup(theme, classes).items():
+                    index.element_defaults.setdefault(theme, {}).setdefault(tag, {})[slot] = rgba
+
+        return index
+
+    @classmethod
+    def from_project(cls, base_dir: str = ".") -> Optional['TailwindColorIndex']:
+        """
+        Build the index for a project: prefer compiled CSS in dist/assets,
+        fall back to tailwind.config.ts + src/index.css.
+        """
+        base = Path(base_dir)
+        compiled = sorted((base / "dist" / "assets").glob("*.css")) if (base / "dist" / "assets").exists() else []
+        if compiled:
+            css = "\n".join(p.read_text(encoding='utf-8', errors='replace') for p in compiled)
+            return cls.from_compiled_css(css)
+
+        config_path = base / "tailwind.config.ts"
+        css_path = base / "src" / "index.css"
+        if config_path.exists() and css_path.exists():
+            return cls.from_sources(config_path.read_text(encoding='utf-8'),
+                                    css_path.read_text(encoding='utf-8'))
+        return None
+
+    # -- resolution ------------------------------------------------------
+
+    def _lookup_class(self, table: Dict[str, Tuple[str, RGBA]], class_name: str) -> Optional[Tuple[str, RGBA]]:
+        entry = table.get(class_name)
+        if entry is not None:
+            return entry
+
+        # Opacity modifier on a known color: bg-background/80
+        base, _, modifier = class_name.rpartition('/')
+        if base and modifier:
+            entry = table.get(base)
+            alpha = _modifier_alpha(modifier)
+            if entry is not None and alpha is not None:
+                slot, rgba = entry
+                return slot, (rgba[0], rgba[1], rgba[2], rgba[3] * alpha)
+
+        # Arbitrary values: bg-[#123456], text-[rgb(1,2,3)]
+        prefix, _, rest = (base or class_name).partition('-')
+        if prefix in COLOR_UTILITIES and rest.startswith('[') and rest.endswith(']'):
+            rgba = ColorContrastAnalyzer.parse_color(rest[1:-1].replace('_', ' '))
+            if rgba is not None:
+                alpha = _modifier_alpha(modifier) if base and modifier else 1.0
+                return COLOR_UTILITIES[prefix], (rgba[0], rgba[1], rgba[2], rgba[3] * (alpha or 1.0))
+        return None
+
+    def _lookup(self, theme: str, classes: Iterable[str]) -> Dict[str, RGBA]:
+        table = self.themes.get(theme) or self.themes['default']
+        resolved: Dict[str, RGBA] = {}
+        variant_resolved: Dict[str, RGBA] = {}
+
+        for class_name in classes:
+            if ':' in class_name:
+                variant, _, utility = class_name.rpartition(':')
+                if variant != 'dark' or theme != 'dark':
+                    continue
+                entry = table.get(class_name) or self._lookup_class(table, utility)
+                if entry is not None:
+                    variant_resolved[entry[0]] = entry[1]
+                continue
+
+            entry = self._lookup_class(table, class_name)
+            if entry is not None:
+                resolved[entry[0]] = entry[1]
+
+        # dark: variants win over the base utilities
+        resolved.update(variant_resolved)
+        return resolved
+
+    def has_theme(self, theme: str) -> bool:
+        """True when the stylesheets define colors for the theme (e.g. 'dark')"""
+        return bool(self.themes.get(theme))
+
+    def resolve(self, classes: Iterable[str], theme: str = 'default') -> Tuple[Optional[RGBA], Optional[RGBA]]:
+        """Resolve a class list to (foreground, background) RGBA colors"""
+        resolved = self._lookup(theme, classes)
+        return resolved.get('color'), resolved.get('background')
+
+    def style_resolver(self, theme: str = 'default'):
+        """
+        Build a style_resolver for color_contrast.resolve_element_colors.
+        Inline style declarations take precedence over utility classes.
+        """
+        from color_contrast import inline_style_colors
+        defaults = self.element_defaults.get(theme) or self.element_defaults.get('default', {})
+
+        def to_css(rgba: Optional[RGBA]) -> Optional[str]:
+            if rgba is None:
+                return None
+            return f"rgba({rgba[0]:.2f}, {rgba[1]:.2f}, {rgba[2]:.2f}, {rgba[3]:.4f})"
+
+        def resolver(element) -> Tuple[Optional[str], Optional[str]]:
+            inline_fg, inline_bg = inline_style_colors(element)
+            classes = element.get('class') or []
+            fg, bg = self.resolve(classes, theme) if classes else (None, None)
+
+            element_default = defaults.get(element.name)
+            if element_default:
+                fg = fg or element_default.get('color')
+                bg = bg or element_default.get('background')
+
+            return inline_fg or to_css(fg), inline_bg or to_css(bg)
+
+        return resolver
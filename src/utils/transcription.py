@@ -0,0 +1,450 @@
+# Chunked, parallel and resumable speech transcription producing timed captions
+import json
+import logging
+import os
+import wave
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from asset_cache import file_digest, file_identity, write_json_atomic
+from captions import Cue, split_cue, write_captions
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+# Silence detection and segment bounds (seconds)
+WINDOW_SECONDS = 0.02
+MIN_SILENCE_SECONDS = 0.3
+MIN_SEGMENT_SECONDS = 2.0
+MAX_SEGMENT_SECONDS = 30.0
+# Energy threshold: a multiple of the quiet-window level, never below this floor (full scale = 1.0)
+SILENCE_FLOOR = 0.005
+SILENCE_FACTOR = 2.0
+
+class RecognizerBackend(ABC):
+    """Speech-to-text for one segment of 16-bit mono PCM"""
+
+    name = 'base'
+
+    @abstractmethod
+    def transcribe(self, pcm: bytes, sample_rate: int, language: str) -> str:
+        """Text spoken in the segment, or '' when nothing intelligible is heard"""
+
+class GoogleBackend(RecognizerBackend):
+    """Google Web Speech API through speech_recognition (needs network access)"""
+
+    name = 'google'
+
+    def transcribe(self, pcm: bytes, sample_rate: int, language: str) -> str:
+        import speech_recognition as sr
+
+        audio = sr.AudioData(pcm, sample_rate, 2)
+        try:
+            return sr.Recognizer().recognize_google(audio, language=language, show_all=False)
+        except sr.UnknownValueError:
+            return ''  # No intelligible speech in this segment
+
+class OfflineStubBackend(RecognizerBackend):
+    """Deterministic offline backend for tests: describes the segment instead of recognizing it"""
+
+    name = 'stub'
+
+    def transcribe(self, pcm: bytes, sample_rate: int, language: str) -> str:
+        return f"[speech {len(pcm) / 2 / sample_rate:.1f}s]"
+
+BACKENDS: Dict[str, type] = {backend.name: backend for backend in (GoogleBackend, OfflineStubBackend)}
+
+def register_backend(backend: type) -> None:
+    """Make a RecognizerBackend subclass available by its name (must be importable by workers)"""
+    BACKENDS[backend.name] = backend
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("Chunked transcription requires numpy (pip install numpy)")
+
+def _to_mono_int16(frames: bytes, sample_width: int, channels: int) -> "np.ndarray":
+    """Decode PCM frames of any common width to mono 16-bit samples"""
+    if sample_width == 1:
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.int16) - 128) << 8
+    elif sample_width == 2:
+        samples = np.frombuffer(frames, dtype='<i2')
+    elif sample_width == 4:
+        samples = (np.frombuffer(frames, dtype='<i4') >> 16).astype(np.int16)
+    else:
+        raise ValueError(f"Unsupported sample width: {sample_width} bytes")
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    return samples
+
+def _window_rms(samples: "np.ndarray", window: int) -> Tuple["np.ndarray", "np.ndarray"]:
+    """RMS (0..1) of each complete window, plus the leftover samples"""
+    usable = len(samples) - len(samples) % window
+    blocks = samples[:usable].astype(np.float32).reshape(-1, window) / 32768.0
+    return np.sqrt((blocks ** 2).mean(axis=1)), samples[usable:]
+
+def window_energies(audio_path: str, window_seconds: float = WINDOW_SECONDS,
+                    block_seconds: float = 10.0) -> "np.ndarray":
+    """
+    RMS energy (0..1) of consecutive fixed-size windows, reading the WAV file
+    in bounded blocks so memory does not grow with the recording length.
+    """
+    _require_numpy()
+    with wave.open(audio_path, 'rb') as wav:
+        rate, width, channels = wav.getframerate(), wav.getsampwidth(), wav.getnchannels()
+        window = max(int(rate * window_seconds), 1)
+        block_frames = window * max(int(block_seconds / window_seconds), 1)
+
+        energies = []
+        carry = np.zeros(0, dtype=np.int16)
+        while True:
+            frames = wav.readframes(block_frames)
+            if not frames:
+                break
+            block, carry = _window_rms(np.concatenate([carry, _to_mono_int16(frames, width, channels)]), window)
+            energies.append(block)
+
+    return np.concatenate(energies) if energies else np.zeros(0, dtype=np.float32)
+
+def stream_energies(chunks: Iterable[bytes], sample_rate: int,
+                    window_seconds: float = WINDOW_SECONDS) -> "np.ndarray":
+    """RMS energy (0..1) of consecutive windows of a mono 16-bit PCM stream such as audio_stream.stream_pcm"""
+    _require_numpy()
+    window = max(int(sample_rate * window_seconds), 1)
+    energies = []
+    carry = np.zeros(0, dtype=np.int16)
+    for chunk in chunks:
+        block, carry = _window_rms(np.concatenate([carry, np.frombuffer(chunk, dtype='<i2')]), window)
+        energies.append(block)
+    return np.concatenate(energies) if energies else np.zeros(0, dtype=np.float32)
+
+class SilenceSegmenter:
+    """
+    Incremental cut-point detection over a stream of window energies.
+
+    Segments are between min_segment and max_segment long and preferably cut
+    in the middle of silent runs; with no usable pause the cut goes to the
+    quietest window. The silence threshold is either fixed or derived from a
+    rolling history of recent windows, so a stream can be segmented without
+    seeing it whole. State is bounded by max_segment.
+    """
+
+    def __init__(self, window_seconds: float = WINDOW_SECONDS,
+                 min_silence: float = MIN_SILENCE_SECONDS,
+                 min_segment: float = MIN_SEGMENT_SECONDS,
+                 max_segment: float = MAX_SEGMENT_SECONDS,
+                 threshold: Optional[float] = None,
+                 history_seconds: float = 30.0):
+        self.window_seconds = window_seconds
+        self.threshold = threshold
+        self.min_silence_windows = max(int(min_silence / window_seconds), 1)
+        self.min_windows = int(min_segment / window_seconds)
+        self.max_windows = max(int(max_segment / window_seconds), self.min_windows + 1)
+        self._history = deque(maxlen=max(int(history_seconds / window_seconds), 1))
+        self._start = 0  # window index of the open segment
+        self._energies: List[float] = []  # energies since _start
+        self._voiced: List[bool] = []
+        self._silence_start: Optional[int] = None
+
+    @staticmethod
+    def threshold_for(energies) -> float:
+        return max(float(np.percentile(energies, 10)) * SILENCE_FACTOR, SILENCE_FLOOR)
+
+    def _emit(self, cut: int) -> Dict:
+        length = cut - self._start
+        voiced = np.flatnonzero(self._voiced[:length])
+        start, window = self._start, self.window_seconds
+        segment = {
+            'start': round(start * window, 3),
+            'end': round(cut * window, 3),
+            'speech_start': round(float(start + voiced[0]) * window, 3) if len(voiced) else None,
+            'speech_end': round(float(start + voiced[-1] + 1) * window, 3) if len(voiced) else None,
+        }
+        self._energies = self._energies[length:]
+        self._voiced = self._voiced[length:]
+        self._start = cut
+        return segment
+
+    def feed(self, energies: "np.ndarray") -> List[Dict]:
+        """Consume window energies; return the segments completed by them"""
+        if len(energies) == 0:
+            return []
+        threshold = self.threshold
+        if threshold is None:
+            self._history.extend(float(e) for e in energies)
+            threshold = self.threshold_for(np.fromiter(self._history, dtype=np.float32))
+
+        completed = []
+        position = self._start + len(self._energies)
+        for offset, energy in enumerate(energies):
+            i = position + offset
+            is_voiced = bool(energy >= threshold)
+            self._energies.append(float(energy))
+            self._voiced.append(is_voiced)
+
+            if not is_voiced:
+                if self._silence_start is None:
+                    self._silence_start = i
+            else:
+                if self._silence_start is not None and i - self._silence_start >= self.min_silence_windows:
+                    cut = (self._silence_start + i) // 2
+                    if cut - self._start >= self.min_windows:
+                        completed.append(self._emit(cut))
+                self._silence_start = None
+
+            if i - self._start >= self.max_windows:
+                # No usable pause: cut at the quietest window of the allowed range
+                lo = self.min_windows
+                quietest = lo + int(np.argmin(self._energies[lo:i - self._start + 1]))
+                completed.append(self._emit(self._start + quietest))
+        return completed
+
+    def finish(self) -> List[Dict]:
+        """Close the last segment"""
+        if not self._energies:
+            return []
+        return [self._emit(self._start + len(self._energies))]
+
+def split_at_silence(energies: "np.ndarray",
+                     window_seconds: float = WINDOW_SECONDS,
+                     min_silence: float = MIN_SILENCE_SECONDS,
+                     min_segment: float = MIN_SEGMENT_SECONDS,
+                     max_segment: float = MAX_SEGMENT_SECONDS) -> List[Dict]:
+    """
+    Cut a whole recording into segments (see SilenceSegmenter), with the
+    threshold taken from the full recording. Segments are returned with their
+    speech extent; fully silent segments have speech_start None so they are
+    not sent to the recognizer.
+    """
+    if len(energies) == 0:
+        return []
+
+    segmenter = SilenceSegmenter(window_seconds, min_silence, min_segment, max_segment,
+                                 threshold=SilenceSegmenter.threshold_for(energies))
+    segments = segmenter.feed(energies) + segmenter.finish()
+    for index, segment in enumerate(segments):
+        segment['index'] = index
+    return segments
+
+def stream_segments(chunks: Iterable[bytes], sample_rate: int,
+                    window_seconds: float = WINDOW_SECONDS,
+                    max_segment: float = MAX_SEGMENT_SECONDS) -> Iterator[Dict]:
+    """
+    Segment a stream of mono 16-bit PCM chunks (e.g. audio_stream.stream_pcm)
+    as it arrives. Each yielded segment carries its own 'pcm'; only the open
+    segment is buffered, so memory is bounded by max_segment.
+    """
+    _require_numpy()
+    window = max(int(sample_rate * window_seconds), 1)
+    segmenter = SilenceSegmenter(window_seconds, max_segment=max_segment)
+    buffer = bytearray()  # PCM from the start of the open segment
+    buffer_start = 0  # window index at buffer[0]
+    carry = np.zeros(0, dtype=np.int16)
+    index = 0
+
+    def take(segment: Dict) -> Dict:
+        nonlocal buffer, buffer_start, index
+        end_window = int(round(segment['end'] / window_seconds))
+        size = (end_window - buffer_start) * window * 2
+        segment.update(index=index, pcm=bytes(buffer[:size]))
+        del buffer[:size]
+        buffer_start = end_window
+        index += 1
+        return segment
+
+    for chunk in chunks:
+        samples = np.concatenate([carry, np.frombuffer(chunk, dtype='<i2')])
+        energies, carry = _window_rms(samples, window)
+        buffer.extend(samples[:len(samples) - len(carry)].astype('<i2').tobytes())
+        for segment in segmenter.feed(energies):
+            yield take(segment)
+
+    if len(carry):
+        buffer.extend(carry.astype('<i2').tobytes())
+    for segment in segmenter.finish():
+        segment = take(segment)
+        segment['pcm'] += bytes(buffer)  # trailing partial window
+        yield segment
+
+def read_segment_pcm(audio_path: str, start: float, end: float) -> Tuple[bytes, int]:
+    """Mono 16-bit PCM for a time range of a WAV file, and its sample rate"""
+    _require_numpy()
+    with wave.open(audio_path, 'rb') as wav:
+        rate = wav.getframerate()
+        first = min(int(start * rate), wav.getnframes())
+        wav.setpos(first)
+        frames = wav.readframes(max(int(end * rate) - first, 0))
+        samples = _to_mono_int16(frames, wav.getsampwidth(), wav.getnchannels())
+    return samples.astype('<i2').tobytes(), rate
+
+def _transcribe_segment(audio_path: str, start: float, end: float, backend_name: str, language: str) -> str:
+    """Worker entry point: runs in a pool process"""
+    pcm, rate = read_segment_pcm(audio_path, start, end)
+    return BACKENDS[backend_name]().transcribe(pcm, rate, language).strip()
+
+def _transcribe_pcm(pcm: bytes, sample_rate: int, backend_name: str, language: str) -> str:
+    """Worker entry point for streamed segments, which arrive with their PCM"""
+    return BACKENDS[backend_name]().transcribe(pcm, sample_rate, language).strip()
+
+class TranscriptionState:
+    """
+    Per-segment results persisted next to the audio, so an interrupted or
+    partially failed run only re-transcribes the missing segments.
+    """
+
+    def __init__(self, state_path: str, key: Dict):
+        self.state_path = state_path
+        self.key = key
+        self.segments: List[Dict] = []
+        self.texts: Dict[str, str] = {}
+        if os.path.exists(state_path):
+            try:
+                with open(state_path, 'r', encoding='utf-8') as f:
+                    stored = json.load(f)
+                if stored.get('key') == key:
+                    self.segments = stored.get('segments', [])
+                    self.texts = stored.get('texts', {})
+            except (OSError, ValueError):
+                pass
+
+    def save(self) -> None:
+        write_json_atomic(self.state_path, {'key': self.key, 'segments': self.segments, 'texts': self.texts})
+
+def transcribe_segments(audio_path: str,
+                        backend: str = 'google',
+                        language: str = 'en-US',
+                        workers: Optional[int] = None,
+                        state_path: Optional[str] = None,
+                        max_segment: float = MAX_SEGMENT_SECONDS) -> Dict:
+    """
+    Split a WAV file at silence and transcribe the segments concurrently.
+    Returns {'segments': [...with 'text'], 'complete': bool, 'errors': {...}}.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown recognizer backend: {backend}")
+
+    state_path = state_path or f"{audio_path}.transcript.json"
+    key = {'audio': file_digest(audio_path), 'backend': backend, 'language': language, 'max_segment': max_segment}
+    state = TranscriptionState(state_path, key)
+
+    if not state.segments:
+        state.segments = split_at_silence(window_energies(audio_path), max_segment=max_segment)
+        state.save()
+
+    pending = [s for s in state.segments if s['speech_start'] is not None and str(s['index']) not in state.texts]
+    errors: Dict[int, str] = {}
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(_transcribe_segment, audio_path, s['start'], s['end'], backend, language): s
+                for s in pending
+            }
+            for future in as_completed(futures):
+                segment = futures[future]
+                try:
+                    state.texts[str(segment['index'])] = future.result()
+                    state.save()  # Resume point after every finished segment
+                except Exception as e:
+                    errors[segment['index']] = str(e)
+                    logging.error(f"Segment {segment['index']} ({segment['start']}s) failed: {e}")
+
+    segments = [dict(s, text=state.texts.get(str(s['index']), '')) for s in state.segments]
+    complete = all(s['speech_start'] is None or str(s['index']) in state.texts for s in state.segments)
+    return {'segments': segments, 'complete': complete, 'errors': errors}
+
+def transcribe_stream(media_path: str,
+                      backend: str = 'google',
+                      language: str = 'en-US',
+                      workers: Optional[int] = None,
+                      state_path: Optional[str] = None,
+                      max_segment: float = MAX_SEGMENT_SECONDS,
+                      sample_rate: int = 16000,
+                      pool: Optional[ProcessPoolExecutor] = None) -> Dict:
+    """
+    Transcribe a video or audio file without an intermediate WAV: PCM is
+    piped from ffmpeg, segmented as it arrives and each voiced segment is
+    submitted to the pool immediately. At most 2 x workers segments are in
+    flight, which bounds memory. Resumes from the per-segment state like
+    transcribe_segments. An existing pool can be shared between several
+    concurrent streams.
+    """
+    from audio_stream import stream_pcm
+
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown recognizer backend: {backend}")
+
+    state_path = state_path or f"{media_path}.transcript.json"
+    # Hour-long videos run to gigabytes: identify the source by size and
+    # mtime rather than hashing it before the first audio is streamed
+    key = {'media': file_identity(media_path), 'backend': backend, 'language': language,
+           'max_segment': max_segment, 'sample_rate': sample_rate, 'streamed': True}
+    state = TranscriptionState(state_path, key)
+    known = len(state.segments)
+    errors: Dict[int, str] = {}
+
+    def collect(done) -> None:
+        for future in done:
+            segment = in_flight.pop(future)
+            try:
+                state.texts[str(segment['index'])] = future.result()
+                state.save()  # Resume point after every finished segment
+            except Exception as e:
+                errors[segment['index']] = str(e)
+                logging.error(f"Segment {segment['index']} ({segment['start']}s) failed: {e}")
+
+    own_pool = pool is None
+    if own_pool:
+        pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        limit = 2 * (workers or os.cpu_count() or 1)
+        in_flight = {}
+        for segment in stream_segments(stream_pcm(media_path, sample_rate), sample_rate, max_segment=max_segment):
+            pcm = segment.pop('pcm')
+            if segment['index'] >= known:
+                state.segments.append(segment)
+            if segment['speech_start'] is None or str(segment['index']) in state.texts:
+                continue
+            in_flight[pool.submit(_transcribe_pcm, pcm, sample_rate, backend, language)] = segment
+            if len(in_flight) >= limit:
+                collect(wait(in_flight, return_when=FIRST_COMPLETED).done)
+        collect(list(as_completed(in_flight)))
+    finally:
+        if own_pool:
+            pool.shutdown()
+    state.save()
+
+    segments = [dict(s, text=state.texts.get(str(s['index']), '')) for s in state.segments]
+    complete = all(s['speech_start'] is None or str(s['index']) in state.texts for s in state.segments)
+    return {'segments': segments, 'complete': complete, 'errors': errors}
+
+def segments_to_cues(segments: List[Dict]) -> List[Cue]:
+    """Timed cues from transcribed segments, aligned to each segment's speech extent"""
+    cues = []
+    for segment in segments:
+        if segment.get('text'):
+            cues.extend(split_cue(segment['speech_start'], segment['speech_end'], segment['text']))
+    return cues
+
+def transcribe_to_captions(audio_path: str, output_path: str, format_type: str = 'srt',
+                           backend: str = 'google', language: str = 'en-US',
+                           workers: Optional[int] = None, state_path: Optional[str] = None,
+                           streaming: Optional[bool] = None) -> Dict:
+    """
+    Transcribe a media file and write timed SRT/VTT captions.
+    WAV files are read directly; anything else (or streaming=True) is
+    streamed through ffmpeg without a temporary audio file.
+    """
+    if streaming is None:
+        streaming = not audio_path.lower().endswith('.wav')
+    transcribe = transcribe_stream if streaming else transcribe_segments
+    result = transcribe(audio_path, backend, language, workers, state_path)
+    cues = segments_to_cues(result['segments'])
+    if result['complete']:
+        write_captions(cues, output_path, format_type)
+        logging.info(f"Caption file created: {output_path} ({len(cues)} cues)")
+    else:
+        logging.warning(f"{len(result['errors'])} segment(s) failed; rerun to resume. Captions not written.")
+    return dict(result, cues=len(cues), output=output_path if result['complete'] else None)
@@ -0,0 +1,92 @@
+# HTML members streamed out of tar, zip and WARC archives
+import gzip
+import io
+import sys
+import tarfile
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src' / 'utils'))
+
+from archive_sources import iter_archive, read_archives  # noqa: E402
+
+PAGE = '<html><body><h1>Olá</h1></body></html>'
+
+
+def _chunked(body: bytes, size: int = 7) -> bytes:
+    parts = [b'%x;ext=1\r\n%s\r\n' % (len(body[i:i + size]), body[i:i + size]) for i in range(0, len(body), size)]
+    return b''.join(parts) + b'0\r\n\r\n'
+
+
+def _record(record_type: str, uri: str, content_type: str, payload: bytes) -> bytes:
+    headers = (f'WARC/1.0\r\nWARC-Type: {record_type}\r\nWARC-Target-URI: <{uri}>\r\n'
+               f'Content-Type: {content_type}\r\nContent-Length: {len(payload)}\r\n\r\n')
+    return headers.encode('latin-1') + payload + b'\r\n\r\n'
+
+
+def _response(uri: str, status: str, headers: str, body: bytes) -> bytes:
+    http = f'HTTP/1.1 {status}\r\n{headers}\r\n'.encode('latin-1') + body
+    return _record('response', uri, 'application/http; msgtype=response', http)
+
+
+def _warc_records():
+    return [
+        _record('warcinfo', '', 'application/warc-fields', b'software: test\r\n'),
+        _response('http://a/plain', '200 OK', 'Content-Type: text/html; charset=iso-8859-1\r\n',
+                  PAGE.encode('latin-1')),
+        _response('http://a/chunked-gzip', '200 OK',
+                  'Content-Type: text/html\r\nTransfer-Encoding: chunked\r\nContent-Encoding: gzip\r\n',
+                  _chunked(gzip.compress(PAGE.encode('utf-8')))),
+        _response('http://a/missing', '404 Not Found', 'Content-Type: text/html\r\n', b'<p>gone</p>'),
+        _response('http://a/style.css', '200 OK', 'Content-Type: text/css\r\n', b'body{}' * 1000),
+        _record('resource', 'file:///offline.html', 'text/html; charset="utf-8"', PAGE.encode('utf-8')),
+    ]
+
+
+def _members(path):
+    return [(m.name, m.text()) for m in iter_archive(str(path))]
+
+
+def test_warc_decodes_chunked_gzip_and_charsets(tmp_path):
+    path = tmp_path / 'crawl.warc'
+    path.write_bytes(b''.join(_warc_records()))
+    assert _members(path) == [
+        ('http://a/plain', PAGE), ('http://a/chunked-gzip', PAGE), ('file:///offline.html', PAGE)
+    ]
+
+
+def test_per_record_gzip_warc(tmp_path):
+    path = tmp_path / 'crawl.warc.gz'
+    path.write_bytes(b''.join(gzip.compress(record) for record in _warc_records()))
+    assert [name for name, _ in _members(path)] == ['http://a/plain', 'http://a/chunked-gzip', 'file:///offline.html']
+
+
+def test_tar_and_zip_yield_only_html(tmp_path):
+    tar_path = tmp_path / 'site.tar.gz'
+    with tarfile.open(tar_path, 'w:gz') as tar:
+        for name, data in (('site/index.html', PAGE), ('site/app.js', 'x'), ('site/docs/a.HTM', PAGE)):
+            info = tarfile.TarInfo(name)
+            info.size = len(data.encode('utf-8'))
+            tar.addfile(info, io.BytesIO(data.encode('utf-8')))
+    zip_path = tmp_path / 'site.zip'
+    with zipfile.ZipFile(zip_path, 'w') as archive:
+        archive.writestr('index.xhtml', PAGE)
+        archive.writestr('img/logo.png', b'\x89PNG')
+
+    assert _members(tar_path) == [('site/index.html', PAGE), ('site/docs/a.HTM', PAGE)]
+    assert _members(zip_path) == [('index.xhtml', PAGE)]
+
+
+def test_read_archives_reports_unreadable_archives(tmp_path):
+    good = tmp_path / 'site.zip'
+    with zipfile.ZipFile(good, 'w') as archive:
+        for i in range(20):
+            archive.writestr(f'page-{i}.html', PAGE)
+    broken = tmp_path / 'broken.zip'
+    broken.write_bytes(b'not a zip')
+
+    members = list(read_archives([str(good), str(broken)], max_pending=2))
+    assert sorted(m.key for m in members if m.error is None) == sorted(
+        f'{good}!page-{i}.html' for i in range(20))
+    (failed,) = [m for m in members if m.error is not None]
+    assert failed.archive == str(broken) and failed.error.startswith('Could not read archive')
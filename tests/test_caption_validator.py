@@ -0,0 +1,120 @@
+# WebVTT / SRT parsing, readability checks, the cue time index and the report cache
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src' / 'utils'))
+
+import caption_validator  # noqa: E402
+from caption_validator import (  # noqa: E402
+    CaptionReportCache, CueIndex, check_video_captions, parse_caption_file
+)
+from captions import Cue  # noqa: E402
+
+VTT = '''WEBVTT
+
+intro
+00:00.000 --> 00:02.000
+Olá, bem-vindo.
+
+00:01.500 --> 00:01.800
+Rápido demais para ler com calma este texto
+
+00:05.000 --> 00:04.000
+Invertida
+'''
+
+
+def _write(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content, encoding='utf-8')
+    return str(path)
+
+
+def test_vtt_cues_and_findings(tmp_path):
+    parsed = parse_caption_file(_write(tmp_path, 'a.vtt', VTT))
+    assert parsed.format_type == 'vtt'
+    assert [(c.start, c.end, c.identifier, c.line) for c in parsed.cues] == [
+        (0.0, 2.0, 'intro', 4), (1.5, 1.8, None, 7), (5.0, 4.0, None, 10)
+    ]
+    messages = [(f['line'], f['severity'], f['message'].split(' (')[0]) for f in parsed.findings]
+    assert (7, 'warning', 'Cue is shown for only 0.30s') in messages
+    assert (7, 'warning', 'Cue at 1.500s overlaps a cue that ends at 2.000s') in messages
+    assert (10, 'error', 'Cue ends at or before it starts') in messages
+
+
+def test_srt_timing_errors(tmp_path):
+    srt = '1\n00:00:01,000 --> 00:00:03,000\nHello\n\n2\n00:00:04.000 --> 00:00:05,000\nBad\n'
+    parsed = parse_caption_file(_write(tmp_path, 'b.srt', srt))
+    assert parsed.format_type == 'srt'
+    assert len(parsed.cues) == 1
+    assert [f['line'] for f in parsed.findings if f['severity'] == 'error'] == [6]
+
+
+def test_cue_index_matches_a_linear_scan_with_a_long_cue():
+    rng = random.Random(7)
+    cues = [Cue(i * 2.0, i * 2.0 + rng.choice([0.0, 1.0, 1.9, 3.5]), str(i)) for i in range(500)]
+    cues.append(Cue(30.0, 630.0, 'music'))  # one 10-minute cue
+    index = CueIndex(cues)
+    ordered = sorted(cues, key=lambda cue: (cue.start, cue.end))
+
+    for _ in range(300):
+        moment = round(rng.uniform(-5, 1100), 1)
+        assert index.at(moment) == [c for c in ordered if c.start <= moment < c.end]
+        start = round(rng.uniform(-5, 1100), 1)
+        end = start + round(rng.uniform(0.1, 30), 1)
+        assert index.overlapping(start, end) == [c for c in ordered if c.start < end and c.end > start]
+
+
+def test_long_cue_does_not_unbalance_the_index():
+    cues = [Cue(i * 2.0, i * 2.0 + 1.5, str(i)) for i in range(4096)] + [Cue(1.0, 8000.0, 'credits')]
+    index = CueIndex(cues)
+
+    def walk(node, depth=1):
+        if node is None:
+            return 0, 0
+        stored, deepest = len(node[1]), depth
+        for child in node[3:]:
+            child_stored, child_depth = walk(child, depth + 1)
+            stored, deepest = stored + child_stored, max(deepest, child_depth)
+        return stored, deepest
+
+    stored, depth = walk(index._root)
+    # Every cue is stored once, and the long cue sits in one node near the root
+    assert stored == len(cues)
+    assert depth <= 14
+    assert [c.text for c in index.at(4000.2)] == ['credits', '2000']
+    assert [c.text for c in index.overlapping(8190.0, 8200.0)] == ['4095']
+
+
+def test_report_cache_is_keyed_on_the_limits(tmp_path, monkeypatch):
+    path = _write(tmp_path, 'c.vtt', 'WEBVTT\n\n00:00.000 --> 00:03.000\nUma legenda de tamanho médio aqui\n')
+    cache_path = str(tmp_path / 'captions.json')
+    cache = CaptionReportCache(cache_path)
+    assert cache.get(path)['summary']['warnings'] == 0
+    cache.save()
+
+    monkeypatch.setattr(caption_validator, 'MAX_LINE_CHARS', 20)
+    report = CaptionReportCache(cache_path).get(path)
+    assert report['summary']['warnings'] == 1
+
+    monkeypatch.setattr(caption_validator, 'VALIDATOR_VERSION', caption_validator.VALIDATOR_VERSION + 1)
+    cache = CaptionReportCache(cache_path)
+    cache.get(path)
+    assert len(cache.reports) == 2
+
+
+def test_track_problems_are_summarised_per_track(tmp_path):
+    path = _write(tmp_path, 'a.vtt', VTT)
+    html = ('<video src="v.mp4"><track kind="captions" src="a.vtt"></video>'
+            '<video src="w.mp4"><track kind="captions" src="missing.vtt"></video>'
+            '<video src="x.mp4" muted></video><video src="y.mp4"></video>')
+    report = check_video_captions(html, lambda src: path if src == 'a.vtt' else None)
+
+    assert [f['message'] for f in report['findings']] == [
+        'Caption track "missing.vtt" not found', '<video> has no captions or subtitles track'
+    ]
+    (track,) = report['track_findings']
+    assert track['severity'] == 'error' and track['file'] == path
+    assert report['summary']['track_errors'] == track['errors'] == 1
+    assert len(report['tracks'][0]['findings']) == track['errors'] + track['warnings']
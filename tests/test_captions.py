@@ -0,0 +1,43 @@
+# Cue splitting and SRT / WebVTT rendering of generated captions
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src' / 'utils'))
+
+from caption_validator import parse_caption_file  # noqa: E402
+from captions import MAX_CUE_CHARS, format_timestamp, split_cue, write_captions  # noqa: E402
+
+TEXT = ('Nesta aula vamos ver como leitores de tela anunciam imagens, cabeçalhos e links, '
+        'e por que o texto alternativo precisa descrever a função da imagem na página.')
+
+
+def test_timestamps():
+    assert format_timestamp(3725.5) == '01:02:05,500'
+    assert format_timestamp(59.9996, 'vtt') == '00:01:00.000'
+    assert format_timestamp(-1) == '00:00:00,000'
+
+
+def test_split_cue_keeps_the_span_and_word_boundaries():
+    cues = split_cue(10.0, 22.0, TEXT)
+    assert len(cues) == 2
+    assert all(len(cue.text) <= MAX_CUE_CHARS for cue in cues)
+    assert ' '.join(cue.text for cue in cues) == TEXT
+    assert cues[0].start == 10.0 and cues[-1].end == 22.0
+    assert cues[0].end == pytest.approx(cues[1].start)
+    assert split_cue(0.0, 1.0, '   ') == []
+
+
+@pytest.mark.parametrize('format_type', ['srt', 'vtt'])
+def test_written_captions_parse_back(tmp_path, format_type):
+    cues = split_cue(0.5, 12.5, TEXT) + split_cue(13.0, 15.0, 'Obrigado.')
+    path = tmp_path / f'aula.{format_type}'
+    write_captions(cues, str(path), format_type)
+
+    parsed = parse_caption_file(str(path))
+    assert parsed.format_type == format_type
+    assert [(c.start, c.end, c.text) for c in parsed.cues] == [
+        (round(c.start, 3), round(c.end, 3), c.text) for c in cues
+    ]
+    assert not [f for f in parsed.findings if f['severity'] == 'error']
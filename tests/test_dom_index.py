@@ -0,0 +1,71 @@
+# Shared DocumentIndex walk: visibility, subtree extents and the inline SVG path
+import sys
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src' / 'utils'))
+
+from dom_index import DocumentIndex  # noqa: E402
+from id_references import check_id_references  # noqa: E402
+from image_alt_checker import ImageAccessibilityAnalyzer  # noqa: E402
+from keyboard_navigation import KeyboardNavigationEnhancer  # noqa: E402
+
+INTERACTIVE_SVG = (
+    '<svg><a href="#missing"><path d="M0 0"/></a>'
+    '<g tabindex="0"><path d="M1 1"/></g>'
+    '<foreignObject><button>Play</button><img src="x.png"></foreignObject></svg>'
+    '<button>OK</button>'
+)
+
+
+def _index(html):
+    return DocumentIndex(BeautifulSoup(html, 'html.parser'))
+
+
+def test_inherited_visibility_and_subtree_extent():
+    index = _index('<div hidden><p id="a">x</p></div><section style="visibility:hidden">'
+                   '<span id="b">y</span><span id="c" style="visibility:visible">z</span></section>')
+    by_id = {el_id: elements[0] for el_id, elements in index.ids.items()}
+
+    assert index.is_hidden(by_id['a'])
+    assert index.is_hidden(by_id['b'])
+    assert not index.is_hidden(by_id['c'])
+    section = index.root.find('section')
+    assert index.descendants(section) == [by_id['b'], by_id['c']]
+
+
+def test_plain_svg_shapes_are_not_indexed():
+    paths = ''.join(f'<path id="p{i}" d="M0 0"/>' for i in range(50))
+    index = _index(f'<svg><title>Chart</title><g role="img"><desc>Bars</desc>{paths}</g></svg>')
+    svg = index.root.find('svg')
+
+    assert [el.name for el in index.elements] == ['svg', 'title', 'g', 'desc']
+    assert index.svg_size(svg) == 53
+    assert len(index.svg_groups(svg)) == 1
+    # Shape ids still resolve references
+    assert index.get_by_id('p49') is not None
+
+
+def test_interactive_svg_content_reaches_the_checks():
+    index = _index(INTERACTIVE_SVG)
+
+    focus = KeyboardNavigationEnhancer.analyze_focus_order(INTERACTIVE_SVG, index=index)
+    focusable = [el.name for el, _ in KeyboardNavigationEnhancer.classify_focusable(index)['tab_order']]
+    assert focus['total_focusable'] == 4
+    assert focusable == ['a', 'g', 'button', 'button']
+
+    images = ImageAccessibilityAnalyzer.analyze_images_in_html(INTERACTIVE_SVG, index=index)
+    assert images['total_images'] == 1
+    assert images['svg_count'] == 1
+
+    references = check_id_references(index=index)
+    assert [(r['tag'], r['id']) for r in references['unresolved']] == [('a', 'missing')]
+
+
+def test_foreign_object_subtree_extent_covers_its_html():
+    index = _index(INTERACTIVE_SVG)
+    foreign = index.root.find('foreignobject')
+
+    assert [el.name for el in index.descendants(foreign)] == ['button', 'img']
+    assert index.subtree_end(index.root.find('svg')) == index.position(index.root.find_all('button')[1])
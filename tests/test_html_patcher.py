@@ -0,0 +1,68 @@
+# Offset patches against the original HTML source
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src' / 'utils'))
+
+from html_patcher import HtmlPatcher, scan_tags  # noqa: E402
+from keyboard_navigation import KeyboardNavigationEnhancer  # noqa: E402
+
+
+def _tag(source, name):
+    return next(tag for tag in scan_tags(source) if tag.name == name)
+
+
+def test_scan_tags_locates_start_and_end_tags():
+    source = '<ul>\n  <li class="a">One<li>Two</ul><img src="x.png"/>'
+    tags = scan_tags(source)
+    assert [(t.name, source[t.start:t.start_end]) for t in tags] == [
+        ('ul', '<ul>'), ('li', '<li class="a">'), ('li', '<li>'), ('img', '<img src="x.png"/>')
+    ]
+    ul = tags[0]
+    assert source[ul.end_start:ul.end_end] == '</ul>'
+    assert tags[1].has_text and ul.has_text
+
+
+def test_set_attribute_appends_or_replaces_in_place():
+    source = '<main id="">\n<input type=text value="a &amp; b"><br/></main>'
+    patcher = HtmlPatcher(source)
+    patcher.set_attribute(_tag(source, 'main'), 'id', 'main-content')
+    patcher.set_attribute(_tag(source, 'input'), 'TYPE', 'search')
+    patcher.set_attribute(_tag(source, 'br'), 'data-note', 'say "hi"')
+    assert patcher.apply() == (
+        '<main id="main-content">\n<input TYPE="search" value="a &amp; b">'
+        '<br data-note="say &quot;hi&quot;"/></main>'
+    )
+
+
+def test_attributes_are_not_found_inside_other_values():
+    source = '<div title="set id here" data-x=\'type=1\' onclick="go()" class="c">x</div>'
+    patcher = HtmlPatcher(source)
+    div = _tag(source, 'div')
+    patcher.set_attribute(div, 'id', 'main')
+    patcher.set_attribute(div, 'type', 'button')
+    patcher.remove_attribute(div, 'onclick')
+    assert patcher.apply() == (
+        '<div title="set id here" data-x=\'type=1\' class="c" id="main" type="button">x</div>'
+    )
+
+
+def test_overlapping_patches_are_rejected():
+    patcher = HtmlPatcher('<p>text</p>')
+    patcher.replace(0, 5, '')
+    patcher.replace(3, 6, '')
+    with pytest.raises(ValueError):
+        patcher.apply()
+
+
+def test_keyboard_fixes_do_not_duplicate_empty_attributes():
+    source = ('<body><main id=""><div onclick="x()" type="">Go</div>'
+              '<span class="cursor-pointer"></span></main></body>')
+    fixed = KeyboardNavigationEnhancer.add_proper_keyboard_support(source)
+    assert fixed == (
+        '<body><a class="skip-link" href="#main-content">Skip to main content</a>'
+        '<main id="main-content"><button type="button">Go</button>'
+        '<button class="cursor-pointer" type="button" aria-label="Interactive element"></button></main></body>'
+    )
@@ -0,0 +1,41 @@
+# Duplicate ids and ID references that resolve to no element
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src' / 'utils'))
+
+from id_references import check_id_references  # noqa: E402
+
+
+def _unresolved(html):
+    return [(r['tag'], r['attribute'], r['id']) for r in check_id_references(html)['unresolved']]
+
+
+def test_missing_naming_reference_is_an_error():
+    report = check_id_references('<label for="email">E-mail</label><input id="mail">'
+                                 '<div aria-describedby="help hint"></div><p id="help"></p>')
+    assert [(f['severity'], f['message']) for f in report['findings']] == [
+        ('error', '<label for> references missing id "email"'),
+        ('error', '<div aria-describedby> references missing id "hint"'),
+    ]
+
+
+def test_referenced_duplicate_id_is_an_error():
+    report = check_id_references('<p id="a"></p><p id="a"></p><p id="b"></p><p id="b"></p>'
+                                 '<input aria-labelledby="a">')
+    assert [(d['id'], d['count']) for d in report['duplicates']] == [('a', 2), ('b', 2)]
+    assert [f['severity'] for f in report['findings']] == ['error', 'warning']
+
+
+def test_fragment_links_resolve_to_legacy_anchors_and_top():
+    html = ('<a href="#top">Topo</a><a href="#TOP">Topo</a><a href="#">Nada</a><a href="#/rota">SPA</a>'
+            '<a href="#capitulo-2">Capítulo 2</a><a name="capitulo-2"></a>'
+            '<a href="#se%C3%A7%C3%A3o">Seção</a><h2 id="seção">Seção</h2>'
+            '<a href="#rodape">Rodapé</a><div name="rodape"></div>')
+    assert _unresolved(html) == [('a', 'href', 'rodape')]
+
+
+def test_anchor_names_do_not_resolve_aria_references():
+    assert _unresolved('<a name="titulo"></a><section aria-labelledby="titulo"></section>') == [
+        ('section', 'aria-labelledby', 'titulo')
+    ]
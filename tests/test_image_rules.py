@@ -0,0 +1,25 @@
+# Compiled image rule matchers and the image benchmark harness
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src' / 'utils'))
+
+from benchmark_images import benchmark_heuristics, benchmark_metadata_cache  # noqa: E402
+from image_alt_checker import ImageAccessibilityAnalyzer  # noqa: E402
+
+
+def test_compiled_matchers_agree_with_per_pattern_rules():
+    # benchmark_heuristics asserts both implementations give the same results
+    timings = benchmark_heuristics(300, repeat=1)
+    assert set(timings) == {'per_pattern', 'compiled'}
+
+
+def test_metadata_cache_benchmark_runs():
+    assert set(benchmark_metadata_cache(20)) == {'no_cache', 'cold_cache', 'warm_cache'}
+
+
+def test_memoized_assessment_is_not_shared():
+    first = ImageAccessibilityAnalyzer._assess_alt_quality('image1', 'a.png')
+    first['issues'].append('mutated by a caller')
+    second = ImageAccessibilityAnalyzer._assess_alt_quality('image1', 'a.png')
+    assert second['issues'] == ['Appears to be placeholder text']
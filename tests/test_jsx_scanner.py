@@ -0,0 +1,88 @@
+# Static checks on TSX component source
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src' / 'utils'))
+
+from jsx_scanner import ComponentScanCache, parse_jsx, scan_components, scan_source  # noqa: E402
+
+
+def _messages(source, check=None):
+    return [(f['line'], f['message']) for f in scan_source(source) if check is None or f['check'] == check]
+
+
+def test_parser_skips_strings_comparisons_and_generics():
+    source = '''
+const a = x < y ? "<div>" : `<span>${b}</span>`;
+function f<T>(v: Array<T>) { return v.length > 0 && <p className="c">{v[0]}</p>; }
+// <img src="commented.png">
+'''
+    assert [(el.name, el.line) for el in parse_jsx(source)] == [('p', 3)]
+
+
+def test_aria_hidden_backdrop_is_not_a_keyboard_error():
+    source = '''
+export const Drawer = ({ open, close }) => (
+  <>
+    {open && <div className="fixed inset-0" onClick={close} aria-hidden="true" />}
+    <div aria-hidden={true}><span onClick={close}>x</span></div>
+    <div onClick={close}>Open</div>
+  </>
+);
+'''
+    assert _messages(source, 'keyboard') == [
+        (6, 'Interactive <div> is not keyboard focusable'),
+        (6, 'Clickable <div> has no role'),
+    ]
+
+
+def test_heading_levels_compare_within_one_component():
+    source = '''
+export const Header = () => <header><h1>Title</h1></header>;
+export const Card = () => <section><h3>Card</h3></section>;
+export const Page = () => (
+  <main>
+    <h2>Section</h2>
+    <h4>Skipped</h4>
+  </main>
+);
+'''
+    assert _messages(source, 'headings') == [(7, 'Heading level skips from h2 to h4')]
+
+
+def test_unlabelled_input_and_missing_alt():
+    source = '''
+export const Form = () => (
+  <form>
+    <label htmlFor="name">Name</label><input id="name" />
+    <input placeholder="Email" />
+    <img src="/logo.png" />
+  </form>
+);
+'''
+    assert _messages(source) == [
+        (5, '<input> has no associated label (placeholder is not a label)'),
+        (6, '<img> is missing alt text'),
+    ]
+
+
+def test_scan_cache_reparses_only_changed_files(tmp_path):
+    components = tmp_path / 'src'
+    components.mkdir()
+    (components / 'A.tsx').write_text('export const A = () => <img src="a.png" />;\n')
+    (components / 'B.tsx').write_text('export const B = () => <p>ok</p>;\n')
+    cache_path = str(tmp_path / 'cache.json')
+
+    cache = ComponentScanCache(cache_path)
+    first = scan_components(str(components), cache)
+    cache.save()
+    assert first['summary'] == {'files_scanned': 2, 'files_parsed': 2, 'errors': 1, 'warnings': 0}
+
+    (components / 'B.tsx').write_text('export const B = () => <input />;\n')
+    cache = ComponentScanCache(cache_path)
+    second = scan_components(str(components), cache)
+    cache.save()
+    assert second['summary']['files_parsed'] == 1
+    assert [f['location'] for r in second['files'] for f in r['findings']] == ['src/A.tsx:1', 'src/B.tsx:1']
+    # The entry for the old B.tsx content is pruned
+    assert len(ComponentScanCache(cache_path).findings) == 2
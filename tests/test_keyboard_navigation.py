@@ -0,0 +1,67 @@
+# Focus classification, composite widgets and dialog focus containment
+import sys
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src' / 'utils'))
+
+from dom_index import DocumentIndex  # noqa: E402
+from keyboard_navigation import KeyboardNavigationEnhancer  # noqa: E402
+
+
+def _unfocusable(html):
+    index = DocumentIndex(BeautifulSoup(html, 'html.parser'))
+    classified = KeyboardNavigationEnhancer.classify_focusable(index)
+    return [el.get('id') for el, _ in classified['unfocusable_widgets']]
+
+
+def test_active_descendant_composite_items_are_not_flagged():
+    html = ('<ul role="listbox" tabindex="0" aria-activedescendant="o1">'
+            '<li role="option" id="o1">One</li><li role="option" id="o2">Two</li></ul>')
+    assert _unfocusable(html) == []
+
+
+def test_roving_tabindex_items_are_not_flagged():
+    html = ('<div role="tablist"><button role="tab" id="t1">A</button>'
+            '<span role="tab" id="t2">B</span><span role="tab" id="t3">C</span></div>'
+            '<ul role="tree"><li role="treeitem" id="i1" tabindex="-1">x'
+            '<ul role="group"><li role="treeitem" id="i2">y</li></ul></li></ul>')
+    assert _unfocusable(html) == []
+
+
+def test_composite_without_focusable_member_is_flagged():
+    html = ('<ul role="menu"><li role="menuitem" id="m1">Open</li><li role="menuitem" id="m2">Save</li></ul>'
+            '<div role="button" id="b1">Go</div>')
+    assert _unfocusable(html) == ['m1', 'm2', 'b1']
+
+
+def test_item_outside_its_composite_is_flagged():
+    assert _unfocusable('<div role="tablist"></div><span role="tab" id="t1">A</span>') == ['t1']
+
+
+def _dialogs(html):
+    return KeyboardNavigationEnhancer.analyze_dialogs(DocumentIndex(BeautifulSoup(html, 'html.parser')))
+
+
+def test_portuguese_and_structural_close_controls():
+    html = ('<div role="dialog" aria-label="Filtros"><button>Fechar</button></div>'
+            '<div role="dialog" aria-label="Excluir"><button>Excluir</button><button>Cancelar</button></div>'
+            '<div role="dialog" aria-label="Menu"><button aria-label="×"></button></div>'
+            '<dialog aria-label="Aviso"><form method="dialog"><p><button>Entendi</button></p></form></dialog>'
+            '<dialog aria-label="Termos"><button formmethod="dialog">Aceitar</button></dialog>'
+            '<div role="dialog" aria-label="Preso"><button>Salvar</button></div>')
+    assert [d['has_close_control'] for d in _dialogs(html)] == [True, True, True, True, True, False]
+
+
+def test_dialog_issue_severity_is_explicit():
+    html = '<body><div role="dialog" aria-modal="true"><p>No controls</p></div></body>'
+    (dialog,) = _dialogs(html)
+    assert [issue['severity'] for issue in dialog['issues']] == ['error', 'warning', 'warning']
+
+    validation = KeyboardNavigationEnhancer.validate_focus_management(html)
+    dialog_issues = [issue for issue in validation['issues'] if issue.get('line') is not None]
+    assert [(issue['severity'], issue['line']) for issue in dialog_issues] == [
+        ('error', 1), ('warning', 1), ('warning', 1)
+    ]
+    assert not validation['modal_focus']
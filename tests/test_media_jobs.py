@@ -0,0 +1,84 @@
+# Batch caption jobs: up-to-date skipping and resumable per-job state
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src' / 'utils'))
+
+import media_jobs  # noqa: E402
+from media_jobs import MediaJobRunner, discover_jobs  # noqa: E402
+
+SEGMENTS = [
+    {'index': 0, 'start': 0.0, 'end': 2.0, 'speech_start': 0.5, 'speech_end': 1.8, 'text': 'Olá'},
+    {'index': 1, 'start': 2.0, 'end': 3.0, 'speech_start': None, 'speech_end': None, 'text': ''},
+]
+
+
+@pytest.fixture
+def library(tmp_path):
+    videos = tmp_path / 'videos'
+    videos.mkdir()
+    (videos / 'intro.mp4').write_bytes(b'\x00' * 1024)
+    (videos / 'notes.txt').write_text('not media')
+    return videos
+
+
+@pytest.fixture
+def transcriptions(monkeypatch):
+    calls = []
+
+    def transcribe_stream(source, backend, language, workers, state_path, pool=None):
+        calls.append(source)
+        return {'segments': SEGMENTS, 'complete': True, 'errors': {}}
+
+    monkeypatch.setattr(media_jobs, 'transcribe_stream', transcribe_stream)
+    return calls
+
+
+def _run(library, tmp_path, force=False):
+    runner = MediaJobRunner(str(tmp_path / 'state'), backend='stub', workers=1, io_workers=1, force=force)
+    return runner, runner.run(discover_jobs(str(library)))
+
+
+def test_jobs_are_captioned_then_skipped(library, tmp_path, transcriptions):
+    _, first = _run(library, tmp_path)
+    assert [r['status'] for r in first['jobs']] == ['captioned']
+    assert (library / 'intro.vtt').read_text(encoding='utf-8').startswith('WEBVTT')
+
+    _, second = _run(library, tmp_path)
+    assert second['summary']['skipped'] == 1
+    assert len(transcriptions) == 1
+
+
+def test_changed_source_resets_the_recorded_stage(library, tmp_path, transcriptions):
+    runner, _ = _run(library, tmp_path)
+    job = discover_jobs(str(library))[0]
+    assert runner.state.get(job.job_id)['stage'] == 'done'
+
+    source = library / 'intro.mp4'
+    source.write_bytes(b'\x01' * 2048)
+    later = os.stat(library / 'intro.vtt').st_mtime_ns + 1_000_000_000
+    os.utime(source, ns=(later, later))
+
+    _, rerun = _run(library, tmp_path)
+    assert [r['status'] for r in rerun['jobs']] == ['captioned']
+    assert len(transcriptions) == 2
+
+
+def test_finished_transcript_is_reused_without_transcribing(library, tmp_path, transcriptions):
+    runner, _ = _run(library, tmp_path)
+    job = discover_jobs(str(library))[0]
+    # Interrupted after transcription, before the caption file was written
+    runner.state.update(job.job_id, stage='transcribed')
+    os.remove(job.output)
+    transcript = Path(runner.transcript_path(job))
+    transcript.parent.mkdir(parents=True, exist_ok=True)
+    transcript.write_text('{"segments": [{"index": 0, "start": 0.0, "end": 2.0, "speech_start": 0.5, '
+                          '"speech_end": 1.8}], "texts": {"0": "Olá"}}', encoding='utf-8')
+
+    _, rerun = _run(library, tmp_path)
+    assert [r['status'] for r in rerun['jobs']] == ['captioned']
+    assert len(transcriptions) == 1
+    assert 'Olá' in Path(job.output).read_text(encoding='utf-8')
@@ -0,0 +1,49 @@
+# --stdin / NDJSON input: record parsing, ordered output and bounded worker state
+import io
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import accessibility_checker as checker  # noqa: E402
+
+PAGE = '<html lang="en"><body><main><h1>Title</h1><img src="a.png"></main></body></html>'
+
+
+def test_records_carry_their_stdin_line():
+    stream = io.StringIO('\n' + json.dumps({'id': 'a', 'html': PAGE}) + '\n\n'
+                         + 'not json\n' + json.dumps({'html': PAGE}) + '\n' + json.dumps([1]) + '\n')
+    records = [(doc_id, line, error is None) for doc_id, line, _, _, error in checker.read_stdin_documents(stream)]
+    assert records == [('a', 2, True), (None, 4, False), (5, 5, True), (None, 6, False)]
+
+
+def test_plain_html_is_one_document():
+    documents = list(checker.read_stdin_documents(io.StringIO('\n' + PAGE)))
+    assert [(doc_id, line, html) for doc_id, line, html, _, _ in documents] == [('stdin', 2, PAGE)]
+
+
+def test_results_are_written_in_input_order(tmp_path):
+    lines = [json.dumps({'id': f'doc-{i}', 'html': PAGE}) for i in range(5)]
+    lines.insert(2, '{"id": broken')
+    out = io.StringIO()
+    totals = checker.audit_stdin(str(tmp_path), workers=2, stream=io.StringIO('\n'.join(lines) + '\n'), out=out)
+
+    results = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r['id'] for r in results] == ['doc-0', 'doc-1', None, 'doc-2', 'doc-3', 'doc-4']
+    assert results[2]['line'] == 3 and 'error' in results[2]
+    assert totals['documents'] == 6 and totals['failed'] == 1
+    assert all('images' in r['checks'] for r in results if 'error' not in r)
+
+
+def test_worker_state_does_not_grow_with_the_stream(tmp_path):
+    checker._init_stdin_worker(str(tmp_path))
+    auditor = checker._worker_auditor
+    for i in range(checker.COLOR_INDEX_CACHE_SIZE + 5):
+        auditor.caption_tracks['captions.vtt'] = {'file': 'captions.vtt', 'pages': ['earlier']}
+        css = f'.text-c{i} {{ color: #{i:06x}; }}'
+        checker._audit_document(f'doc-{i}', PAGE, css)
+
+        assert not auditor.alt_index.pages
+        assert not auditor.caption_tracks
+    assert len(auditor._color_indexes) == checker.COLOR_INDEX_CACHE_SIZE
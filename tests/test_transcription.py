@@ -0,0 +1,177 @@
+# Silence segmentation, resumable state and cue timing of the chunked transcriber
+import json
+import sys
+import wave
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src' / 'utils'))
+
+from transcription import (  # noqa: E402
+    OfflineStubBackend, RecognizerBackend, segments_to_cues, split_at_silence,
+    transcribe_segments, transcribe_to_captions, window_energies
+)
+
+SAMPLE_RATE = 16000
+# (seconds, voiced) spans of the synthetic recording
+LAYOUT = [(0.5, False), (3.0, True), (1.0, False), (3.0, True), (1.0, False), (2.5, True), (0.5, False)]
+
+
+def _speech_spans():
+    spans, position = [], 0.0
+    for seconds, voiced in LAYOUT:
+        if voiced:
+            spans.append((position, position + seconds))
+        position += seconds
+    return spans
+
+
+@pytest.fixture
+def recording(tmp_path):
+    """Mono 16-bit WAV: 220 Hz tone for speech, faint noise for silence"""
+    rng = np.random.default_rng(0)
+    parts = []
+    for seconds, voiced in LAYOUT:
+        t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+        if voiced:
+            parts.append(0.5 * np.sin(2 * np.pi * 220 * t))
+        else:
+            parts.append(rng.normal(0, 0.0005, len(t)))
+    samples = (np.concatenate(parts) * 32767).astype('<i2')
+
+    path = tmp_path / 'speech.wav'
+    with wave.open(str(path), 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(samples.tobytes())
+    return str(path)
+
+
+def test_backend_requires_transcribe():
+    with pytest.raises(TypeError):
+        RecognizerBackend()
+
+    class Incomplete(RecognizerBackend):
+        name = 'incomplete'
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_stub_backend_describes_segment_length():
+    pcm = b'\x00\x00' * SAMPLE_RATE * 2
+    assert OfflineStubBackend().transcribe(pcm, SAMPLE_RATE, 'en-US') == '[speech 2.0s]'
+
+
+def test_split_at_silence_cuts_inside_pauses(recording):
+    segments = split_at_silence(window_energies(recording))
+    spans = _speech_spans()
+
+    assert [s['index'] for s in segments] == list(range(len(segments)))
+    assert segments[0]['start'] == 0.0
+    for previous, following in zip(segments, segments[1:]):
+        assert previous['end'] == following['start']
+        cut = previous['end']
+        assert not any(start < cut < end for start, end in spans), f"cut at {cut}s splits speech"
+
+    voiced = [s for s in segments if s['speech_start'] is not None]
+    assert len(voiced) == len(spans)
+    for segment, (start, end) in zip(voiced, spans):
+        assert segment['speech_start'] == pytest.approx(start, abs=0.05)
+        assert segment['speech_end'] == pytest.approx(end, abs=0.05)
+
+
+def test_transcribe_segments_resumes_from_state(recording, tmp_path):
+    state_path = str(tmp_path / 'state.json')
+    first = transcribe_segments(recording, 'stub', workers=1, state_path=state_path)
+    assert first['complete'] and not first['errors']
+
+    # Simulate an interrupted run: one segment kept, one never finished
+    with open(state_path, 'r', encoding='utf-8') as f:
+        stored = json.load(f)
+    kept, missing = sorted(stored['texts'])[:2]
+    stored['texts'][kept] = 'kept from the previous run'
+    del stored['texts'][missing]
+    with open(state_path, 'w', encoding='utf-8') as f:
+        json.dump(stored, f)
+
+    resumed = transcribe_segments(recording, 'stub', workers=1, state_path=state_path)
+    texts = {str(s['index']): s['text'] for s in resumed['segments']}
+    assert resumed['complete']
+    assert texts[kept] == 'kept from the previous run'
+    assert texts[missing] == {str(s['index']): s['text'] for s in first['segments']}[missing]
+
+
+def test_state_is_discarded_when_settings_change(recording, tmp_path):
+    state_path = str(tmp_path / 'state.json')
+    transcribe_segments(recording, 'stub', workers=1, state_path=state_path)
+    with open(state_path, 'r', encoding='utf-8') as f:
+        stored = json.load(f)
+    stored['texts'] = {index: 'stale' for index in stored['texts']}
+    with open(state_path, 'w', encoding='utf-8') as f:
+        json.dump(stored, f)
+
+    result = transcribe_segments(recording, 'stub', 'pt-BR', workers=1, state_path=state_path)
+    assert all(s['text'] != 'stale' for s in result['segments'])
+
+
+def test_cues_follow_speech_extent(recording, tmp_path):
+    output = tmp_path / 'speech.vtt'
+    result = transcribe_to_captions(recording, str(output), 'vtt', backend='stub', workers=1,
+                                    state_path=str(tmp_path / 'state.json'))
+    assert result['complete'] and result['output'] == str(output)
+
+    # Cues span the speech only, although the whole segment was recognized
+    voiced = [s for s in result['segments'] if s['speech_start'] is not None]
+    cues = segments_to_cues(result['segments'])
+    spans = _speech_spans()
+    assert len(cues) == result['cues'] == len(spans)
+    for cue, segment, (start, end) in zip(cues, voiced, spans):
+        assert cue.start == pytest.approx(start, abs=0.05)
+        assert cue.end == pytest.approx(end, abs=0.05)
+        assert cue.text == f"[speech {segment['end'] - segment['start']:.1f}s]"
+
+    content = output.read_text(encoding='utf-8')
+    assert content.startswith('WEBVTT')
+    assert content.count(' --> ') == len(spans)
+
+
+def test_stream_resumes_without_hashing_the_media(recording, tmp_path, monkeypatch):
+    import audio_stream
+    import transcription
+
+    def stream_pcm(path, sample_rate):
+        with wave.open(path, 'rb') as wav:
+            while True:
+                chunk = wav.readframes(sample_rate)
+                if not chunk:
+                    return
+                yield chunk
+
+    def full_hash(path):
+        raise AssertionError('the source must not be read just to key the state')
+
+    monkeypatch.setattr(audio_stream, 'stream_pcm', stream_pcm)
+    monkeypatch.setattr(transcription, 'file_digest', full_hash)
+    state_path = str(tmp_path / 'state.json')
+
+    first = transcription.transcribe_stream(recording, 'stub', workers=1, state_path=state_path)
+    assert first['complete'] and len([s for s in first['segments'] if s['speech_start'] is not None]) == 3
+
+    with open(state_path, 'r', encoding='utf-8') as f:
+        stored = json.load(f)
+    stored['texts'] = {index: 'kept' for index in stored['texts']}
+    with open(state_path, 'w', encoding='utf-8') as f:
+        json.dump(stored, f)
+    resumed = transcription.transcribe_stream(recording, 'stub', workers=1, state_path=state_path)
+    assert {s['text'] for s in resumed['segments'] if s['speech_start'] is not None} == {'kept'}
+
+    # Rewriting the source invalidates the state
+    with open(recording, 'ab') as f:
+        f.write(b'\x00\x00')
+    fresh = transcription.transcribe_stream(recording, 'stub', workers=1, state_path=state_path)
+    assert 'kept' not in {s['text'] for s in fresh['segments']}